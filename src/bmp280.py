@@ -13,14 +13,18 @@ Barometer forecast: 0 = Stable,1 = Sunny,2 = Cloudy,3 = Unstable,4 = Thunderstor
 Pico Breadboard Kit is used to wire up the BMP280.
 Pico Breadboard Kit LED1 is used as status LED when requesting BMP280 data and updating domoticz.
 Configuration stored in config.py, ensure to upload to the picow.
-BMP280 measures every 60 seconds.
+BMP280 measures every 60 seconds in forced mode (bmp280forced.py): the sensor sleeps between the samples,
+a sample is one conversion (weather monitoring setting: oversampling x1, IIR off, 5.5ms) read in one burst.
+The barometer forecast is set by the pressure trend of the last 3 hours (pressuretrend.py) kept on the device,
+the history is saved to a file and restored after a reboot (the RTC is set by NTP).
+Until 1.5 hours of history are sampled, the forecast is set by the pressure only.
 :log
-BMP280 v20230326
+BMP280 v20261019
 Sampling Rate: 60s.
 Network connected OK
 Network IP picow-ip
 Network listening on ('0.0.0.0', 80)
-BMP280 t=24,p=101340.5,hpa=1013,bar=1.013404,mmhg=760.1157,svalue=24;1013;0;0
+BMP280 t=24,p=101340,hpa=1013,bar=1.0134,mmhg=760.1154,conversion=5612us,trend=samples=18, 60min=-0.4hPa, 180min=-1.1hPa,svalue=24;1013;0;0
 Send GET request url=http://domoticz-ip:port/json.htm?type=command&param=udevice&idx=29&nvalue=0&svalue=24;1013;0;0
 Send GET request status=OK
 :wiring
@@ -36,14 +40,17 @@ GND (Cathode) = GND (Pin #38)
 # Imports
 from machine import Pin,I2C
 from utime import sleep
-# BMP280
-from bmp280 import *
+import ntptime
+# BMP280 forced mode driver from bmp280forced.py
+from bmp280forced import BMP280Forced, WEATHER
+# Pressure trend from pressuretrend.py
+from pressuretrend import PressureTrend
 # Call server from server.py (must be uploaded to the picow)
 from server import Server
 # Configuration (must be uploaded to the picow)
 import config
 # Constants
-VERSION = 'BMP280 v20230326'
+VERSION = 'BMP280 v20261019'
 # Create the led object (GP4, Pin #6) indicating bmp280 measurement in progress
 led_green = Pin(4, Pin.OUT)
 led_green.value(0)
@@ -65,11 +72,11 @@ URL_DOM = "http://"+ config.DOMOTICZ_IP +"/json.htm?type=command&param=udevice&i
 # Init the bus with GP0 (SDA) and GP1 (CLK)
 bus = I2C(0, scl=Pin(BMP_PIN_SCK), sda=Pin(BMP_PIN_SDI), freq=200000)
 # Create the bmp280 object with address 0x77. The default address 0x76 gives error OSError: [Errno 5] EIO
-bmp = BMP280(bus, addr=BMP_ADDR)
-# The use case is indoor
-bmp.use_case(BMP280_CASE_INDOOR)
+bmp = BMP280Forced(bus, addr=BMP_ADDR)
+# The setting is weather monitoring (forced mode, oversampling x1, IIR off)
+bmp.configure(*WEATHER)
 """
-Set the barometer forecast depending pressure.
+Set the barometer forecast depending pressure, used until the pressure trend is available.
 :param int pressure
 :return int forecast
     0=Stable,1=Sunny,2=Cloudy,3=Unstable,4=Thunderstorm,5=Unknown,6=Cloudy/Rain
@@ -97,19 +104,23 @@ During measurement, the green led is on.
 """
 def get_bmp280_data():
     led_green.value(1)
-    sleep(1)
     # print(f'BMP280 measuring...')
-    temperature	= round(bmp.temperature)
-    pressure    = bmp.pressure
+    # One forced mode conversion, temperature & pressure read together
+    temperature, pressure = bmp.measure()
+    temperature	= round(temperature)
     p_pa		= pressure
     p_hpa		= round(pressure/100)
     p_bar		= pressure/100000
     p_mmHg		= pressure/133.3224
-    forecast	= barometer_forecast(p_hpa)
+    # Forecast by the pressure trend, by the pressure if the history is too short
+    trend.add(pressure)
+    forecast	= trend.forecast(p_hpa)
+    if forecast is None:
+        forecast = barometer_forecast(p_hpa)
     
     # Set the svalue, i.e. svalue=TEMP;BAR;BAR_FOR;ALTITUDE
     svalue = str(temperature) + ';' + str(p_hpa) + ';' + str(forecast) + ';' + str(0)
-    print(f"BMP280 t={temperature},p={p_pa},hpa={p_hpa},bar={p_bar},mmhg={p_mmHg},svalue={svalue}")
+    print(f"BMP280 t={temperature},p={p_pa},hpa={p_hpa},bar={p_bar},mmhg={p_mmHg},conversion={bmp.conversion_us}us,trend={trend.report()},svalue={svalue}")
     
     # Return the svalue
     led_green.value(0)
@@ -121,6 +132,13 @@ print(f'Sampling Rate: {SAMPLING_RATE}s.')
 network = Server(config.WIFI_SSID, config.WIFI_PASSWORD, DEBUG=True)
 # Connect to the network and get the server object
 server = network.connect()
+# Set the RTC, the time of the pressure trend history file
+try:
+    ntptime.settime()
+except Exception as e:
+    print(f'[ERROR] NTP {e}')
+# Pressure trend, the history is restored from the file
+trend = PressureTrend()
 # Domoticz url
 url = URL_DOM
 url = url.replace('{IDX}', str(IDX_TEMP_BARO))
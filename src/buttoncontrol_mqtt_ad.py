@@ -8,6 +8,9 @@ Domoticz Hardware: MQTT Auto Discovery Client Gateway with LAN Interface, Name=M
 Domoticz Device created via MQTT auto discovery by publishing config topic (see domoticz log below).
 The autodiscover component is button and the Domoticz device is type=Light/Switch. 
 Note that this script does not use the library server.py but has simple code to connect to the network.
+The main loop does not spin (while True: pass) but parks the CPU with the low-power scheduler (lowpower.py)
+until the next task deadline or the button interrupt. Tasks: MQTT ping to keep the broker connection
+and a report of the idle ratio, the wakeups and the estimated current every REPORT_PERIOD.
 :external libraries
 umqtt.simple
 MQTT Remove Retained message for creating the button:
@@ -23,6 +26,7 @@ MQTT Broker connecting...
 MQTT Broker connected: NNN.NNN.NNN.179
 MQTT State published: topic=domoticz/button/makelab/config, payload={"name": "MakeLabButton", "state_topic": "domoticz/button/makelab/state", "unique_id": "BM001"}
 MQTT published: topic=domoticz/button/makelab/state, payload={"ON"}
+Scheduler idle=100.0%, current=28.0mA (estimated), runs=0, skipped=0, wakeups=3000 (50/s)
 :wiring
 Button = Pico W
 Button K4 = GP20 (Pin #26)
@@ -36,10 +40,18 @@ from machine import Pin
 from picozero import Button
 # mqtt simple (Installed via Thonny manage packages)
 from umqtt.simple import MQTTClient
+# Low-power scheduler from lowpower.py
+from lowpower import Scheduler
 # Configuration (must be uploaded to the pico w)
 import config
 # Constants
-VERSION = const('buttoncontrol_mqtt_ad v20230425')
+VERSION = const('buttoncontrol_mqtt_ad v20261019')
+# Time in ms between MQTT pings, half the keepalive
+PING_PERIOD = const(1800000)
+# Time in ms between the scheduler reports
+REPORT_PERIOD = const(60000)
+# Current in mA of the board (run, idle, lightsleep) for the estimated current in the report, measure the own board
+CURRENTS = (45, 28, 2)
 """
 BUTTON
 """
@@ -53,8 +65,6 @@ btn = Button(BUTTON_PINNR)
 def button_pressed():
     client.publish(STATE_TOPIC, STATE_PAYLOAD)
     print(f'MQTT published: topic={STATE_TOPIC.decode()}, payload={STATE_PAYLOAD.decode()}')
-# Set the function to run if the button is pressed
-btn.when_pressed = button_pressed
 """
 MQTT
 """
@@ -105,6 +115,17 @@ try:
     print(f'MQTT State published: topic={BUTTON_TOPIC_CONFIG.decode()}, payload={BUTTON_PAYLOAD_CONFIG.decode()}')
 except OSError as e:
     mqtt_reconnect()
+# MQTT ping to keep the broker connection
+def mqtt_ping():
+    try:
+        client.ping()
+    except OSError as e:
+        mqtt_reconnect()
 # Main
-while True:
-    pass
+# The button callback runs whilst the scheduler parks the CPU and adds the publish as task
+sched = Scheduler(currents=CURRENTS)
+# Set the function to run if the button is pressed
+btn.when_pressed = lambda: sched.after(0, button_pressed)
+sched.every(PING_PERIOD, mqtt_ping, phase=PING_PERIOD)
+sched.every(REPORT_PERIOD, lambda: print(f'Scheduler {sched.report()}'), phase=REPORT_PERIOD)
+sched.run()
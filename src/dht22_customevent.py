@@ -9,11 +9,14 @@ The data is a JSON object: {"t":temperature NN,"h":humidity 0-100,"s":humidity s
 http://domoticz-ip:8080/json.htm?type=command&param=customevent&event=DHT22&data={"t":19,"h":64,"s":0}
 :notes
 Pico Breadboard Kit is used to wire up the DHT22.
-Pico Breadboard Kit LED1 is used as status LED when requesting DHT22 data and updating domoticz.
+Pico Breadboard Kit LED1 is used as status LED when updating domoticz.
 Configuration stored in config.py, ensure to upload to the picow.
-DHT22 measures every 60 seconds.
+DHT22 measures every 60 seconds in the background (dhtsampler.py) on the low-power scheduler (lowpower.py).
+A failed read (timeout, checksum error) is retried with backoff, the sensor is read at most every 2 seconds.
+The device is updated with the cached reading, if no valid reading (all retries failed) the update is skipped.
+The sampler counters (reads, errors, retries) are printed every REPORT_PERIOD.
 :log
-DHT22_CustomEvent v20230311
+DHT22_CustomEvent v20261019
 Sampling Rate: 60s.
 Network connected OK
 Network IP webserver-ip
@@ -21,6 +24,7 @@ Network listening on ('0.0.0.0', 80)
 DHT22 t=19, h=43, hs=0, data={'h': 43, 't': 19, 's': 0}
 Send POST request url=http://domoticz-ip:port/json.htm?type=command&param=customevent&event=DHT22&data=, postdata={'h': 43, 't': 19, 's': 0}
 Send POST request status=OK
+DHT22 reads=61, timeouts=1, checksums=0, invalid=0, retries=1, missed=0, error_rate=1.6%
 :wiring
 DHT22 = PicoW
 VCC (+) = VBUS (Pin #40)
@@ -29,18 +33,21 @@ GND (-) = GND (Pin #28)
 """
 # Imports
 from machine import Pin
-from utime import sleep
 # Convert the Domoticz HTTP API/JSON response
 import json
 # DHT22 micropython internal lib
 from dht import DHT22
+# DHT22 background sampler from dhtsampler.py
+from dhtsampler import DhtSampler, MIN_INTERVAL
+# Low-power scheduler from lowpower.py
+from lowpower import Scheduler
 # Call server from server.py (must be uploaded to the picow)
 from server import Server
 # Configuration (must be uploaded to the picow)
 import config
 # Constants
-VERSION = 'DHT22_CustomEvent v20230311'
-# Create the led object indicating dht22 measurement in progress
+VERSION = 'DHT22_CustomEvent v20261019'
+# Create the led object indicating domoticz update in progress
 led1 = Pin(config.PIN_LED1, Pin.OUT)
 led1.value(0)
     
@@ -48,6 +55,10 @@ led1.value(0)
 PIN_DHT22 = 22
 # DHT22 measurement sampling rate in seconds
 SAMPLING_RATE_DHT22 = 60
+# DHT22 max retries of a failed read
+RETRIES_DHT22 = 3
+# Time in ms between the sampler reports
+REPORT_PERIOD = 3600000
 # DHT22 IDX of the Domoticz Temp+Hum device
 IDX_DHT22 = 15
 # URL Domoticz
@@ -56,6 +67,8 @@ IDX_DHT22 = 15
 URL_DOM_DHT22 = "http://domoticz-ip:port/json.htm?type=command&param=customevent&event=DHT22&data="
 # Create the dht22 sensor object
 dht22_sensor = DHT22(Pin(PIN_DHT22, Pin.IN, Pin.PULL_UP))
+# Create the background sampler with the cached reading
+dht22 = DhtSampler(dht22_sensor, period=SAMPLING_RATE_DHT22 * 1000, retries=RETRIES_DHT22)
 """
 Set the humidity status level used for Domoticz HUM_STAT value.
 :param int hum
@@ -79,30 +92,24 @@ def set_humidity_status(hum, temp):
         level = 0
     return level
 """
-DHT22 measurement with roundes values for temperature and humidity.
-During measurement, LED1 of the Pico Breadboard is on.
+DHT22 cached reading with roundes values for temperature and humidity, the sensor is not read.
+:param float temperature
+:param float humidity
 :return string data
     JSON object with key:value pairs t=temperature (°C), h=humidity (0-100%), s=humidity_status (0-3)
 :example
     {'h': 48, 't': 18, 's': 0}
 """
-def get_dht22_data():
-    led1.value(1)
-    sleep(1)
-    # print(f'DHT22 measuring...')
-    dht22_sensor.measure()
-    # print(f'DHT22 measuring OK')
-    # print(f'DHT22 read data...')
+def get_dht22_data(temperature, humidity):
     # Assign the data (rounded)
-    temperature     = round(dht22_sensor.temperature())
-    humidity        = round(dht22_sensor.humidity())
+    temperature     = round(temperature)
+    humidity        = round(humidity)
     humidity_status = set_humidity_status(humidity, temperature)
     # Set the data JSON object: {"t":NN,"h":NN,"s":N}
     data = {}
     data['t'] = temperature
     data['h'] = humidity
     data['s'] = humidity_status
-    led1.value(0)
     print(f'DHT22 t={temperature}, h={humidity}, hs={humidity_status}, data={data}')
     return data
 # Info
@@ -112,11 +119,23 @@ print(f'Sampling Rate: {SAMPLING_RATE_DHT22}s.')
 network = Server(config.WIFI_SSID, config.WIFI_PASSWORD, DEBUG=True)
 # Connect to the network and get the server object
 server = network.connect()
+"""
+Update the Domoticz device with the cached DHT22 reading.
+During the update, LED1 of the Pico Breadboard is on.
+"""
+def update_dht22(temperature, humidity):
+    led1.value(1)
+    try:
+        # Submit Domoticz HTTP API/JSON POST request to update the device
+        network.send_post_request(URL_DOM_DHT22, get_dht22_data(temperature, humidity))
+    except Exception as e:
+        print(f'[ERROR] DHT22 {e}')
+    led1.value(0)
 # Main
-# Measure DHT22 every NN seconds (see constant SAMPLING_DELAY)
-while True:
-    # Measure DHT22 temperature & humidity & humidity status
-    # Submit Domoticz HTTP API/JSON POST request to update the device
-    network.send_post_request(URL_DOM_DHT22, get_dht22_data())
-    # Delay till next sample
-    sleep(SAMPLING_RATE_DHT22)
+# The sampler reads the DHT22 every NN seconds (see constant SAMPLING_RATE_DHT22), a new reading updates the device
+dht22.callback = update_dht22
+sched = Scheduler()
+# Check for a due sample or retry every min interval of the DHT22
+sched.every(MIN_INTERVAL, dht22.tick)
+sched.every(REPORT_PERIOD, lambda: print(f'DHT22 {dht22.report()}'), phase=REPORT_PERIOD)
+sched.run()
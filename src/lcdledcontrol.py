@@ -17,7 +17,6 @@ SCL = GP21 (pin #27) (pink)
 GND = GND (black)
 """
 # Libraries
-from time import sleep
 from machine import Pin
 import json
 # Call server from server.py (must be uploaded to the picow)
@@ -26,11 +25,13 @@ from server import Server
 # lcd_api.py, machine_i2c_lcd.py
 from machine import I2C, Pin
 from machine_i2c_lcd import I2cLcd
+# Screen buffer writing only the changed characters to the LCD
+from lcd_screen import LcdScreen
 # Configuration read from config.py (must be uploaded to the picow prior testing)
 import config
 # Constants
 NAME = 'Domoticz LED Control'
-VERSION = 'v20230311'
+VERSION = 'v20261019'
 CRLF = chr(13) + chr(10)
 SPACE = chr(32)
 # Create the LED1 (blue) object using config.py settings
@@ -79,8 +80,8 @@ def set_lcd_welcome(row1, row2):
     """
     LCD Initial text on row 1 & 2
     """
-    lcd.putstr(row1 + "\n" + row2)
-    sleep(.3)
+    screen.putstr(row1 + "\n" + row2)
+    screen.refresh()
 def handle_request(cmd, status):
     """
     Handle the LCD command defined as JSON object.
@@ -111,18 +112,20 @@ def handle_request(cmd, status):
             response[config.KEY_MESSAGE] = config.MESSAGE_CMD_UNKNOWN
         
     # LCD display set
-    # Clear row 2 (the row range for LCD2004 is 0 to 3)
-    lcd.clrrow(2)
-    sleep(.3)
-    # Write the keys message and state as string at col 0, row 2
-    lcd.putstrat(0, 2, 'LED1: ' + response[config.KEY_MESSAGE] + ' ' + response[config.KEY_STATE])
-    sleep(.3)
+    # Clear row 2 (the row range for LCD2004 is 0 to 3) in the screen buffer
+    screen.clrrow(2)
+    # Write the keys message and state as string at col 0, row 2 in the screen buffer
+    screen.putstrat(0, 2, 'LED1: ' + response[config.KEY_MESSAGE] + ' ' + response[config.KEY_STATE])
+    # Write the changed characters only to the LCD
+    screen.refresh()
     return response
 # Main
 # Listen for incoming connections from the Domoticz Automation Event dzVents
 print(f'{NAME} {VERSION}')
 # Create the LCD object
 lcd = set_lcd(LCD_I2C_ADDRESS, LCD_PIN_SDA, LCD_PIN_SCL, LCD_ROWS, LCD_COLS)
+# Create the screen buffer for the LCD
+screen = LcdScreen(lcd)
 # Set the LCD display welcome text
 set_lcd_welcome(NAME, VERSION)
 # Create network object
@@ -8,6 +8,8 @@ The incoming data is received from a HTTP POST request with JSON object to set t
 The JSON object contains for each of the displayed text, the col, row and text.
 {'sensor': {'text': 'TEXT', 'col': NN, 'row': N}, ...}
 This enables to set the LCD display layout from the Domoticz event.
+The internal temperature is also shown as big number (lcd_bignumber.py) on rows 1 and 2, i.e. 41*C.
+The big number replaces the version after the first data received, only the changed digits are written.
 :log
 Domoticz Motherboard v20230311
 LCD init. Address: [39]
@@ -27,7 +29,6 @@ GND = GND (black)
 """
 # Libraries
 import time
-from time import sleep
 from machine import Pin
 import json
 # Call server from server.py (must be uploaded to the picow)
@@ -36,12 +37,17 @@ from server import Server
 # lcd_api.py, machine_i2c_lcd.py
 from machine import I2C, Pin
 from machine_i2c_lcd import I2cLcd
+# Screen buffer writing only the changed characters to the LCD
+from lcd_screen import LcdScreen
+# Big numbers with the custom characters managed by the glyph cache
+from lcd_glyphcache import GlyphCache
+from lcd_bignumber import BigNumber
 # Configuration read from config.py (must be uploaded to the picow prior testing)
 import config
 # Constants
 ## Name (row 0), Version (row 1), Waiting (row 3) are displayed on the LCD
 NAME = 'Domoticz Motherboard'
-VERSION = 'v20230311'
+VERSION = 'v20261019'
 WAITING = 'Waiting for data...'
 ## Title used for the HTTP JSON response to Domoticz key title
 TITLE = 'Set LCD'
@@ -54,6 +60,9 @@ LCD_PIN_SDA = 20
 LCD_PIN_SCL = 21
 LCD_ROWS = 4
 LCD_COLS = 20
+# Big temperature position col, row (upper row)
+BIGNUMBER_COL = 0
+BIGNUMBER_ROW = 1
 """
 Create the LCD object by init the lcd with i2c.
 :param hex address
@@ -91,8 +100,8 @@ def init_lcd(address, pinsda, pinscl, rows, cols):
 LCD Initial text on row 1 & 2
 """
 def set_lcd_welcome(row1, row2, row3, row4):
-    lcd.putstr(row1 + "\n" + row2 + "\n" + row3 + "\n" + row4)
-    sleep(.3)
+    screen.putstr(row1 + "\n" + row2 + "\n" + row3 + "\n" + row4)
+    screen.refresh()
 """
 Set the sensor text at col, row
 :param string Sensor
@@ -105,12 +114,29 @@ def set_lcd_sensor_text(data, sensor):
     col = data[sensor]['col']
     row = data[sensor]['row']
     text = data[sensor]['text']
-    # Clear the sensor data text at col, row
-    lcd.clrtext(col, row, len(text))
-    sleep(.1)
-    # Write the sensor text at col, row
-    lcd.putstrat(col, row, text)
-    sleep(.1)
+    # Clear the sensor data text at col, row in the screen buffer
+    screen.clrtext(col, row, len(text))
+    # Write the sensor text at col, row in the screen buffer
+    screen.putstrat(col, row, text)
+"""
+Set the internal temperature as big number, i.e. text T:41 is shown as 41*C.
+The temperature is rounded to an integer, so the big number ends before the timestamp at col 15.
+:param string text
+    Internal temperature text as received, i.e. T:41
+"""
+def set_lcd_bignumber(text):
+    global waiting
+    try:
+        temperature = round(float(text.split(':')[-1]))
+    except ValueError:
+        print(f'[ERROR] Big number temperature not valid: {text}')
+        return
+    # Clear the welcome text on rows 1 and 2 once, the big number writes only its changed digits
+    if waiting:
+        screen.clrtext(0, BIGNUMBER_ROW, 15)
+        screen.clrtext(0, BIGNUMBER_ROW + 1, 15)
+        waiting = False
+    bignumber.show(f'{temperature}*C')
 """
 Handle the LCD command defined as JSON object.
 The command defines for every sensor data the text and the LCD start position col/row.
@@ -127,19 +153,19 @@ def handle_request(cmd, status):
     response[config.KEY_TITLE] = cmd
     # If the status is 1 (OK) then set the lcd display with the sensor data.
     if status == 1:
-        # Clear rows first (the row range for LCD2004 is 0 to 3)
-        # Clear row 2 = NOT USED
-        lcd.clrrow(2)
-        sleep(.1)
-        
+        # Clear rows first (the row range for LCD2004 is 0 to 3) in the screen buffer
+        # Rows 1 and 2 are used by the big temperature, the rows are not cleared
         # Row 3 is used to display the RPi motherboard sensor data
-        lcd.clrrow(3)
-        sleep(.1)
+        screen.clrrow(3)
         # Set the sensor data (subset only) on row 3
         set_lcd_sensor_text(cmd, 'timestamp')
         set_lcd_sensor_text(cmd, 'internaltemperature')
         set_lcd_sensor_text(cmd, 'cpuusage')
         set_lcd_sensor_text(cmd, 'memoryusage')
+        # Set the internal temperature as big number on rows 1 and 2
+        set_lcd_bignumber(cmd['internaltemperature']['text'])
+        # Write the changed characters only to the LCD
+        screen.refresh()
         # Set the response
         response[config.KEY_STATE] = config.STATE_OK
         response[config.KEY_MESSAGE] = config.MESSAGE_EMPTY
@@ -154,6 +180,11 @@ def handle_request(cmd, status):
 print(f'{NAME} {VERSION}')
 # Create the LCD display object
 lcd = init_lcd(LCD_I2C_ADDRESS, LCD_PIN_SDA, LCD_PIN_SCL, LCD_ROWS, LCD_COLS)
+# Create the screen buffer for the LCD
+screen = LcdScreen(lcd)
+# Create the big temperature writing into the screen buffer, the custom characters are uploaded to the LCD
+bignumber = BigNumber(GlyphCache(lcd), target=screen, col=BIGNUMBER_COL, row=BIGNUMBER_ROW)
+waiting = True
 # Show initial info on the LCD. Waiting is replaced by RPi motherboard sensor data
 set_lcd_welcome(NAME, VERSION, '', WAITING)
 # Create network object
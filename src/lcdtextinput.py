@@ -28,7 +28,6 @@ SCL = GP21 (pin #27) (pink)
 GND = GND (black)
 """
 # Libraries
-from time import sleep
 from machine import Pin
 import json
 # Call server from server.py (must be uploaded to the picow)
@@ -37,11 +36,13 @@ from server import Server
 # lcd_api.py, machine_i2c_lcd.py
 from machine import I2C, Pin
 from machine_i2c_lcd import I2cLcd
+# Screen buffer writing only the changed characters to the LCD
+from lcd_screen import LcdScreen
 # Configuration read from config.py (must be uploaded to the picow prior testing)
 import config
 # Constants
 NAME = 'LCD Text Input'
-VERSION = 'v20230425'
+VERSION = 'v20261019'
 CRLF = chr(13) + chr(10)
 SPACE = chr(32)
 # LCD2004 Constants
@@ -87,8 +88,8 @@ def set_lcd_welcome(row1, row2):
     """
     LCD Initial text on row 1 & 2
     """
-    lcd.putstr(row1 + "\n" + row2)
-    sleep(.3)
+    screen.putstr(row1 + "\n" + row2)
+    screen.refresh()
 def handle_request(cmd, status):
     """
     Handle the LCD command defined as JSON object.
@@ -109,8 +110,8 @@ def handle_request(cmd, status):
     response[config.KEY_STATE] = config.STATE_OK
     # If the status is 1 set the LCD text else error
     if status == 1:
-        # Clear the LCD first
-        lcd.clear()
+        # Clear the screen buffer first, the unchanged characters are not written again
+        screen.clear()
         # Write the text input from the widget starting at col 0, row 0
         # Get the text
         text = cmd['text']
@@ -126,13 +127,14 @@ def handle_request(cmd, status):
                     response[config.KEY_STATE] = config.STATE_WARNING
                     print(response[config.KEY_MESSAGE])
                     line = line[0:lcd.num_columns]
-                lcd.putstrat(0, linenr, line)
+                screen.putstrat(0, linenr, line)
                 linenr = linenr + 1
             else:
                 response[config.KEY_MESSAGE] = f'[WARNING] Line {linenr} ("{line}") out of range 0-{lcd.num_lines - 1}.'
                 response[config.KEY_STATE] = config.STATE_WARNING
                 print(response[config.KEY_MESSAGE])
-        # sleep(.3)
+        # Write the changed characters only to the LCD
+        screen.refresh()
     else:
         response[config.KEY_MESSAGE] = config.MESSAGE_CMD_UNKNOWN
         response[config.KEY_STATE] = config.STATE_ERR
@@ -143,6 +145,8 @@ def handle_request(cmd, status):
 print(f'{NAME} {VERSION}')
 # Create the LCD object
 lcd = set_lcd(LCD_I2C_ADDRESS, LCD_PIN_SDA, LCD_PIN_SCL, LCD_ROWS, LCD_COLS)
+# Create the screen buffer for the LCD
+screen = LcdScreen(lcd)
 # Set the LCD display welcome text
 set_lcd_welcome(NAME, VERSION)
 # Create network object
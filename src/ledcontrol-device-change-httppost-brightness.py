@@ -8,6 +8,10 @@ Commands set via HTTP GET request with HTTP response JSON object.
 This script handles setting the led using the library picozero.
 The picozero LED class functions can be set via the POST request.
 Reference: https://picozero.readthedocs.io/en/latest/recipes.html#leds
+The brightness fades to the new value with gamma correction by the fade engine (pwmfade.py),
+the fade runs by timer so the server loop is not blocked. A new brightness during a fade continues from the current brightness.
+Toggle is set by the fader (off if lit, else on). Blink and pulse are run by picozero, the next fader command
+continues from the LED value at that moment (synced to the fader level), so there is no jump.
 :commands
 LED ON:
 curl -v -H "Content-Type: application/json" -d "{\"led\":\"red\",\"cmd\":\"on\",\"value\":0}" http://webserver-ip
@@ -18,7 +22,7 @@ curl -v -H "Content-Type: application/json" -d "{\"led\":\"red\",\"cmd\":\"off\"
 :note
 When using curl ensure to escape the " to \" in the JSON object.
 :log
-ledcontrol-device-change-httppost-brightness v20230409
+ledcontrol-device-change-httppost-brightness v20261019
 Network connected OK
 Network IP picow-ip
 Network listening on ('0.0.0.0', 80)
@@ -41,13 +45,17 @@ import json
 # Picozero - note: beta version
 import picozero
 from picozero import LED
+# Fade engine
+from pwmfade import Fader, LEVEL_MAX, LUT
 # Import network class
 from server import Server
 # Configuration read from config.py (must be uploaded to the picow prior testing)
 import config
 # Constants
 NAME = 'ledcontrol-device-change-httppost-brightness'
-VERSION = 'v20230409'
+VERSION = 'v20261019'
+# Brightness fade duration in ms
+FADE_DURATION = 800
 # Create the 3 LED objects GP2,3,4
 led_red = LED(2)
 led_red.off()
@@ -55,6 +63,29 @@ led_yellow = LED(3)
 led_yellow.off()
 led_green = LED(4)
 led_green.off()
+# Create the fader with a channel per LED, the fader sets the LED value 0-1
+fader = Fader(duration=FADE_DURATION)
+channels = {}
+for led in (led_red, led_yellow, led_green):
+    channels[led] = fader.add(lambda duty, led=led: setattr(led, 'value', duty / 65535))
+# Channels of the LEDs driven by picozero (blink, pulse), the fader level is not the LED value
+driven = set()
+"""
+Sync the fader level of a channel with the LED value, set by picozero.
+The level is the highest level with a duty by the gamma LUT not above the LED duty.
+:param object led
+    LED object created via led = LED(GPIO pin number)
+    
+:param int channel
+    Fader channel of the LED
+"""
+def sync_level(led, channel):
+    duty = round(led.value * 65535)
+    level = 0
+    while level < LEVEL_MAX and LUT[level + 1] <= duty:
+        level += 1
+    fader.channels[channel].level = level << 8
+    driven.discard(channel)
 """
 Control an LED.
 :param object led
@@ -67,20 +98,28 @@ Control an LED.
     Value for the command, like for brightness a float between 0-1
 """
 def set_led(led,cmd,value):
-    # Set the command
+    channel = channels[led]
+    # The fader continues from the LED value set by picozero
+    if channel in driven:
+        sync_level(led, channel)
+    # Set the command, the on, off & toggle levels are kept by the fader
     if cmd == 'on':
-        led.on()
+        fader.set(channel, LEVEL_MAX)
     elif cmd == 'off':
-        led.off()
+        fader.set(channel, 0)
     elif cmd == 'toggle':
-        led.toggle()
+        fader.set(channel, 0 if fader.level(channel) > 0 else LEVEL_MAX)
     elif cmd == 'blink':
+        fader.cancel(channel)
         led.blink()
+        driven.add(channel)
     elif cmd == 'pulse':
+        fader.cancel(channel)
         led.pulse()
+        driven.add(channel)
     elif cmd == 'brightness':
         if 0 <= value <= 1:
-            led.brightness = value
+            fader.fade(channel, round(value * LEVEL_MAX))
         else:
             print(f'[ERROR] Command {cmd} value {value} out of range 0-1.')
     else:
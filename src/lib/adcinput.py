@@ -0,0 +1,122 @@
+"""
+File:	adcinput.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Oversampled and filtered ADC input, i.e. a potentiometer setting a dimmer level 0-100.
+Each tick takes a burst of N samples into a preallocated array('H'), filters with an integer boxcar (mean of the burst)
+and an integer EMA, and quantises to the levels 0-steps with hysteresis.
+A level change event (callback) is raised only if the filtered value crosses a step by more than the hysteresis,
+so the level does not jitter between two steps.
+The ticks are paced by a periodic machine.Timer (start) or by calling tick() from the main loop or a scheduler task.
+:notes
+The EMA is kept as fixed point value << ema_shift, the weight of a new burst is 1 / 2**ema_shift (ema_shift 0 disables).
+The input range in_min - in_max is mapped to 0 - steps, values outside are clamped.
+The hysteresis is in raw ADC units beyond the half step.
+No floats and no allocation per tick. With the timer the callback runs in the timer callback,
+do network requests from the main loop (i.e. via a scheduler task).
+:usage
+from machine import ADC
+from adcinput import AdcInput
+pot = AdcInput(ADC(0), callback=lambda level: print(level))
+pot.start(period=20)
+"""
+# Imports
+from array import array
+from machine import Timer
+class AdcInput:
+    def __init__(self, adc, burst=8, ema_shift=2, steps=100, in_min=0, in_max=65535, hysteresis=128, callback=None):
+        """
+        Init the ADC input.
+        
+        :param ADC adc
+            ADC object with read_u16().
+        
+        :param int burst
+            Number of samples per tick, default 8.
+        
+        :param int ema_shift
+            EMA weight 1 / 2**ema_shift, default 2 (1/4).
+        
+        :param int steps
+            Number of levels, default 100 (level 0-100).
+        
+        :param int in_min
+            Raw value of level 0, default 0.
+        
+        :param int in_max
+            Raw value of level steps, default 65535.
+        
+        :param int hysteresis
+            Raw value beyond the half step to change the level, default 128.
+        
+        :param function callback
+            Function callback(level) called if the level changed.
+        """
+        self.adc = adc
+        self.burst = burst
+        self.ema_shift = ema_shift
+        self.steps = steps
+        self.in_min = in_min
+        self.span = in_max - in_min
+        self.hysteresis = hysteresis
+        self.callback = callback
+        self._samples = array('H', [0] * burst)
+        self._ema = None
+        self.value = 0
+        self.level = None
+        self.events = 0
+        self._timer = None
+        self._timer_callback = self._on_timer
+    def start(self, period=20):
+        """Start the ticks by periodic timer every period ms."""
+        if self._timer is None:
+            self._timer = Timer()
+        self._timer.init(mode=Timer.PERIODIC, period=period, callback=self._timer_callback)
+    def stop(self):
+        """Stop the timer."""
+        if self._timer is not None:
+            self._timer.deinit()
+    def _on_timer(self, timer):
+        self.tick()
+    def _filter(self):
+        """Take a burst and get the filtered raw value."""
+        samples = self._samples
+        adc = self.adc
+        for i in range(self.burst):
+            samples[i] = adc.read_u16()
+        box = sum(samples) // self.burst
+        if self._ema is None:
+            self._ema = box << self.ema_shift
+        else:
+            self._ema += box - (self._ema >> self.ema_shift)
+        return self._ema >> self.ema_shift
+    def tick(self):
+        """
+        Sample, filter & quantise, raise the level change event.
+        
+        :return bool
+            True if the level changed.
+        """
+        value = self._filter()
+        self.value = value
+        x = value - self.in_min
+        if x < 0:
+            x = 0
+        elif x > self.span:
+            x = self.span
+        steps = self.steps
+        span = self.span
+        if self.level is not None:
+            # Distance to the centre of the current step in raw units * steps
+            d = x * steps - self.level * span
+            if abs(d) * 2 <= span + 2 * self.hysteresis * steps:
+                return False
+        level = (x * steps + span // 2) // span
+        if level == self.level:
+            return False
+        self.level = level
+        self.events += 1
+        if self.callback is not None:
+            self.callback(level)
+        return True
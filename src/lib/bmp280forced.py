@@ -0,0 +1,217 @@
+"""
+File:	bmp280forced.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+BMP280 temperature & pressure driver for battery nodes with forced mode single shot sampling.
+The sensor sleeps between the samples, a sample triggers one conversion with the configured oversampling
+of temperature & pressure and IIR filter. The data registers (pressure & temperature) are read in one burst
+I2C transaction into a preallocated buffer and compensated together with the integer formulas of the datasheet,
+using the calibration coefficients read once at init.
+The conversion time (trigger to data ready) is measured per setting (oversampling), available with conversions and report().
+:notes
+Oversampling OSRS_SKIP, OSRS_X1 ... OSRS_X16, IIR filter IIR_OFF, IIR_2 ... IIR_16.
+Settings (osrs_t, osrs_p, iir) recommended by the datasheet: WEATHER (forced 1/min), LOW_POWER, INDOOR.
+measure() waits the typical conversion time with sleep_us and polls the status until the conversion is done.
+sample() is a sampler coroutine (sampler.py) yielding the conversion time, so other sensors sample in the meantime.
+The temperature resolution is 0.01 °C, the pressure resolution 1 Pa (32-bit integer compensation).
+:usage
+from machine import Pin, I2C
+from bmp280forced import BMP280Forced, WEATHER
+bmp = BMP280Forced(I2C(0, scl=Pin(1), sda=Pin(0), freq=200000), addr=0x77)
+bmp.configure(*WEATHER)
+temperature, pressure = bmp.measure()
+"""
+# Imports
+from time import sleep_us, ticks_us, ticks_diff
+from struct import unpack
+# Registers
+REG_CALIB = 0x88
+REG_ID = 0xD0
+REG_STATUS = 0xF3
+REG_CTRL_MEAS = 0xF4
+REG_CONFIG = 0xF5
+REG_DATA = 0xF7
+# Chip id BMP280
+CHIP_ID = 0x58
+# Status bit conversion running
+STATUS_MEASURING = 0x08
+# Power mode forced
+MODE_FORCED = 0x01
+# Oversampling
+OSRS_SKIP = 0
+OSRS_X1 = 1
+OSRS_X2 = 2
+OSRS_X4 = 3
+OSRS_X8 = 4
+OSRS_X16 = 5
+# IIR filter coefficient
+IIR_OFF = 0
+IIR_2 = 1
+IIR_4 = 2
+IIR_8 = 3
+IIR_16 = 4
+# Settings (osrs_t, osrs_p, iir)
+WEATHER = (OSRS_X1, OSRS_X1, IIR_OFF)
+LOW_POWER = (OSRS_X1, OSRS_X2, IIR_OFF)
+INDOOR = (OSRS_X2, OSRS_X16, IIR_16)
+# Time in us between two status polls
+POLL_US = 100
+def conversion_time(osrs_t, osrs_p, typical=True):
+    """
+    Get the conversion time in us of an oversampling setting by the datasheet.
+    
+    :param int osrs_t
+        Temperature oversampling.
+    
+    :param int osrs_p
+        Pressure oversampling.
+    
+    :param bool typical
+        Typical (True) or max time.
+    
+    :return int us
+    """
+    t = (1 << osrs_t) >> 1
+    p = (1 << osrs_p) >> 1
+    if typical:
+        return 1000 + 2000 * t + (2000 * p + 500 if p else 0)
+    return 1250 + 2300 * t + (2300 * p + 575 if p else 0)
+class BMP280Forced:
+    def __init__(self, i2c, addr=0x77, osrs_t=OSRS_X1, osrs_p=OSRS_X1, iir=IIR_OFF):
+        """
+        Init the sensor, read the calibration coefficients and configure the setting.
+        
+        :param I2C i2c
+            I2C bus.
+        
+        :param int addr
+            I2C address, default 0x77 (SDO high), 0x76 (SDO low).
+        
+        :param int osrs_t
+            Temperature oversampling, default OSRS_X1.
+        
+        :param int osrs_p
+            Pressure oversampling, default OSRS_X1.
+        
+        :param int iir
+            IIR filter coefficient, default IIR_OFF.
+        """
+        self.i2c = i2c
+        self.addr = addr
+        if i2c.readfrom_mem(addr, REG_ID, 1)[0] != CHIP_ID:
+            raise OSError('BMP280 not found')
+        # Calibration coefficients read once
+        (self._t1, self._t2, self._t3,
+         self._p1, self._p2, self._p3, self._p4, self._p5,
+         self._p6, self._p7, self._p8, self._p9) = unpack('<HhhHhhhhhhhh', i2c.readfrom_mem(addr, REG_CALIB, 24))
+        # Preallocated buffers
+        self._data = bytearray(6)
+        self._status = bytearray(1)
+        self._ctrl = bytearray(1)
+        # Measured conversion time in us per setting (osrs_t, osrs_p)
+        self.conversions = {}
+        self.conversion_us = 0
+        self._t0 = 0
+        self.t_fine = 0
+        self.temperature = None
+        self.pressure = None
+        self.configure(osrs_t, osrs_p, iir)
+    def configure(self, osrs_t=OSRS_X1, osrs_p=OSRS_X1, iir=IIR_OFF):
+        """
+        Set the oversampling & IIR filter, the sensor sleeps until a sample is triggered.
+        
+        :param int osrs_t
+            Temperature oversampling.
+        
+        :param int osrs_p
+            Pressure oversampling.
+        
+        :param int iir
+            IIR filter coefficient.
+        """
+        self.osrs_t = osrs_t
+        self.osrs_p = osrs_p
+        self.iir = iir
+        self.wait_us = conversion_time(osrs_t, osrs_p)
+        self._ctrl[0] = (osrs_t << 5) | (osrs_p << 2) | MODE_FORCED
+        # Sleep mode to write the config, the filter is reset
+        self.i2c.writeto_mem(self.addr, REG_CTRL_MEAS, bytes([self._ctrl[0] & 0xFC]))
+        self.i2c.writeto_mem(self.addr, REG_CONFIG, bytes([iir << 2]))
+    def trigger(self):
+        """
+        Start a forced mode conversion.
+        
+        :return int ms
+            Typical conversion time in ms (rounded up).
+        """
+        self._t0 = ticks_us()
+        self.i2c.writeto_mem(self.addr, REG_CTRL_MEAS, self._ctrl)
+        return (self.wait_us + 999) // 1000
+    def busy(self):
+        """Check if the conversion is running."""
+        self.i2c.readfrom_mem_into(self.addr, REG_STATUS, self._status)
+        return self._status[0] & STATUS_MEASURING != 0
+    def read(self):
+        """
+        Read the data registers in one burst and compensate, the conversion must be done.
+        
+        :return tuple reading
+            (temperature °C, pressure Pa)
+        """
+        while self.busy():
+            sleep_us(POLL_US)
+        self.conversion_us = ticks_diff(ticks_us(), self._t0)
+        self.conversions[(self.osrs_t, self.osrs_p)] = self.conversion_us
+        data = self._data
+        self.i2c.readfrom_mem_into(self.addr, REG_DATA, data)
+        adc_p = (data[0] << 12) | (data[1] << 4) | (data[2] >> 4)
+        adc_t = (data[3] << 12) | (data[4] << 4) | (data[5] >> 4)
+        t = self._compensate_t(adc_t)
+        self.temperature = t / 100
+        self.pressure = self._compensate_p(adc_p) if self.osrs_p != OSRS_SKIP else None
+        return (self.temperature, self.pressure)
+    def measure(self):
+        """
+        Trigger a conversion, wait until done and read.
+        
+        :return tuple reading
+            (temperature °C, pressure Pa)
+        """
+        self.trigger()
+        sleep_us(self.wait_us)
+        return self.read()
+    def sample(self):
+        """Sampler coroutine yielding the conversion time in ms and returning the reading."""
+        yield self.trigger()
+        return self.read()
+    def _compensate_t(self, adc_t):
+        """Get the temperature in 0.01 °C, sets t_fine."""
+        var1 = (((adc_t >> 3) - (self._t1 << 1)) * self._t2) >> 11
+        var2 = (adc_t >> 4) - self._t1
+        var2 = (((var2 * var2) >> 12) * self._t3) >> 14
+        self.t_fine = var1 + var2
+        return (self.t_fine * 5 + 128) >> 8
+    def _compensate_p(self, adc_p):
+        """Get the pressure in Pa, uses t_fine of the temperature."""
+        var1 = (self.t_fine >> 1) - 64000
+        var2 = (((var1 >> 2) * (var1 >> 2)) >> 11) * self._p6
+        var2 = var2 + ((var1 * self._p5) << 1)
+        var2 = (var2 >> 2) + (self._p4 << 16)
+        var1 = (((self._p3 * (((var1 >> 2) * (var1 >> 2)) >> 13)) >> 3) + ((self._p2 * var1) >> 1)) >> 18
+        var1 = ((32768 + var1) * self._p1) >> 15
+        if var1 == 0:
+            return 0
+        p = (((1048576 - adc_p) - (var2 >> 12)) * 3125) & 0xFFFFFFFF
+        if p < 0x80000000:
+            p = (p << 1) // var1
+        else:
+            p = (p // var1) * 2
+        var1 = (self._p9 * (((p >> 3) * (p >> 3)) >> 13)) >> 12
+        var2 = ((p >> 2) * self._p8) >> 13
+        return p + ((var1 + var2 + self._p7) >> 4)
+    def report(self):
+        """Get the typical & measured conversion time per setting as list of text lines."""
+        return [f'osrs_t={osrs_t}, osrs_p={osrs_p}: typical={conversion_time(osrs_t, osrs_p)}us, '
+                f'max={conversion_time(osrs_t, osrs_p, False)}us, measured={us}us'
+                for ((osrs_t, osrs_p), us) in self.conversions.items()]
@@ -0,0 +1,180 @@
+"""
+File:	dhtsampler.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Background sampler for the DHT22 (DHT11) temperature & humidity sensor with retries and a cached reading.
+A read of the DHT fails now and then (timeout or checksum error), a failed read is retried with backoff
+instead of losing the sample. The sensor is read at most every MIN_INTERVAL (2s for the DHT22).
+The last good reading is cached with its time, reads are served from the cache without blocking,
+so the main loop (i.e. sending to Domoticz) does not wait for the sensor.
+The ticks are paced by a periodic machine.Timer (start) or by calling tick() from the main loop or a scheduler task.
+:notes
+A sample is taken every period ms. On a failed read the sensor is read again after MIN_INTERVAL, 2 * MIN_INTERVAL, ...
+up to retries times, then the sample is counted as missed and the next sample is taken at the next period.
+A reading outside the sensor range is counted as invalid and retried as a failed read.
+The cached reading is valid if not older than max_age ms (default 3 periods), the age is available with age().
+Counters: reads (sensor reads), timeouts (OSError), checksums (checksum error), invalid (out of range),
+retried (retries), missed (samples without reading), the error rate is the failed reads / reads.
+:usage
+from machine import Pin
+from dht import DHT22
+from dhtsampler import DhtSampler
+dht = DhtSampler(DHT22(Pin(22, Pin.IN, Pin.PULL_UP)), period=60000, callback=lambda t, h: print(t, h))
+dht.start()
+reading = dht.read()
+"""
+# Imports
+from machine import Timer
+from time import ticks_ms, ticks_add, ticks_diff
+# Min time in ms between two reads of the DHT22
+MIN_INTERVAL = 2000
+# Sensor range DHT22
+TEMPERATURE_MIN = -40
+TEMPERATURE_MAX = 80
+class DhtSampler:
+    def __init__(self, sensor, period=60000, retries=3, max_age=None, min_interval=MIN_INTERVAL, callback=None):
+        """
+        Init the sampler, the first sample is taken at the first tick.
+        
+        :param DHT22 sensor
+            DHT object with measure(), temperature() and humidity().
+        
+        :param int period
+            Sampling period in ms, default 60000, min min_interval.
+        
+        :param int retries
+            Max number of retries of a failed read per sample, default 3.
+        
+        :param int max_age
+            Max age in ms of a valid reading, default None (3 periods).
+        
+        :param int min_interval
+            Min time in ms between two reads, default MIN_INTERVAL (2000, DHT11 1000).
+        
+        :param function callback
+            Function callback(temperature, humidity) called with a new reading.
+        """
+        self.sensor = sensor
+        self.min_interval = min_interval
+        self.period = max(period, min_interval)
+        self.retries = retries
+        self.max_age = 3 * self.period if max_age is None else max_age
+        self.callback = callback
+        # Cached reading
+        self.temperature = None
+        self.humidity = None
+        self.time = 0
+        # Due time of the next read & of the next sample
+        self.due = ticks_ms()
+        self._sample_due = self.due
+        self._failures = 0
+        # Counters
+        self.reads = 0
+        self.timeouts = 0
+        self.checksums = 0
+        self.invalid = 0
+        self.retried = 0
+        self.missed = 0
+        self._timer = None
+        self._timer_callback = self._on_timer
+    def start(self):
+        """Start the ticks by periodic timer every min interval."""
+        if self._timer is None:
+            self._timer = Timer()
+        self._timer.init(mode=Timer.PERIODIC, period=self.min_interval, callback=self._timer_callback)
+    def stop(self):
+        """Stop the timer."""
+        if self._timer is not None:
+            self._timer.deinit()
+    def _on_timer(self, timer):
+        self.tick()
+    def _measure(self):
+        """Read the sensor, count the error and get the reading or None."""
+        self.reads += 1
+        try:
+            self.sensor.measure()
+            temperature = self.sensor.temperature()
+            humidity = self.sensor.humidity()
+        except OSError:
+            self.timeouts += 1
+            return None
+        except Exception:
+            self.checksums += 1
+            return None
+        if not (TEMPERATURE_MIN <= temperature <= TEMPERATURE_MAX and 0 <= humidity <= 100):
+            self.invalid += 1
+            return None
+        return (temperature, humidity)
+    def _next_sample(self, now):
+        """Set the due time of the next sample, missed periods are skipped."""
+        late = ticks_diff(now, self._sample_due)
+        self._sample_due = ticks_add(self._sample_due, (late // self.period + 1) * self.period)
+        self.due = self._sample_due
+        self._failures = 0
+    def tick(self, now=None):
+        """
+        Read the sensor if a sample or retry is due.
+        
+        :param int now
+            Time in ms, default None uses ticks_ms().
+        
+        :return bool
+            True if a new reading is cached.
+        """
+        if now is None:
+            now = ticks_ms()
+        if ticks_diff(now, self.due) < 0:
+            return False
+        reading = self._measure()
+        if reading is None:
+            if self._failures < self.retries:
+                # Retry with backoff, not later than the next sample
+                due = ticks_add(now, self.min_interval << self._failures)
+                if ticks_diff(due, ticks_add(self._sample_due, self.period)) > 0:
+                    self.missed += 1
+                    self._next_sample(now)
+                else:
+                    self._failures += 1
+                    self.retried += 1
+                    self.due = due
+            else:
+                self.missed += 1
+                self._next_sample(now)
+            return False
+        (self.temperature, self.humidity) = reading
+        self.time = now
+        self._next_sample(now)
+        if self.callback is not None:
+            self.callback(self.temperature, self.humidity)
+        return True
+    def age(self, now=None):
+        """Get the age in ms of the cached reading, None if no reading."""
+        if self.temperature is None:
+            return None
+        return ticks_diff(ticks_ms() if now is None else now, self.time)
+    def valid(self, now=None):
+        """Check if the cached reading is not older than max age."""
+        age = self.age(now)
+        return age is not None and age <= self.max_age
+    def read(self, now=None):
+        """
+        Get the cached reading without reading the sensor.
+        
+        :param int now
+            Time in ms, default None uses ticks_ms().
+        
+        :return tuple reading
+            (temperature, humidity) or None if no valid reading.
+        """
+        return (self.temperature, self.humidity) if self.valid(now) else None
+    def errors(self):
+        """Get the number of failed reads."""
+        return self.timeouts + self.checksums + self.invalid
+    def error_rate(self):
+        """Get the failed reads / reads (0-1)."""
+        return self.errors() / self.reads if self.reads > 0 else 0
+    def report(self):
+        """Get the counters as text line."""
+        return (f'reads={self.reads}, timeouts={self.timeouts}, checksums={self.checksums}, invalid={self.invalid}, '
+                f'retries={self.retried}, missed={self.missed}, error_rate={self.error_rate() * 100:.1f}%')
@@ -0,0 +1,148 @@
+"""
+File:	irqevents.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+ISR-safe event layer for pin interrupts, i.e. PIR motion sensors and buttons.
+The interrupt handler only stores the ticks_ms timestamp and the source number in a preallocated ring buffer
+and schedules the dispatcher with micropython.schedule. It does not allocate memory, build strings,
+sleep or do network I/O, so it can run as hard interrupt.
+The dispatcher runs outside interrupt context, debounces, coalesces retriggers and calls the callback of the source.
+:notes
+Debounce: a trigger within debounce ms of the previous trigger of the same source is dropped (contact bounce).
+Coalesce: triggers within holdoff ms after the last callback of the same source do not call the callback again,
+they are counted and passed as count to the next callback. Use the holdoff for a PIR retriggering whilst motion continues.
+The callback is called as callback(ticks, count) with the ticks_ms of the trigger and the number of triggers coalesced incl. this one.
+If the ring buffer is full, the trigger is dropped and counted in dropped.
+With schedule=False the dispatcher is not scheduled, call dispatch() from the main loop,
+i.e. to keep long network requests out of the scheduler queue.
+On the host (tests/emulator) micropython.schedule calls the dispatcher directly.
+:usage
+from machine import Pin
+from irqevents import IrqEvents
+def motion(ticks, count):
+    print('Motion detected', count)
+events = IrqEvents()
+events.add(Pin(13, Pin.IN, Pin.PULL_UP), motion, trigger=Pin.IRQ_RISING, debounce=100, holdoff=10000)
+"""
+# Imports
+from array import array
+from machine import Pin
+from micropython import schedule
+from time import ticks_ms, ticks_diff
+class IrqEvents:
+    def __init__(self, size=16, schedule=True):
+        """
+        Init the event layer with a preallocated ring buffer.
+        
+        :param int size
+            Number of triggers the ring buffer holds until dispatched, default 16.
+        
+        :param bool schedule
+            Schedule the dispatcher from the interrupt handler, default True.
+        """
+        self.size = size
+        self.schedule = schedule
+        # Ring buffer with the ticks_ms and the source number of the triggers
+        self._ticks = array('I', [0] * size)
+        self._sources = array('B', [0] * size)
+        self._head = 0
+        self._tail = 0
+        self._scheduled = False
+        # Bound method created once, the interrupt handler must not allocate
+        self._dispatch_ref = self.dispatch
+        # Per source: callback, debounce & holdoff in ms, ticks of the last trigger & callback, triggers coalesced
+        self._callbacks = []
+        self._debounce = []
+        self._holdoff = []
+        self._last = []
+        self._fired = []
+        self._count = []
+        # Counters
+        self.dropped = 0
+        self.debounced = 0
+        self.coalesced = 0
+        self.dispatched = 0
+    def add(self, pin, callback, trigger=Pin.IRQ_RISING, debounce=50, holdoff=0, hard=True):
+        """
+        Add a pin as event source and set its interrupt handler.
+        
+        :param Pin pin
+            Input pin.
+        
+        :param function callback
+            Function callback(ticks, count) called by the dispatcher.
+        
+        :param int trigger
+            Pin trigger, default Pin.IRQ_RISING.
+        
+        :param int debounce
+            Time in ms a retrigger is dropped as bounce, default 50.
+        
+        :param int holdoff
+            Time in ms after a callback the triggers are coalesced, default 0 (no coalescing).
+        
+        :param bool hard
+            Hard interrupt, default True.
+        
+        :return int source
+            Source number.
+        """
+        source = len(self._callbacks)
+        self._callbacks.append(callback)
+        self._debounce.append(debounce)
+        self._holdoff.append(holdoff)
+        self._last.append(None)
+        self._fired.append(None)
+        self._count.append(0)
+        pin.irq(handler=lambda p, source=source: self._irq(source), trigger=trigger, hard=hard)
+        return source
+    def _irq(self, source):
+        """Interrupt handler: timestamp and enqueue the trigger, schedule the dispatcher."""
+        head = self._head
+        nxt = head + 1
+        if nxt == self.size:
+            nxt = 0
+        if nxt == self._tail:
+            self.dropped += 1
+            return
+        self._ticks[head] = ticks_ms()
+        self._sources[head] = source
+        self._head = nxt
+        if self.schedule and not self._scheduled:
+            self._scheduled = True
+            schedule(self._dispatch_ref, 0)
+    def pending(self):
+        """Get the number of triggers in the ring buffer."""
+        return (self._head - self._tail) % self.size
+    def dispatch(self, arg=None):
+        """
+        Dispatch the triggers in the ring buffer, outside interrupt context.
+        
+        :param int arg
+            Argument passed by micropython.schedule, not used.
+        """
+        self._scheduled = False
+        while self._tail != self._head:
+            tail = self._tail
+            ticks = self._ticks[tail]
+            source = self._sources[tail]
+            self._tail = tail + 1 if tail + 1 < self.size else 0
+            self._handle(source, ticks)
+    def _handle(self, source, ticks):
+        """Debounce and coalesce a trigger, call the callback if not held off."""
+        last = self._last[source]
+        self._last[source] = ticks
+        if last is not None and ticks_diff(ticks, last) < self._debounce[source]:
+            self.debounced += 1
+            return
+        fired = self._fired[source]
+        self._count[source] += 1
+        if fired is not None and ticks_diff(ticks, fired) < self._holdoff[source]:
+            self.coalesced += 1
+            return
+        count = self._count[source]
+        self._count[source] = 0
+        self._fired[source] = ticks
+        self.dispatched += 1
+        self._callbacks[source](ticks, count)
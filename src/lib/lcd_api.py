@@ -120,19 +120,40 @@ class LcdApi:
         else:
             self.hal_write_data(ord(char))
             self.cursor_x += 1
+        self.wrap(char != '\n')
+    """NEW: rwbl"""
+    def wrap(self, implied_newline=True):
+        """Moves the cursor to the start of the next line if the end of the
+        line is reached. Within a line the LCD increments the address itself,
+        so the cursor is only repositioned on a line change.
+        """
         if self.cursor_x >= self.num_columns:
             self.cursor_x = 0
             self.cursor_y += 1
-            self.implied_newline = (char != '\n')
-        if self.cursor_y >= self.num_lines:
-            self.cursor_y = 0
-        self.move_to(self.cursor_x, self.cursor_y)
+            self.implied_newline = implied_newline
+            if self.cursor_y >= self.num_lines:
+                self.cursor_y = 0
+            self.move_to(self.cursor_x, self.cursor_y)
     def putstr(self, string):
         """Write the indicated string to the LCD at the current cursor
         position and advances the cursor position appropriately.
+        The characters up to the end of the line are written as one run.
         """
-        for char in string:
-            self.putchar(char)
+        i = 0
+        n = len(string)
+        while i < n:
+            if string[i] == '\n':
+                self.putchar('\n')
+                i += 1
+                continue
+            end = min(n, i + self.num_columns - self.cursor_x)
+            j = i
+            while j < end and string[j] != '\n':
+                j += 1
+            self.hal_write_chars(string[i:j])
+            self.cursor_x += j - i
+            self.wrap()
+            i = j
     """NEW: rwbl"""
     def clrrow(self, row):
         """Clear a row by writing spaces.
@@ -189,6 +210,18 @@ class LcdApi:
         function.
         """
         raise NotImplementedError
+    """NEW: rwbl"""
+    def hal_write_chars(self, chars):
+        """Write several characters (string or bytes) to the LCD.
+        This default writes each character with hal_write_data. A derived
+        HAL class can send the characters in a single transfer instead.
+        """
+        if isinstance(chars, str):
+            for char in chars:
+                self.hal_write_data(ord(char))
+        else:
+            for data in chars:
+                self.hal_write_data(data)
     # This is a default implementation of hal_sleep_us which is suitable
     # for most micropython implementations. For platforms which don't
     # support `time.sleep_us()` they should provide their own implementation
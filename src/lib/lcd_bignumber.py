@@ -0,0 +1,138 @@
+"""
+File:	lcd_bignumber.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Big numbers 3 columns wide and 2 rows high for HD44780 character LCDs (i.e. LCD2004), i.e. to show a temperature.
+The digits are built from 3 custom characters (top bar, bottom bar, top & bottom bar) and the full block 0xFF.
+The custom characters are managed by the glyph cache (lcd_glyphcache.py), so they are uploaded once
+and the other CGRAM slots remain free for the project.
+Only the characters which changed since the previous number are written to the LCD.
+:notes
+Supported characters: 0-9, dash, space, C, dot (1 column) and star (degrees, 1 column).
+Each 3 column character is followed by a blank column.
+Characters beyond the last column of the LCD are not shown.
+The target can be the LCD or a screen buffer (lcd_screen.py), the custom characters are always uploaded to the LCD.
+:usage
+from lcd_bignumber import BigNumber
+cache = GlyphCache(lcd)
+bignumber = BigNumber(cache, col=0, row=1)
+bignumber.show('21.5*C')
+"""
+# Custom characters 5x8
+GLYPHS = {
+    'T': bytes([0x1F, 0x1F, 0x1F, 0x00, 0x00, 0x00, 0x00, 0x00]),	# top bar
+    'B': bytes([0x00, 0x00, 0x00, 0x00, 0x00, 0x1F, 0x1F, 0x1F]),	# bottom bar
+    'M': bytes([0x1F, 0x1F, 0x1F, 0x00, 0x00, 0x1F, 0x1F, 0x1F]),	# top & bottom bar
+}
+# Characters of the LCD ROM (A00) used
+ROM = {'F': 0xFF, ' ': 0x20, '.': 0x2E, 'o': 0xDF}
+# Font with the upper and lower row per character
+FONT = {
+    '0': ('FTF', 'FBF'),
+    '1': ('TF ', 'BFB'),
+    '2': ('MMF', 'FBB'),
+    '3': ('MMF', 'BBF'),
+    '4': ('FBF', '  F'),
+    '5': ('FMM', 'BBF'),
+    '6': ('FMM', 'FBF'),
+    '7': ('TTF', '  F'),
+    '8': ('FMF', 'FBF'),
+    '9': ('FMF', 'BBF'),
+    '-': ('BBB', '   '),
+    ' ': ('   ', '   '),
+    'C': ('FTT', 'FBB'),
+    'c': ('FTT', 'FBB'),
+    '.': (' ', '.'),
+    '*': ('o', ' '),
+}
+class BigNumber:
+    def __init__(self, cache, target=None, col=0, row=0):
+        """
+        Init the big number at col, row.
+        
+        :param GlyphCache cache
+            Glyph cache of the LCD.
+        
+        :param object target
+            LCD or screen buffer to write the characters to. Default None = the LCD of the cache.
+        
+        :param int col
+            Column of the first character.
+        
+        :param int row
+            Upper row, the number uses row and row + 1.
+        """
+        self.cache = cache
+        self.target = cache.lcd if target is None else target
+        self.col = col
+        self.row = row
+        # Characters shown as list of (col, char), end column (exclusive)
+        self._cells = []
+        self._end = col
+        # Glyphs locked by the characters shown
+        self._locked = {}
+    def _width(self, char):
+        # Number of columns including the blank column after a 3 column character
+        width = len(FONT[char][0])
+        return width + 1 if width > 1 else width
+    def _lock(self, string):
+        # Lock the glyphs used by the string before releasing the glyphs no longer used
+        used = {}
+        for char in string:
+            for cell in FONT[char][0] + FONT[char][1]:
+                if cell in GLYPHS and cell not in used:
+                    used[cell] = self._locked[cell] if cell in self._locked else self.cache.lock(GLYPHS[cell])
+        for cell in self._locked:
+            if cell not in used:
+                self.cache.unlock(GLYPHS[cell])
+        self._locked = used
+    def _code(self, cell):
+        return chr(self._locked[cell]) if cell in GLYPHS else chr(ROM[cell])
+    def _draw(self, col, char):
+        # Write the 2 rows of a character including the blank column
+        width = self._width(char)
+        for i in range(2):
+            text = ''
+            for cell in FONT[char][i]:
+                text += self._code(cell)
+            if width > len(text):
+                text += ' '
+            self.target.putstrat(col, self.row + i, text[0:self.target.num_columns - col])
+    def show(self, string):
+        """
+        Show a string of big characters. Only the changed characters are written.
+        
+        :param string string
+            Characters 0-9, dash, space, C, dot or star (degrees), i.e. '21.5*C'.
+        
+        :return int
+            Number of characters written.
+        """
+        for char in string:
+            if char not in FONT:
+                raise ValueError("[ERROR] BigNumber character not supported: '{:s}'".format(char))
+        self._lock(string)
+        cells = []
+        col = self.col
+        written = 0
+        for char in string:
+            if col >= self.target.num_columns:
+                break
+            cell = (col, char)
+            cells.append(cell)
+            if cell not in self._cells:
+                self._draw(col, char)
+                written += 1
+            col += self._width(char)
+        # Clear the columns of the previous number beyond the new number
+        end = min(col, self.target.num_columns)
+        if self._end > end:
+            for i in range(2):
+                self.target.putstrat(end, self.row + i, ' ' * (self._end - end))
+        self._cells = cells
+        self._end = end
+        return written
+    def clear(self):
+        """Clear the big number and release the glyphs."""
+        self.show('')
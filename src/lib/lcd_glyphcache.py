@@ -0,0 +1,99 @@
+"""
+File:	lcd_glyphcache.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+CGRAM slot manager for HD44780 character LCDs driven by LcdApi (i.e. I2cLcd).
+The HD44780 has 8 CGRAM slots for custom characters, available as chr(0) through chr(7).
+LcdApi.custom_char uploads a glyph every time it is called.
+The glyph cache remembers which glyph is resident in which slot and uploads a glyph only if not resident.
+If all slots are used, the least recently used slot is evicted.
+:notes
+A glyph is a bytes or bytearray object with 8 rows of 5 bits.
+Changing a slot changes all characters on the LCD using that slot.
+Therefore glyphs shown on the LCD are locked with lock() and released with unlock(), locked slots are not evicted.
+If all slots are locked, a RuntimeError is raised.
+:usage
+from lcd_glyphcache import GlyphCache
+cache = GlyphCache(lcd)
+BELL = bytes([0x04, 0x0E, 0x0E, 0x0E, 0x1F, 0x00, 0x04, 0x00])
+lcd.putstrat(0, 0, chr(cache.get(BELL)))
+"""
+# Number of CGRAM slots
+SLOTS = 8
+class GlyphCache:
+    def __init__(self, lcd):
+        """
+        Init the glyph cache for an LCD. The CGRAM content is unknown, so the first use of a glyph uploads it.
+        
+        :param object lcd
+            LcdApi object, i.e. I2cLcd.
+        """
+        self.lcd = lcd
+        # Glyph per slot, slot per glyph
+        self._glyphs = [None] * SLOTS
+        self._slots = {}
+        # Use counter per slot for the LRU eviction, lock count per slot
+        self._used = [0] * SLOTS
+        self._locks = [0] * SLOTS
+        self._clock = 0
+        # Number of hits and uploads (statistics)
+        self.hits = 0
+        self.uploads = 0
+    def _evict(self):
+        # Get a free slot or else the least recently used slot which is not locked
+        slot = -1
+        for i in range(SLOTS):
+            if self._locks[i] > 0:
+                continue
+            if self._glyphs[i] is None:
+                return i
+            if slot < 0 or self._used[i] < self._used[slot]:
+                slot = i
+        if slot < 0:
+            raise RuntimeError('[ERROR] GlyphCache all CGRAM slots locked.')
+        del self._slots[self._glyphs[slot]]
+        self._glyphs[slot] = None
+        return slot
+    def get(self, glyph):
+        """
+        Get the slot of a glyph, the glyph is uploaded to the CGRAM if not resident.
+        
+        :param bytes glyph
+            8 rows of 5 bits.
+        
+        :return int
+            Slot 0-7, write as chr(slot).
+        """
+        glyph = bytes(glyph)
+        slot = self._slots.get(glyph)
+        if slot is None:
+            slot = self._evict()
+            self.lcd.custom_char(slot, glyph)
+            self._glyphs[slot] = glyph
+            self._slots[glyph] = slot
+            self.uploads += 1
+        else:
+            self.hits += 1
+        self._clock += 1
+        self._used[slot] = self._clock
+        return slot
+    def lock(self, glyph):
+        """Get the slot of a glyph and lock it, so the slot is not evicted whilst shown on the LCD."""
+        slot = self.get(glyph)
+        self._locks[slot] += 1
+        return slot
+    def unlock(self, glyph):
+        """Release a lock of a glyph."""
+        slot = self._slots.get(bytes(glyph))
+        if slot is not None and self._locks[slot] > 0:
+            self._locks[slot] -= 1
+    def resident(self, glyph):
+        """Check if a glyph is resident in the CGRAM."""
+        return bytes(glyph) in self._slots
+    def reset(self):
+        """Forget all slots, i.e. after the LCD has been initialised again."""
+        self._glyphs = [None] * SLOTS
+        self._slots = {}
+        self._used = [0] * SLOTS
+        self._locks = [0] * SLOTS
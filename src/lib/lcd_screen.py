@@ -0,0 +1,214 @@
+"""
+File:	lcd_screen.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Virtual screen buffer with diff-based refresh for HD44780 character LCDs driven by LcdApi (i.e. I2cLcd).
+The projects clear rows by writing spaces and then write the full text again on every Domoticz update,
+which flickers and keeps the I2C bus busy.
+The text functions of the screen only change a character buffer in RAM.
+refresh() compares the buffer with the characters on the LCD and writes only the changed runs of characters.
+Changed runs separated by up to MERGE_GAP unchanged characters are written as one run,
+because a cursor move costs as much bus time as writing a few characters.
+:notes
+The text functions clip the text at the end of the row (no wrap), except putstr which wraps like LcdApi.
+Call refresh() after the changes, or poll() from the main loop. poll() refreshes if changes are pending
+and the interval passed since the first change, so a burst of changes (i.e. clear row + several texts) is written as one frame.
+The screen is not refreshed from a timer callback, which could interleave with the HD44780 nibble sequences
+of a write from the main loop. Call the text functions and refresh from the same (main) context.
+The LCD must not be written directly whilst using the screen, else call invalidate() to redraw all.
+:usage
+from machine_i2c_lcd import I2cLcd
+from lcd_screen import LcdScreen
+lcd = I2cLcd(i2c, 0x27, 4, 20)
+screen = LcdScreen(lcd)
+screen.clrrow(3)
+screen.putstrat(0, 3, 'T:41')
+screen.refresh()
+"""
+# Imports
+from time import ticks_ms, ticks_diff
+# Max number of unchanged characters between two changed runs to write both as one run
+MERGE_GAP = 2
+class LcdScreen:
+    def __init__(self, lcd, interval=0):
+        """
+        Init the screen buffer for an LCD. The LCD is expected to be cleared (as after init).
+        
+        :param object lcd
+            LcdApi object, i.e. I2cLcd.
+        
+        :param int interval
+            Time in ms poll() batches changes into one refresh. Default 0 = poll() refreshes any pending change.
+        """
+        self.lcd = lcd
+        self.num_lines = lcd.num_lines
+        self.num_columns = lcd.num_columns
+        size = self.num_lines * self.num_columns
+        # Characters to show and characters shown on the LCD
+        self.buffer = bytearray(b' ' * size)
+        self.shown = bytearray(b' ' * size)
+        self._mv = memoryview(self.buffer)
+        # Flag to write the full screen at the next refresh, any character code can be in the buffer
+        self._full = False
+        # Cursor used by putstr
+        self.cursor_x = 0
+        self.cursor_y = 0
+        self.implied_newline = False
+        # Rate-limited refresh by poll()
+        self.interval = interval
+        self._pending = False
+        self._since = 0
+        # Number of refreshes and runs written (statistics)
+        self.refreshes = 0
+        self.runs = 0
+    def _changed(self):
+        # Mark a refresh pending since the first change, changes made in the meantime are included
+        if not self._pending:
+            self._pending = True
+            self._since = ticks_ms()
+    def poll(self):
+        """
+        Refresh if changes are pending and the interval passed since the first change. Call from the main loop.
+        
+        :return int
+            Number of runs written, 0 if not refreshed.
+        """
+        if self._pending and ticks_diff(ticks_ms(), self._since) >= self.interval:
+            return self.refresh()
+        return 0
+    def _put(self, col, row, string):
+        # Write the string into the buffer at col, row clipped at the end of the row
+        if not 0 <= row < self.num_lines or not 0 <= col < self.num_columns:
+            return 0
+        buf = self.buffer
+        pos = row * self.num_columns + col
+        n = min(len(string), self.num_columns - col)
+        for i in range(n):
+            buf[pos + i] = ord(string[i]) & 0xff
+        return n
+    def putstrat(self, col, row, string):
+        """
+        Write a string at col, row. The string is clipped at the end of the row.
+        
+        :param int col
+            Column 0 - num_columns-1.
+        
+        :param int row
+            Row 0 - num_lines-1.
+        
+        :param string string
+            Text to write.
+        """
+        self._put(col, row, string)
+        self._changed()
+    def putstr(self, string):
+        """
+        Write a string at the cursor position, a newline or the end of the row moves to the next row.
+        A newline directly after a full row is ignored as by LcdApi.
+        """
+        for char in string:
+            if char == '\n':
+                if self.implied_newline:
+                    self.implied_newline = False
+                    continue
+                self.cursor_x = self.num_columns
+            else:
+                self._put(self.cursor_x, self.cursor_y, char)
+                self.cursor_x += 1
+            self.implied_newline = False
+            if self.cursor_x >= self.num_columns:
+                self.cursor_x = 0
+                self.cursor_y = (self.cursor_y + 1) % self.num_lines
+                self.implied_newline = (char != '\n')
+        self._changed()
+    def move_to(self, col, row):
+        """Move the cursor used by putstr."""
+        self.cursor_x = col
+        self.cursor_y = row
+        self.implied_newline = False
+    def rows(self, *rows):
+        """Set the text of the rows starting at row 0. The rest of each row is cleared."""
+        for row in range(min(len(rows), self.num_lines)):
+            self.clrrow(row)
+            self._put(0, row, rows[row])
+        self._changed()
+    def clrtext(self, col, row, cols):
+        """Clear a text area by setting spaces."""
+        if not 0 <= row < self.num_lines:
+            return
+        pos = row * self.num_columns
+        buf = self.buffer
+        for i in range(max(0, col), min(col + cols, self.num_columns)):
+            buf[pos + i] = 32
+        self._changed()
+    def clrrow(self, row):
+        """Clear a row by setting spaces."""
+        self.clrtext(0, row, self.num_columns)
+    def clear(self):
+        """Clear all rows by setting spaces. The LCD clear command (5ms) is not used."""
+        buf = self.buffer
+        for i in range(len(buf)):
+            buf[i] = 32
+        self.cursor_x = 0
+        self.cursor_y = 0
+        self.implied_newline = False
+        self._changed()
+    def invalidate(self):
+        """Mark all characters as unknown, so the next refresh writes the full screen."""
+        self._full = True
+        self._changed()
+    def refresh(self):
+        """
+        Write the changed runs of characters to the LCD.
+        
+        :return int
+            Number of runs written.
+        """
+        self._pending = False
+        lcd = self.lcd
+        cols = self.num_columns
+        buf = self.buffer
+        shown = self.shown
+        mv = self._mv
+        runs = 0
+        if self._full:
+            # Write all rows, one run per row
+            self._full = False
+            for row in range(self.num_lines):
+                base = row * cols
+                lcd.move_to(0, row)
+                lcd.hal_write_chars(mv[base:base + cols])
+                lcd.cursor_x = cols
+                runs += 1
+            shown[:] = buf
+            self.refreshes += 1
+            self.runs += runs
+            return runs
+        for row in range(self.num_lines):
+            base = row * cols
+            col = 0
+            while col < cols:
+                if buf[base + col] == shown[base + col]:
+                    col += 1
+                    continue
+                # Find the end of the run including short gaps of unchanged characters
+                start = col
+                end = col + 1
+                col += 1
+                while col < cols:
+                    if buf[base + col] != shown[base + col]:
+                        col += 1
+                        end = col
+                    elif col - end < MERGE_GAP:
+                        col += 1
+                    else:
+                        break
+                lcd.move_to(start, row)
+                lcd.hal_write_chars(mv[base + start:base + end])
+                lcd.cursor_x = end
+                shown[base + start:base + end] = mv[base + start:base + end]
+                runs += 1
+        self.refreshes += 1
+        self.runs += runs
+        return runs
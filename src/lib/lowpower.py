@@ -0,0 +1,214 @@
+"""
+File:	lowpower.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Low-power main loop scheduler replacing idle spins like while True: pass, which keep the CPU at full power
+whilst waiting for pin interrupt callbacks (i.e. picozero button callbacks).
+Periodic and one-shot tasks are scheduled by deadline (ticks_ms). Between the deadlines the CPU is parked:
+with time.sleep_ms() in slices of max POLL_SLICE ms, with select.poll on registered sockets
+or, if enabled, with machine.lightsleep() for longer waits.
+A pin interrupt handler or scheduled callback can end the wait early with wake().
+The measurement hook accounts the time busy (tasks), idle and in lightsleep and reports the idle ratio,
+the number of wakeups (returns from a sleep, poll or lightsleep to the scheduler) and the estimated current draw.
+:notes
+The deadline of a periodic task is advanced by the period (not from the time the task ran), so it does not drift.
+If a task is late by more than a period, the missed runs are skipped.
+The estimated current is the average of the currents in mA per state weighted by the time in the state.
+RUN_MA CPU running tasks, IDLE_MA CPU sleeping or polling, LIGHTSLEEP_MA lightsleep.
+The defaults are rough values for a Pico W with WiFi connected, not measured. The current depends on the board,
+the clock, the WiFi power mode and the connected devices: measure the own board once and pass the values with currents.
+machine.idle() is not used to park, it returns on every systick (1000 wakeups/s).
+Lightsleep stops the clocks incl. USB, on the Pico W the WiFi connection is lost. Use for nodes without network only.
+If the port does not wake from lightsleep on a pin interrupt, the interrupt is handled at the next deadline.
+Callbacks scheduled by pin interrupts (soft IRQ) run whilst the CPU sleeps or polls, the sleep or poll waits max POLL_SLICE ms
+so wake() is handled in time.
+:usage
+from lowpower import Scheduler
+sched = Scheduler()
+sched.every(1000, lambda: print('tick'))
+sched.every(60000, lambda: print(sched.report()))
+sched.run()
+"""
+# Imports
+from machine import lightsleep
+from time import sleep_ms, ticks_ms, ticks_us, ticks_add, ticks_diff
+import select
+# Estimated current in mA per state, per-board defaults (Pico W, WiFi connected), override with currents
+RUN_MA = 45
+IDLE_MA = 28
+LIGHTSLEEP_MA = 2
+# Min wait in ms to use lightsleep
+LIGHTSLEEP_MIN = 10
+# Max time in ms of a single sleep or socket poll, the max latency of wake()
+POLL_SLICE = 20
+class Scheduler:
+    def __init__(self, lightsleep=False, currents=(RUN_MA, IDLE_MA, LIGHTSLEEP_MA)):
+        """
+        Init the scheduler.
+        
+        :param bool lightsleep
+            Use lightsleep for waits of at least LIGHTSLEEP_MIN ms, default False (sleep).
+        
+        :param tuple currents
+            Current in mA of the board (run, idle, lightsleep) for the estimated current draw.
+        """
+        self.lightsleep = lightsleep
+        self.currents = currents
+        # Tasks as list [due, period, callback], period 0 is one-shot
+        self._tasks = []
+        self._woken = False
+        self._poller = None
+        self._sockets = {}
+        self.reset_stats()
+    def every(self, period, callback, phase=0):
+        """
+        Add a periodic task.
+        
+        :param int period
+            Period in ms.
+        
+        :param function callback
+            Function called without arguments.
+        
+        :param int phase
+            Delay in ms of the first run, default 0.
+        
+        :return list task
+            Task to cancel.
+        """
+        task = [ticks_add(ticks_ms(), phase), period, callback]
+        self._tasks.append(task)
+        # The deadline may be earlier than the current wait
+        self._woken = True
+        return task
+    def after(self, delay, callback):
+        """Add a one-shot task running after delay ms, i.e. from a soft interrupt callback to run the work as task."""
+        return self.every(0, callback, phase=delay)
+    def cancel(self, task):
+        """Cancel a task."""
+        if task in self._tasks:
+            self._tasks.remove(task)
+    def add_socket(self, sock, callback):
+        """
+        Wake on socket readiness.
+        
+        :param socket sock
+            Socket polled for input.
+        
+        :param function callback
+            Function callback(sock) called if the socket is readable.
+        """
+        if self._poller is None:
+            self._poller = select.poll()
+        self._poller.register(sock, select.POLLIN)
+        self._sockets[id(sock)] = (sock, callback)
+    def remove_socket(self, sock):
+        """Stop polling a socket."""
+        if id(sock) in self._sockets:
+            self._poller.unregister(sock)
+            del self._sockets[id(sock)]
+    def wake(self):
+        """End the current wait, i.e. from a pin interrupt handler. Does not allocate."""
+        self._woken = True
+    def _next_due(self):
+        """Get the ms until the next task is due, None if no task."""
+        now = ticks_ms()
+        wait = None
+        for task in self._tasks:
+            d = ticks_diff(task[0], now)
+            if wait is None or d < wait:
+                wait = d
+        return wait
+    def _run_due(self):
+        """Run the tasks due."""
+        now = ticks_ms()
+        for task in list(self._tasks):
+            if ticks_diff(now, task[0]) < 0:
+                continue
+            period = task[1]
+            if period == 0:
+                self._tasks.remove(task)
+            else:
+                # Advance by the period, skip the missed runs
+                task[0] = ticks_add(task[0], period)
+                if ticks_diff(now, task[0]) >= 0:
+                    late = ticks_diff(now, task[0]) // period + 1
+                    task[0] = ticks_add(task[0], late * period)
+                    self.skipped += late
+            task[2]()
+            self.runs += 1
+    def _poll(self, timeout):
+        """Poll the sockets max timeout ms and call the callbacks of the readable sockets."""
+        for (sock, event) in self._poller.poll(timeout):
+            if event & select.POLLIN:
+                self._sockets[id(sock)][1](sock)
+                self._woken = True
+    def _park(self, wait):
+        """Park the CPU until the deadline in wait ms, a wake() or socket readiness."""
+        due = ticks_add(ticks_ms(), wait)
+        while not self._woken:
+            remaining = ticks_diff(due, ticks_ms())
+            if remaining <= 0:
+                break
+            t = ticks_us()
+            if self._sockets:
+                self._poll(min(remaining, POLL_SLICE))
+                self.idle_us += ticks_diff(ticks_us(), t)
+            elif self.lightsleep and remaining >= LIGHTSLEEP_MIN:
+                lightsleep(remaining)
+                self.sleep_us += ticks_diff(ticks_us(), t)
+            else:
+                sleep_ms(min(remaining, POLL_SLICE))
+                self.idle_us += ticks_diff(ticks_us(), t)
+            self.wakeups += 1
+        self._woken = False
+    def run_once(self, max_wait=None):
+        """
+        Run the tasks due and park the CPU until the next deadline.
+        
+        :param int max_wait
+            Max time in ms to park, default None waits for the next deadline or wake().
+        """
+        t = ticks_us()
+        self._run_due()
+        self.busy_us += ticks_diff(ticks_us(), t)
+        wait = self._next_due()
+        if max_wait is not None and (wait is None or wait > max_wait):
+            wait = max_wait
+        if wait is None:
+            # No task: wait for an interrupt
+            wait = POLL_SLICE
+        if wait > 0:
+            self._park(wait)
+    def run(self):
+        """Run forever."""
+        while True:
+            self.run_once()
+    def reset_stats(self):
+        """Reset the measurement counters."""
+        self.busy_us = 0
+        self.idle_us = 0
+        self.sleep_us = 0
+        self.wakeups = 0
+        self.runs = 0
+        self.skipped = 0
+    def stats(self):
+        """
+        Get the measurement since the last reset.
+        
+        :return tuple (idle_ratio, wakeups_per_s, current_ma)
+            Ratio of the time idle or in lightsleep (0-1), the number of wakeups per second
+            and the estimated average current in mA.
+        """
+        total = self.busy_us + self.idle_us + self.sleep_us
+        if total == 0:
+            return 0, 0, self.currents[0]
+        (run_ma, idle_ma, sleep_ma) = self.currents
+        current = (self.busy_us * run_ma + self.idle_us * idle_ma + self.sleep_us * sleep_ma) / total
+        return (self.idle_us + self.sleep_us) / total, self.wakeups * 1000000 / total, current
+    def report(self):
+        """Get the measurement as text."""
+        ratio, rate, current = self.stats()
+        return (f'idle={ratio * 100:.1f}%, current={current:.1f}mA (estimated), runs={self.runs}, skipped={self.skipped}, '
+                f'wakeups={self.wakeups} ({rate:.0f}/s)')
@@ -8,11 +8,22 @@ MASK_RW = 0x02
 MASK_E = 0x04
 SHIFT_BACKLIGHT = 3
 SHIFT_DATA = 4
+# NEW: rwbl
+# The nibbles & E strobes of a command, a character or a line of characters
+# are encoded into one preallocated buffer and sent with a single writeto.
+# At 100kHz each PCF8574 byte takes ~90us on the bus, which is longer than the
+# 37us the HD44780 needs to execute a write, so no delay is needed between the
+# characters of a line.
+# Number of PCF8574 bytes per LCD byte: high nibble with E set, E cleared, low nibble with E set, E cleared
+BYTES_PER_CHAR = 4
 class I2cLcd(LcdApi):
     """Implements a HD44780 character LCD connected via PCF8574 on I2C."""
     def __init__(self, i2c, i2c_addr, num_lines, num_columns):
         self.i2c = i2c
         self.i2c_addr = i2c_addr
+        # Transmit buffer for up to a full line of characters (max 40 columns)
+        self._buf = bytearray(BYTES_PER_CHAR * min(max(num_columns, 1), 40))
+        self._mv = memoryview(self._buf)
         self.i2c.writeto(self.i2c_addr, bytearray([0]))
         sleep_ms(20)   # Allow LCD time to powerup
         # Send reset 3 times
@@ -43,24 +54,52 @@ class I2cLcd(LcdApi):
     def hal_backlight_off(self):
         """Allows the hal layer to turn the backlight off."""
         self.i2c.writeto(self.i2c_addr, bytearray([0]))
+    def _encode(self, pos, value, rs):
+        """Encodes a command or data byte as 4 PCF8574 bytes into the buffer at pos.
+        Data is latched on the falling edge of E.
+        """
+        buf = self._buf
+        byte = (rs | (self.backlight << SHIFT_BACKLIGHT) | (((value >> 4) & 0x0f) << SHIFT_DATA))
+        buf[pos] = byte | MASK_E
+        buf[pos + 1] = byte
+        byte = (rs | (self.backlight << SHIFT_BACKLIGHT) | ((value & 0x0f) << SHIFT_DATA))
+        buf[pos + 2] = byte | MASK_E
+        buf[pos + 3] = byte
     def hal_write_command(self, cmd):
         """Writes a command to the LCD.
         Data is latched on the falling edge of E.
         """
-        byte = ((self.backlight << SHIFT_BACKLIGHT) | (((cmd >> 4) & 0x0f) << SHIFT_DATA))
-        self.i2c.writeto(self.i2c_addr, bytearray([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytearray([byte]))
-        byte = ((self.backlight << SHIFT_BACKLIGHT) | ((cmd & 0x0f) << SHIFT_DATA))
-        self.i2c.writeto(self.i2c_addr, bytearray([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytearray([byte]))
+        self._encode(0, cmd, 0)
+        self.i2c.writeto(self.i2c_addr, self._mv[0:BYTES_PER_CHAR])
         if cmd <= 3:
             # The home and clear commands require a worst case delay of 4.1 msec
             sleep_ms(5)
     def hal_write_data(self, data):
         """Write data to the LCD."""
-        byte = (MASK_RS | (self.backlight << SHIFT_BACKLIGHT) | (((data >> 4) & 0x0f) << SHIFT_DATA))
-        self.i2c.writeto(self.i2c_addr, bytearray([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytearray([byte]))
-        byte = (MASK_RS | (self.backlight << SHIFT_BACKLIGHT) | ((data & 0x0f) << SHIFT_DATA))
-        self.i2c.writeto(self.i2c_addr, bytearray([byte | MASK_E]))
-        self.i2c.writeto(self.i2c_addr, bytearray([byte]))
+        self._encode(0, data, MASK_RS)
+        self.i2c.writeto(self.i2c_addr, self._mv[0:BYTES_PER_CHAR])
+    def hal_write_chars(self, chars):
+        """Write several characters (string or bytes) to the LCD.
+        The characters are sent with one writeto per buffer size (a line).
+        """
+        size = len(self._buf)
+        pos = 0
+        is_str = isinstance(chars, str)
+        for char in chars:
+            self._encode(pos, ord(char) if is_str else char, MASK_RS)
+            pos += BYTES_PER_CHAR
+            if pos == size:
+                self.i2c.writeto(self.i2c_addr, self._mv)
+                pos = 0
+        if pos > 0:
+            self.i2c.writeto(self.i2c_addr, self._mv[0:pos])
+    # NEW: rwbl
+    def custom_char(self, location, charmap):
+        """Write a character to one of the 8 CGRAM locations, available
+        as chr(0) through chr(7).
+        The 8 rows are sent with one writeto without delays (see BYTES_PER_CHAR).
+        """
+        location &= 0x7
+        self.hal_write_command(self.LCD_CGRAM | (location << 3))
+        self.hal_write_chars(charmap[0:8])
+        self.move_to(self.cursor_x, self.cursor_y)
@@ -18,6 +18,9 @@ AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
 LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
+Modifications by rwbl 20261019
+Preallocated transmit buffer holding a row (or command) for all modules of the chain, sent with one spi.write.
+show() skips the rows unchanged since the last frame, show(True) sends all rows.
 """
 from micropython import const
 import framebuf
@@ -44,6 +47,10 @@ class Matrix8x8:
         self.cs.init(cs.OUT, True)
         self.buffer = bytearray(8 * num)
         self.num = num
+        # Transmit buffer with register & data per module, rows shown on the modules
+        self._tx = bytearray(2 * num)
+        self._shown = bytearray(8 * num)
+        self._full_update = True
         fb = framebuf.FrameBuffer(self.buffer, 8 * num, 8, framebuf.MONO_HLSB)
         self.framebuf = fb
         # Provide methods for accessing FrameBuffer graphics primitives. This is a workround
@@ -61,9 +68,12 @@ class Matrix8x8:
         self.blit = fb.blit  # (fbuf, x, y[, key])
         self.init()
     def _write(self, command, data):
-        self.cs(0)
+        tx = self._tx
         for m in range(self.num):
-            self.spi.write(bytearray([command, data]))
+            tx[2 * m] = command
+            tx[2 * m + 1] = data
+        self.cs(0)
+        self.spi.write(tx)
         self.cs(1)
     def init(self):
         for command, data in (
@@ -74,13 +84,40 @@ class Matrix8x8:
                 (_SHUTDOWN, 1),
         ):
             self._write(command, data)
+        # The digit registers are undefined after power up
+        self._full_update = True
     def brightness(self, value):
         if not 0 <= value <= 15:
             raise ValueError("Brightness out of range")
         self._write(_INTENSITY, value)
-    def show(self):
+    def show(self, full_update=False):
+        """
+        Send the rows changed since the last frame, each row with one spi.write for all modules.
+        :param bool full_update
+            Flag to send all rows.
+        :return int
+            Number of rows sent.
+        """
+        num = self.num
+        buf = self.buffer
+        shown = self._shown
+        tx = self._tx
+        full_update = full_update or self._full_update
+        rows = 0
         for y in range(8):
-            self.cs(0)
-            for m in range(self.num):
-                self.spi.write(bytearray([_DIGIT0 + y, self.buffer[(y * self.num) + m]]))
-            self.cs(1)
+            base = y * num
+            changed = full_update
+            for m in range(num):
+                value = buf[base + m]
+                if value != shown[base + m]:
+                    shown[base + m] = value
+                    changed = True
+                tx[2 * m] = _DIGIT0 + y
+                tx[2 * m + 1] = value
+            if changed:
+                self.cs(0)
+                self.spi.write(tx)
+                self.cs(1)
+                rows += 1
+        self._full_update = False
+        return rows
@@ -0,0 +1,164 @@
+"""
+File:	max7219ticker.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Non-blocking text ticker for MAX7219 8x8 LED matrix chains (max7219.py), i.e. a status ticker for Domoticz values.
+Scrolling by hand with scroll() & text() plus a full show() per step blocks the main loop for the length of the text.
+The ticker renders a message once into an off-screen FrameBuffer as wide as the message.
+Each frame clears the display and blits the message at the sliding window position,
+the driver sends only the changed rows.
+The frames are stepped by a periodic machine.Timer (start) or by calling tick() from the main loop.
+:notes
+Frame pacing: the due time of the next frame is advanced by the frame period (not from the time of the tick),
+so the scroll speed does not drift. If ticks are late by one or more frames, the missed frames are skipped
+(counted as dropped) and the window moves on, so the text keeps its speed.
+Messages are queued and shown in order. repeat is the number of passes, 0 repeats until another message is queued.
+The message scrolls in from the right and out to the left.
+:usage
+from machine import Pin, SPI
+import max7219
+from max7219ticker import Ticker
+display = max7219.Matrix8x8(SPI(0), Pin(5), 4)
+ticker = Ticker(display, fps=30)
+ticker.start()
+ticker.add('Temp 21.5C', repeat=2)
+ticker.add('Hum 55%', repeat=0)
+"""
+# Imports
+import framebuf
+from machine import Timer
+from time import ticks_ms, ticks_add, ticks_diff
+# Character width & height in px
+CHAR_WIDTH = 8
+CHAR_HEIGHT = 8
+class Ticker:
+    def __init__(self, display, fps=30, step=1):
+        """
+        Init the ticker for a MAX7219 display.
+        
+        :param Matrix8x8 display
+            MAX7219 chain object.
+        
+        :param int fps
+            Frames per second, default 30.
+        
+        :param int step
+            Pixels moved per frame, default 1.
+        """
+        self.display = display
+        self.width = 8 * display.num
+        self.period = max(1, 1000 // fps)
+        self.step = step
+        # Queue of [message, repeat]
+        self._queue = []
+        # Current message: rendered framebuffer, width in px, window position, passes left
+        self._fb = None
+        self._fb_width = 0
+        self._x = 0
+        self._repeat = 0
+        self._due = ticks_ms()
+        # Set whilst changing the queue to avoid the timer rendering at the same time
+        self._busy = False
+        self._timer = None
+        # Bound once to avoid allocating a bound method on every timer callback
+        self._timer_callback = self._on_timer
+        # Number of frames shown and dropped (statistics)
+        self.frames = 0
+        self.dropped = 0
+    def start(self):
+        """Step the frames with a periodic timer at the frame period."""
+        if self._timer is None:
+            self._timer = Timer()
+        self._timer.init(mode=Timer.PERIODIC, period=self.period, callback=self._timer_callback)
+    def stop(self):
+        """Stop the timer. The message is paused, not cancelled."""
+        if self._timer is not None:
+            self._timer.deinit()
+    def _on_timer(self, t):
+        self.tick()
+    def active(self):
+        """Check if a message is scrolling or queued."""
+        return self._fb is not None or len(self._queue) > 0
+    def add(self, message, repeat=1):
+        """
+        Add a message to the queue.
+        
+        :param string message
+            Text to scroll.
+        
+        :param int repeat
+            Number of passes. 0 = repeat until another message is queued.
+        """
+        self._busy = True
+        self._queue.append([message, repeat])
+        self._busy = False
+    def clear(self):
+        """Cancel the message and the queue, clear the display."""
+        self._busy = True
+        self._queue.clear()
+        self._fb = None
+        self.display.fill(0)
+        self.display.show()
+        self._busy = False
+    def show(self, message):
+        """Cancel the message and the queue and show a static text."""
+        self.clear()
+        self.display.text(message, 0, 0, 1)
+        self.display.show()
+    def _next(self):
+        # Render the next message of the queue into the off-screen framebuffer
+        message, repeat = self._queue.pop(0)
+        self._fb_width = CHAR_WIDTH * len(message)
+        buffer = bytearray(((self._fb_width + 7) // 8) * CHAR_HEIGHT)
+        self._fb = framebuf.FrameBuffer(buffer, self._fb_width, CHAR_HEIGHT, framebuf.MONO_HLSB)
+        self._fb.text(message, 0, 0, 1)
+        self._repeat = repeat
+        self._x = 0
+    def tick(self, now=None):
+        """
+        Show the next frame if due.
+        
+        :param int now
+            Time in ms (ticks_ms), default the current time.
+        :return bool
+            True if a frame has been shown.
+        """
+        if self._busy:
+            return False
+        if now is None:
+            now = ticks_ms()
+        late = ticks_diff(now, self._due)
+        if late < 0:
+            return False
+        # Skip the missed frames to keep the speed
+        missed = late // self.period
+        self._due = ticks_add(self._due, (missed + 1) * self.period)
+        if self._fb is None:
+            if len(self._queue) == 0:
+                return False
+            self._next()
+            missed = 0
+        self.dropped += missed
+        self._x += missed * self.step
+        # Message passed: repeat or next message
+        if self._x > self.width + self._fb_width:
+            if self._repeat == 0 and len(self._queue) == 0:
+                self._x = 0
+            elif self._repeat > 1:
+                self._repeat -= 1
+                self._x = 0
+            elif len(self._queue) > 0:
+                self._next()
+            else:
+                self._fb = None
+                self.display.fill(0)
+                self.display.show()
+                return True
+        # Sliding window: the message enters at the right edge at x = 0
+        self.display.fill(0)
+        self.display.blit(self._fb, self.width - self._x, 0)
+        self.display.show()
+        self._x += self.step
+        self.frames += 1
+        return True
@@ -18,17 +18,42 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
-from machine import Pin, SPI
+# Modifications by rwbl 20261019
+# Preallocated 2-byte transmit & receive buffers, a register is read with one write_readinto.
+# The FIFO is written and read in one burst transfer instead of one transfer per byte.
+# Optional SPI object, i.e. for boards not listed or a SoftSPI.
+# Optional IRQ pin: the reader IRQ output ends the command wait and signals a card answering a request (wait_card).
+# The end of the command wait is checked with the correct condition (the ~ condition ended the wait after one read).
+# Anticollision with bit collisions resolved, all cascade levels for 4, 7 and 10-byte UIDs (read_uid).
+# All cards in the field are read by selecting and halting one card after the other (read_uids).
+from machine import Pin, SPI, idle
 from os import uname
+from time import ticks_ms, ticks_add, ticks_diff, sleep_ms
+# FIFO size in bytes
+FIFO_SIZE = 64
+# SPI address byte of the FIFODataReg (0x09) for write and read
+FIFO_WRITE = 0x12
+FIFO_READ = 0x92
+# Time in ms between requests sent by wait_card with IRQ pin (reader sends the request, the card answer sets the IRQ)
+ACTIVATE_PERIOD = 50
+# Time in ms between requests polled by wait_card without IRQ pin
+POLL_PERIOD = 200
+# Max time in ms to wait for the IRQ pin at the end of a command (the reader timer ends a command after 15ms)
+IRQ_TIMEOUT = 25
+# Time in ms the RF field is switched off to reset all cards to the IDLE state and to power up the cards again
+RF_RESET_TIME = 5
+# Select commands of the cascade levels 1, 2 and 3
+CASCADE_LEVELS = (0x93, 0x95, 0x97)
 class MFRC522:
     OK = 0
     NOTAGERR = 1
     ERR = 2
+    COLLERR = 3
     REQIDL = 0x26
     REQALL = 0x52
     AUTHENT1A = 0x60
     AUTHENT1B = 0x61
-    def __init__(self, sck, mosi, miso, rst, cs):
+    def __init__(self, sck, mosi, miso, rst, cs, spi=None, irq=None):
         self.sck = Pin(sck, Pin.OUT)
         self.mosi = Pin(mosi, Pin.OUT)
         self.miso = Pin(miso)
@@ -36,8 +61,23 @@ class MFRC522:
         self.cs = Pin(cs, Pin.OUT)
         self.rst.value(0)
         self.cs.value(1)
+        # Transmit & receive buffers for a register and for a FIFO burst (address byte + data)
+        self._tx = bytearray(2)
+        self._rx = bytearray(2)
+        self._fifo_tx = bytearray(FIFO_SIZE + 1)
+        self._fifo_rd = bytearray([FIFO_READ] * (FIFO_SIZE + 1))
+        self._fifo_rx = bytearray(FIFO_SIZE + 1)
+        self._fifo_tx_mv = memoryview(self._fifo_tx)
+        self._fifo_rd_mv = memoryview(self._fifo_rd)
+        self._fifo_rx_mv = memoryview(self._fifo_rx)
+        # IRQ pin and flag set by the pin interrupt
+        self.irq = None
+        self._card_irq = False
+        self._irq_callback = self._on_irq
         board = uname()[0]
-        if board == 'WiPy' or board == 'LoPy' or board == 'FiPy':
+        if spi is not None:
+            self.spi = spi
+        elif board == 'WiPy' or board == 'LoPy' or board == 'FiPy':
             self.spi = SPI(0)
             self.spi.init(SPI.MASTER, baudrate=1000000,
                           pins=(self.sck, self.mosi, self.miso))
@@ -53,17 +93,43 @@ class MFRC522:
             raise RuntimeError("Unsupported platform")
         self.rst.value(1)
         self.init()
+        if irq is not None:
+            self.set_irq(Pin(irq, Pin.IN, Pin.PULL_UP))
     def _wreg(self, reg, val):
+        tx = self._tx
+        tx[0] = (reg << 1) & 0x7e
+        tx[1] = val & 0xff
         self.cs.value(0)
-        self.spi.write(b'%c' % int(0xff & ((reg << 1) & 0x7e)))
-        self.spi.write(b'%c' % int(0xff & val))
+        self.spi.write(tx)
         self.cs.value(1)
     def _rreg(self, reg):
+        # The register value is clocked out whilst sending the second byte
+        tx = self._tx
+        tx[0] = ((reg << 1) & 0x7e) | 0x80
+        tx[1] = 0
         self.cs.value(0)
-        self.spi.write(b'%c' % int(0xff & (((reg << 1) & 0x7e) | 0x80)))
-        val = self.spi.read(1)
+        self.spi.write_readinto(tx, self._rx)
         self.cs.value(1)
-        return val[0]
+        return self._rx[1]
+    def _wfifo(self, data):
+        # Burst write: the FIFO address followed by all bytes in one transfer
+        n = len(data)
+        tx = self._fifo_tx
+        tx[0] = FIFO_WRITE
+        for i in range(n):
+            tx[i + 1] = data[i]
+        self.cs.value(0)
+        self.spi.write(self._fifo_tx_mv[:n + 1])
+        self.cs.value(1)
+    def _rfifo(self, n):
+        # Burst read: the FIFO address repeated n times followed by 0x00, byte i is received with address i+1
+        tx = self._fifo_rd
+        tx[n] = 0
+        self.cs.value(0)
+        self.spi.write_readinto(self._fifo_rd_mv[:n + 1], self._fifo_rx_mv[:n + 1])
+        self.cs.value(1)
+        tx[n] = FIFO_READ
+        return list(self._fifo_rx_mv[1:n + 1])
     def _sflags(self, reg, mask):
         self._wreg(reg, self._rreg(reg) | mask)
     def _cflags(self, reg, mask):
@@ -76,27 +142,33 @@ class MFRC522:
             irq_en = 0x12
             wait_irq = 0x10
         elif cmd == 0x0C:
-            irq_en = 0x77
+            # With IRQ pin only RxIRq, IdleIRq and TimerIRq are enabled, TxIRq would set the pin at the end of the transmit
+            irq_en = 0x77 if self.irq is None else 0x31
             wait_irq = 0x30
         self._wreg(0x02, irq_en | 0x80)
         self._cflags(0x04, 0x80)
         self._sflags(0x0A, 0x80)
         self._wreg(0x01, 0x00)
-        for c in send:
-            self._wreg(0x09, c)
+        self._wfifo(send)
         self._wreg(0x01, cmd)
         if cmd == 0x0C:
             self._sflags(0x0D, 0x80)
         i = 2000
-        while True:
+        if self.irq is not None and self._wait_irq():
+            # The IRQ register is read once after the IRQ pin is set
             n = self._rreg(0x04)
-            i -= 1
-            if ~((i != 0) and ~(n & 0x01) and ~(n & wait_irq)):
-                break
+        else:
+            while True:
+                n = self._rreg(0x04)
+                i -= 1
+                if i == 0 or n & 0x01 or n & wait_irq:
+                    break
         self._cflags(0x0D, 0x80)
         if i:
-            if (self._rreg(0x06) & 0x1B) == 0x00:
-                stat = self.OK
+            # A bit collision of several cards answering is returned with the bits received (anticoll)
+            error = self._rreg(0x06) & 0x1B
+            if error == 0x00 or (error == 0x08 and cmd == 0x0C):
+                stat = self.OK if error == 0x00 else self.COLLERR
                 if n & irq_en & 0x01:
                     stat = self.NOTAGERR
                 elif cmd == 0x0C:
@@ -110,16 +182,14 @@ class MFRC522:
                         n = 1
                     elif n > 16:
                         n = 16
-                    for _ in range(n):
-                        recv.append(self._rreg(0x09))
+                    recv = self._rfifo(n)
             else:
                 stat = self.ERR
         return stat, recv, bits
     def _crc(self, data):
         self._cflags(0x05, 0x04)
         self._sflags(0x0A, 0x80)
-        for c in data:
-            self._wreg(0x09, c)
+        self._wfifo(data)
         self._wreg(0x01, 0x03)
         i = 0xFF
         while True:
@@ -139,6 +209,77 @@ class MFRC522:
         self.antenna_on()
     def reset(self):
         self._wreg(0x01, 0x0F)
+    def set_irq(self, pin):
+        """Use the pin connected to the reader IRQ output, the output is set to push-pull."""
+        self.irq = pin
+        self._wreg(0x03, 0x80)
+        pin.irq(handler=self._irq_callback, trigger=Pin.IRQ_FALLING)
+    def _wait_irq(self):
+        # Wait for the IRQ pin (active low) without reading the IRQ register, False if not set within IRQ_TIMEOUT
+        start = ticks_ms()
+        while self.irq.value():
+            if ticks_diff(ticks_ms(), start) >= IRQ_TIMEOUT:
+                return False
+        return True
+    def _on_irq(self, pin):
+        self._card_irq = True
+    def _activate(self, mode):
+        # Send a request and return, only the answer of a card (RxIRq) sets the IRQ pin
+        self._card_irq = False
+        self._wreg(0x01, 0x00)
+        self._wreg(0x04, 0x7F)
+        self._wreg(0x02, 0xA0)
+        self._wreg(0x0D, 0x07)
+        self._wreg(0x0A, 0x80)
+        self._wfifo([mode])
+        self._wreg(0x01, 0x0C)
+        self._wreg(0x0D, 0x87)
+    def _activated(self):
+        # Get the status and bits of the answer to the request sent by _activate
+        stat = self.ERR
+        bits = 0
+        if (self._rreg(0x06) & 0x1B) == 0x00:
+            n = self._rreg(0x0A)
+            lbits = self._rreg(0x0C) & 0x07
+            bits = (n - 1) * 8 + lbits if lbits != 0 else n * 8
+            if bits == 0x10:
+                stat = self.OK
+        self._wreg(0x0D, 0x00)
+        self._wreg(0x01, 0x00)
+        return stat, bits
+    def wait_card(self, mode=0x26, timeout=None):
+        """
+        Wait for a card answering a request without busy polling.
+        With IRQ pin: a request is sent every ACTIVATE_PERIOD and the CPU idles until the IRQ pin interrupt.
+        Without IRQ pin: request() is polled every POLL_PERIOD and the CPU sleeps in between.
+        
+        :param int mode
+            REQIDL (default) or REQALL.
+        
+        :param int timeout
+            Max time in ms to wait, default None waits until a card answers.
+        
+        :return int stat, int bits
+            As request(), stat OK if a card answered, else NOTAGERR after the timeout.
+        """
+        start = ticks_ms()
+        while True:
+            if self.irq is not None:
+                self._activate(mode)
+                due = ticks_add(ticks_ms(), ACTIVATE_PERIOD)
+                while not self._card_irq and ticks_diff(due, ticks_ms()) > 0:
+                    idle()
+                if self._card_irq:
+                    (stat, bits) = self._activated()
+                    if stat == self.OK:
+                        return stat, bits
+            else:
+                (stat, bits) = self.request(mode)
+                if stat == self.OK:
+                    return stat, bits
+                sleep_ms(POLL_PERIOD)
+            if timeout is not None and ticks_diff(ticks_ms(), start) >= timeout:
+                return self.NOTAGERR, 0
     def antenna_on(self, on=True):
         if on and ~(self._rreg(0x14) & 0x03):
             self._sflags(0x14, 0x03)
@@ -150,25 +291,112 @@ class MFRC522:
         if (stat != self.OK) | (bits != 0x10):
             stat = self.ERR
         return stat, bits
-    def anticoll(self):
-        ser_chk = 0
-        ser = [0x93, 0x20]
-        self._wreg(0x0D, 0x00)
-        (stat, recv, bits) = self._tocard(0x0C, ser)
-        if stat == self.OK:
-            if len(recv) == 5:
-                for i in range(4):
-                    ser_chk = ser_chk ^ recv[i]
-                if ser_chk != recv[4]:
-                    stat = self.ERR
-            else:
+    def anticoll(self, sel=0x93):
+        """
+        Get the UID bytes of a cascade level and the BCC of one card.
+        If several cards answer, the bits up to the collision are kept, the collision bit is set to 1
+        and the cards matching the known bits are asked again, until one card answers without collision.
+        
+        :param int sel
+            Select command of the cascade level 0x93, 0x95 or 0x97.
+        
+        :return int stat, list recv
+            Status OK and 4 UID bytes (first byte 0x88 cascade tag if the UID is not complete) + BCC.
+        """
+        ser = [sel, 0x20, 0, 0, 0, 0, 0]
+        known = 0
+        # Clear the bits received after a collision
+        self._cflags(0x0E, 0x80)
+        while True:
+            index = 2 + known // 8
+            lastbits = known % 8
+            ser[1] = (index << 4) | lastbits
+            # Send the known bits, the first bit received is aligned to the first unknown bit
+            self._wreg(0x0D, (lastbits << 4) | lastbits)
+            (stat, recv, bits) = self._tocard(0x0C, ser[:index + (1 if lastbits else 0)])
+            if stat != self.OK and stat != self.COLLERR:
+                break
+            mask = (1 << lastbits) - 1
+            for i in range(min(len(recv), 7 - index)):
+                ser[index + i] = (ser[index + i] & mask) | (recv[i] & ~mask) if i == 0 else recv[i]
+            if stat == self.OK:
+                break
+            coll = self._rreg(0x0E)
+            pos = coll & 0x1F or 32
+            if coll & 0x20 or pos <= known:
                 stat = self.ERR
+                break
+            known = pos
+            ser[2 + (pos - 1) // 8] |= 1 << ((pos - 1) % 8)
+        self._wreg(0x0D, 0x00)
+        recv = ser[2:7]
+        if stat == self.OK and recv[0] ^ recv[1] ^ recv[2] ^ recv[3] != recv[4]:
+            stat = self.ERR
         return stat, recv
-    def select_tag(self, ser):
-        buf = [0x93, 0x70] + ser[:5]
+    def _select(self, sel, ser):
+        # Select the card of the cascade level, return the status and SAK
+        buf = [sel, 0x70] + ser[:5]
         buf += self._crc(buf)
         (stat, recv, bits) = self._tocard(0x0C, buf)
-        return self.OK if (stat == self.OK) and (bits == 0x18) else self.ERR
+        if (stat == self.OK) and (bits == 0x18):
+            return self.OK, recv[0]
+        return self.ERR, 0
+    def select_tag(self, ser, sel=0x93):
+        return self._select(sel, ser)[0]
+    def read_uid(self):
+        """
+        Get the complete UID of a card answering a request, by anticollision and select of the cascade levels.
+        The card is selected (ACTIVE state).
+        
+        :return int stat, list uid
+            Status OK and the UID of 4, 7 or 10 bytes, else None.
+        """
+        uid = []
+        for sel in CASCADE_LEVELS:
+            (stat, ser) = self.anticoll(sel)
+            if stat != self.OK:
+                return stat, None
+            (stat, sak) = self._select(sel, ser)
+            if stat != self.OK:
+                return stat, None
+            # SAK cascade bit: the UID is not complete, skip the cascade tag
+            if sak & 0x04:
+                uid += ser[1:4]
+            else:
+                return self.OK, uid + ser[0:4]
+        return self.ERR, None
+    def halt(self):
+        """Set the selected card to the HALT state, the card does not answer REQIDL until removed from the field."""
+        buf = [0x50, 0x00]
+        buf += self._crc(buf)
+        self._tocard(0x0C, buf)
+    def read_uids(self, max_cards=4):
+        """
+        Get the UIDs of all cards in the field.
+        The RF field is switched off to reset all cards to the IDLE state.
+        Then a card is requested, read and halted, so the next request is answered by the remaining cards only.
+        
+        :param int max_cards
+            Max number of cards to read.
+        
+        :return list uids
+            List of UIDs (list of 4, 7 or 10 bytes), empty if no card in the field.
+        """
+        self.antenna_on(False)
+        sleep_ms(RF_RESET_TIME)
+        self.antenna_on()
+        sleep_ms(RF_RESET_TIME)
+        uids = []
+        while len(uids) < max_cards:
+            (stat, bits) = self.request(self.REQIDL)
+            if stat != self.OK:
+                break
+            (stat, uid) = self.read_uid()
+            if stat != self.OK:
+                break
+            uids.append(uid)
+            self.halt()
+        return uids
     def auth(self, mode, addr, sect, ser):
         return self._tocard(0x0E, [mode, addr] + sect + ser[:4])[0]
     def stop_crypto1(self):
@@ -0,0 +1,71 @@
+"""
+File:	mfrc522presence.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Card presence tracker for the MFRC522 RFID reader (mfrc522.py).
+A scan reads the UIDs of all cards in the field (read_uids) and compares them with the cards present.
+A card not present before raises an arrive event, a card missing for depart_scans scans raises a depart event.
+A card lying on the reader raises one arrive event only, so duplicate Domoticz updates are suppressed by state,
+instead of by a minimum time between readings.
+:notes
+The UID is used as hex string with 2 uppercase characters per byte, i.e. 346FC2CF or 04A1B2C3D4E580 (7 bytes).
+A card not answering a single scan (i.e. moved at the edge of the field) is not reported as departed.
+:usage
+import mfrc522
+from mfrc522presence import Presence, ARRIVE
+rdr = mfrc522.MFRC522(sck=2, miso=4, mosi=3, cs=1, rst=0)
+presence = Presence(rdr)
+for (event, uid) in presence.scan():
+    print(event, uid)
+"""
+# Events
+ARRIVE = 'arrive'
+DEPART = 'depart'
+def uid_hex(uid):
+    """Get the UID as hex string with 2 uppercase characters per byte."""
+    return ''.join('{:02X}'.format(b) for b in uid)
+class Presence:
+    def __init__(self, rdr, depart_scans=2, max_cards=4):
+        """
+        Init the presence tracker.
+        
+        :param MFRC522 rdr
+            RFID reader object.
+        
+        :param int depart_scans
+            Number of scans a card is missing until the depart event, default 2.
+        
+        :param int max_cards
+            Max number of cards read per scan, default 4.
+        """
+        self.rdr = rdr
+        self.depart_scans = depart_scans
+        self.max_cards = max_cards
+        # Number of missed scans per UID of the cards present
+        self.present = {}
+    def scan(self):
+        """
+        Read the cards in the field and get the arrive & depart events.
+        
+        :return list events
+            List of tuples (event, uid), event ARRIVE or DEPART, uid as hex string.
+        """
+        events = []
+        seen = []
+        for uid in self.rdr.read_uids(self.max_cards):
+            uid = uid_hex(uid)
+            seen.append(uid)
+            if uid not in self.present:
+                events.append((ARRIVE, uid))
+            self.present[uid] = 0
+        for uid in list(self.present):
+            if uid not in seen:
+                self.present[uid] += 1
+                if self.present[uid] >= self.depart_scans:
+                    del self.present[uid]
+                    events.append((DEPART, uid))
+        return events
+    def count(self):
+        """Get the number of cards present."""
+        return len(self.present)
@@ -0,0 +1,201 @@
+"""
+File:	oled_layout.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Retained-mode layout of text regions for the SSD1306 OLED display (ssd1306ex.py).
+A region has a title and a value, defined by the text col & row (col width 8px, row height 16px) and width in characters.
+The title is shown at the row and the value underneath at the next row (without title at the row).
+Setting a value or title marks only its text line as changed, if the formatted text differs.
+show() redraws the changed text lines and the display driver sends only the changed pages & columns.
+The layout can be loaded from a JSON array, so Domoticz can send the layout once and then the values only.
+[{"name": "temp", "col": 6, "row": 0, "width": 4, "title": "Temp", "format": "{:.0f}", "align": "right"}, ...]
+:notes
+Keys name, col, row are required. Defaults: width 4, title '', format '{}', align 'left' (left, right, center).
+If the value can not be formatted, the value is shown as string. The text is truncated to the width.
+The display can be any FrameBuffer based driver with fill_rect, text, fill and show (i.e. ssd1306ex, sh1106).
+:usage
+from oled_layout import Layout
+layout = Layout(oled)
+layout.load('[{"name": "temp", "col": 1, "row": 0, "title": "Temp"}]')
+layout.set('temp', 21)
+layout.show()
+"""
+# Imports
+import json
+# Text col width & row height in px, character height in px
+COL_WIDTH = 8
+ROW_HEIGHT = 16
+CHAR_HEIGHT = 8
+# Changed flags of a region, CLEAR clears the title & value lines (title added or removed)
+TITLE = 1
+VALUE = 2
+CLEAR = 4
+class Region:
+    def __init__(self, name, col, row, width=4, title='', format='{}', align='left'):
+        """
+        Region of the layout with title and value.
+        
+        :param string name
+            Name used to set the value.
+        
+        :param int col
+            Text col of the region.
+        
+        :param int row
+            Text row of the title, the value is shown underneath (without title at the row).
+        
+        :param int width
+            Width in characters.
+        
+        :param string title
+            Title, empty for a region showing the value only.
+        
+        :param string format
+            Format string for the value, i.e. '{:.1f}'.
+        
+        :param string align
+            Alignment of the title and value within the width: left, right or center.
+        """
+        self.name = name
+        self.col = col
+        self.row = row
+        self.width = width
+        self.format = format
+        self.align = align
+        self.title = self.fit(str(title))
+        self.value = ''
+        # Changed text lines
+        self.changed = TITLE | VALUE
+    def fit(self, text):
+        """Truncate and align a text to the width."""
+        text = text[0:self.width]
+        if self.align == 'right':
+            return ' ' * (self.width - len(text)) + text
+        if self.align == 'center':
+            return ' ' * ((self.width - len(text)) // 2) + text
+        return text
+    def value_row(self):
+        """Get the text row of the value."""
+        return self.row + 1 if self.title else self.row
+class Layout:
+    def __init__(self, oled, regions=None):
+        """
+        Init the layout for a display.
+        
+        :param object oled
+            Display object, i.e. SSD1306_I2C.
+        
+        :param list regions
+            List of region definitions (dict) or JSON string, see load().
+        """
+        self.oled = oled
+        self.regions = {}
+        # Flag to clear the display at the next show, i.e. after loading a layout
+        self.clear_display = True
+        if regions is not None:
+            self.load(regions)
+    def add(self, name, col, row, width=4, title='', format='{}', align='left'):
+        """Add a region, see class Region for the parameters. Return the region."""
+        region = Region(name, col, row, width, title, format, align)
+        self.regions[name] = region
+        return region
+    def load(self, regions):
+        """
+        Load the layout, the previous regions are removed and the display is cleared at the next show().
+        
+        :param list|string regions
+            List of dict or JSON array with keys name, col, row and optional width, title, format, align.
+        """
+        if isinstance(regions, str):
+            regions = json.loads(regions)
+        self.regions = {}
+        for item in regions:
+            self.add(str(item['name']), item['col'], item['row'], item.get('width', 4),
+                     item.get('title', ''), item.get('format', '{}'), item.get('align', 'left'))
+        self.clear_display = True
+    def set(self, name, value):
+        """
+        Set the value of a region. Only if the formatted value changed, the value line is redrawn by show().
+        
+        :param string name
+            Name of the region.
+        
+        :param any value
+            Value formatted with the format of the region.
+        
+        :return bool
+            True if the value changed.
+        """
+        region = self.regions.get(name)
+        if region is None:
+            print(f'[ERROR] Layout region {name} not found')
+            return False
+        try:
+            text = region.format.format(value)
+        except (ValueError, TypeError):
+            text = str(value)
+        text = region.fit(text)
+        if text == region.value:
+            return False
+        region.value = text
+        region.changed |= VALUE
+        return True
+    def set_title(self, name, title):
+        """
+        Set the title of a region. Only if the title changed, the title line is redrawn by show().
+        If the title is added or removed, the value moves to the other row, so both lines are cleared and redrawn.
+        """
+        region = self.regions.get(name)
+        if region is None:
+            print(f'[ERROR] Layout region {name} not found')
+            return False
+        title = region.fit(str(title))
+        if title == region.title:
+            return False
+        if bool(title) != bool(region.title):
+            region.changed |= CLEAR | VALUE
+        region.title = title
+        region.changed |= TITLE
+        return True
+    def update(self, values):
+        """Set the values of several regions from a dict name:value. Return the number of changed values."""
+        changed = 0
+        for name in values:
+            if self.set(name, values[name]):
+                changed += 1
+        return changed
+    def invalidate(self, name=None):
+        """Mark a region or all regions (default) to be redrawn."""
+        for region in self.regions.values():
+            if name is None or region.name == name:
+                region.changed = TITLE | VALUE
+    def _line(self, region, row, text):
+        # Clear the text line of the region and write the text
+        x = region.col * COL_WIDTH
+        y = row * ROW_HEIGHT
+        self.oled.fill_rect(x, y, region.width * COL_WIDTH, CHAR_HEIGHT, 0)
+        self.oled.text(text, x, y, 1)
+    def draw(self):
+        """Draw the changed text lines into the display buffer. Return the number of lines drawn."""
+        if self.clear_display:
+            self.oled.fill(0)
+            self.invalidate()
+            self.clear_display = False
+        lines = 0
+        for region in self.regions.values():
+            if region.changed & CLEAR:
+                self._line(region, region.row, '')
+                self._line(region, region.row + 1, '')
+            if region.changed & TITLE and region.title:
+                self._line(region, region.row, region.title)
+                lines += 1
+            if region.changed & VALUE:
+                self._line(region, region.value_row(), region.value)
+                lines += 1
+            region.changed = 0
+        return lines
+    def show(self):
+        """Draw the changed text lines and show the display, only the changed pages & columns are sent."""
+        self.draw()
+        self.oled.show()
@@ -0,0 +1,262 @@
+"""
+File:	pressuretrend.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+On-device barometric pressure trend for the Domoticz barometer forecast (BAR_FOR of the Temp+Baro svalue).
+The forecast by an absolute pressure threshold does not tell if the weather improves or worsens,
+the pressure change over the last 3 hours (tendency) does.
+The pressure readings are averaged per interval (default 10 minutes) and kept in a fixed-size circular history,
+an array('h') of 16-bit deltas in Pa to a base pressure. The least squares slope over each window (default 1 and 3 hours)
+is updated in O(1) per sample with rolling sums, no loop over the history.
+The history is saved to a file and restored after a reboot, the missed intervals are interpolated.
+:notes
+The change of a window is the slope times the window duration in hPa, the rate the change per 3 hours (longest window).
+The rate is available if the longest window is more than half filled.
+Forecast (Domoticz): 0 = Stable, 1 = Sunny, 2 = Cloudy, 3 = Unstable, 4 = Thunderstorm, 5 = Unknown, 6 = Cloudy/Rain.
+By the rate in hPa per 3 hours: falling >= 6 Thunderstorm, >= 3.6 Cloudy/Rain, >= 1.6 Cloudy,
+rising >= 6 Unstable, >= 1.6 Sunny, steady by the pressure: >= 1020 Sunny, < 1000 Cloudy, else Stable.
+The file holds the time (time.time()), base, head, count and size (struct '<iiHHH') followed by the array.
+The history is restored only if not older than the history duration, the RTC must be set (i.e. ntptime).
+A saved or current time before MIN_YEAR (RTC not set, i.e. 2021-01-01 after a Pico reboot) does not restore the history.
+The file is saved every save_every samples (flash wear).
+:usage
+from pressuretrend import PressureTrend
+trend = PressureTrend()
+trend.add(101325)
+forecast = trend.forecast(1013)
+"""
+# Imports
+import struct
+from array import array
+from time import gmtime, time, ticks_ms, ticks_add, ticks_diff
+# Forecast Domoticz
+FORECAST_STABLE = 0
+FORECAST_SUNNY = 1
+FORECAST_CLOUDY = 2
+FORECAST_UNSTABLE = 3
+FORECAST_THUNDERSTORM = 4
+FORECAST_UNKNOWN = 5
+FORECAST_CLOUDY_RAIN = 6
+# Rate thresholds in hPa per 3 hours
+RATE_STEADY = 1.6
+RATE_FAST = 3.6
+RATE_RAPID = 6
+# Rate duration 3 hours in ms
+RATE_DURATION = 10800000
+# Min year of a set RTC, the time of an unset RTC is before
+MIN_YEAR = 2024
+# File header: time, base, head, count, size
+HEADER = '<iiHHH'
+class PressureTrend:
+    def __init__(self, interval=600000, windows=(3600000, RATE_DURATION), file='pressuretrend.dat', save_every=6):
+        """
+        Init the trend and restore the history from the file.
+        
+        :param int interval
+            Time in ms per history sample, default 600000 (10 minutes).
+        
+        :param tuple windows
+            Window durations in ms, default 1 and 3 hours, the longest is the history size.
+        
+        :param string file
+            File to save the history, default pressuretrend.dat, None does not save.
+        
+        :param int save_every
+            Number of samples between two saves, default 6 (hourly).
+        """
+        self.interval = interval
+        self.durations = windows
+        self.windows = [max(2, window // interval) for window in windows]
+        self.size = max(self.windows)
+        # Window of the rate
+        self._longest = self.windows.index(self.size)
+        self.history = array('h', [0] * self.size)
+        self.head = 0
+        self.count = 0
+        self.base = None
+        self.file = file
+        self.save_every = save_every
+        self._unsaved = 0
+        self._gap = 0
+        # Rolling sums per window: samples, sum y, sum x * y (x 0 oldest)
+        self._n = [0] * len(windows)
+        self._sy = [0] * len(windows)
+        self._sxy = [0] * len(windows)
+        # Readings averaged per interval
+        self._sum = 0
+        self._readings = 0
+        self._due = None
+        if file is not None:
+            self.restore()
+    def add(self, pressure, now=None):
+        """
+        Add a reading, the mean of the readings per interval is added to the history.
+        
+        :param float pressure
+            Pressure in Pa.
+        
+        :param int now
+            Time in ms, default None uses ticks_ms().
+        
+        :return bool
+            True if a sample is added to the history.
+        """
+        if now is None:
+            now = ticks_ms()
+        self._sum += pressure
+        self._readings += 1
+        if self._due is not None and ticks_diff(now, self._due) < 0:
+            return False
+        if self._due is None:
+            self._due = ticks_add(now, self.interval)
+        else:
+            late = ticks_diff(now, self._due)
+            self._due = ticks_add(self._due, (late // self.interval + 1) * self.interval)
+        value = round(self._sum / self._readings)
+        self._sum = 0
+        self._readings = 0
+        if self.base is None:
+            self.base = value
+        value -= self.base
+        if value > 32767:
+            value = 32767
+        elif value < -32768:
+            value = -32768
+        if self._gap > 0 and self.count > 0:
+            # Interpolate the intervals missed by a reboot
+            last = self.history[(self.head - 1) % self.size]
+            for i in range(1, self._gap + 1):
+                self._push(last + (value - last) * i // (self._gap + 1))
+        self._gap = 0
+        self._push(value)
+        self._unsaved += 1
+        if self._unsaved >= self.save_every:
+            self.save()
+        return True
+    def _push(self, y):
+        """Add a sample to the history and update the rolling sums."""
+        for w in range(len(self.windows)):
+            size = self.windows[w]
+            n = self._n[w]
+            if n < size:
+                self._sxy[w] += n * y
+                self._sy[w] += y
+                self._n[w] = n + 1
+            else:
+                # The oldest sample leaves the window, the others move to x - 1
+                self._sy[w] += y - self.history[(self.head - size) % self.size]
+                self._sxy[w] += size * y - self._sy[w]
+        self.history[self.head] = y
+        self.head = (self.head + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+    def _rebuild(self):
+        """Compute the rolling sums from the history."""
+        for w in range(len(self.windows)):
+            n = min(self.count, self.windows[w])
+            sy = 0
+            sxy = 0
+            for x in range(n):
+                y = self.history[(self.head - n + x) % self.size]
+                sy += y
+                sxy += x * y
+            self._n[w] = n
+            self._sy[w] = sy
+            self._sxy[w] = sxy
+    def slope(self, window=-1):
+        """
+        Get the least squares slope of a window.
+        
+        :param int window
+            Window index, default -1 (last).
+        
+        :return float slope
+            Pa per interval, None if less than 2 samples.
+        """
+        n = self._n[window]
+        if n < 2:
+            return None
+        sx = n * (n - 1) // 2
+        sxx = (n - 1) * n * (2 * n - 1) // 6
+        return (n * self._sxy[window] - sx * self._sy[window]) / (n * sxx - sx * sx)
+    def change(self, window=-1):
+        """Get the pressure change in hPa over the window duration, None if less than 2 samples."""
+        slope = self.slope(window)
+        return None if slope is None else slope * self.durations[window] / self.interval / 100
+    def rate(self):
+        """Get the pressure change in hPa per 3 hours of the longest window, None if not more than half filled."""
+        if self._n[self._longest] * 2 <= self.size:
+            return None
+        return self.slope(self._longest) * RATE_DURATION / self.interval / 100
+    def forecast(self, pressure):
+        """
+        Get the Domoticz barometer forecast by the rate and the pressure.
+        
+        :param int pressure
+            Pressure in hPa.
+        
+        :return int forecast
+            Forecast 0-6, None if no rate (history too short).
+        """
+        rate = self.rate()
+        if rate is None:
+            return None
+        if rate <= -RATE_RAPID:
+            return FORECAST_THUNDERSTORM
+        if rate <= -RATE_FAST:
+            return FORECAST_CLOUDY_RAIN
+        if rate <= -RATE_STEADY:
+            return FORECAST_CLOUDY
+        if rate >= RATE_RAPID:
+            return FORECAST_UNSTABLE
+        if rate >= RATE_STEADY:
+            return FORECAST_SUNNY
+        if pressure >= 1020:
+            return FORECAST_SUNNY
+        if pressure < 1000:
+            return FORECAST_CLOUDY
+        return FORECAST_STABLE
+    def save(self):
+        """Save the history to the file."""
+        self._unsaved = 0
+        if self.file is None or self.base is None:
+            return
+        try:
+            with open(self.file, 'wb') as f:
+                f.write(struct.pack(HEADER, int(time()), self.base, self.head, self.count, self.size))
+                f.write(self.history)
+        except OSError as e:
+            print(f'[ERROR] Pressure trend save {e}')
+    def restore(self):
+        """Restore the history from the file, if the file exists and the history is not too old."""
+        try:
+            with open(self.file, 'rb') as f:
+                (saved, base, head, count, size) = struct.unpack(HEADER, f.read(struct.calcsize(HEADER)))
+                history = array('h', [0] * size)
+                f.readinto(history)
+        except (OSError, ValueError):
+            return False
+        # The intervals missed are unknown if the RTC was not set at the save or is not set now
+        now = int(time())
+        if gmtime(saved)[0] < MIN_YEAR or gmtime(now)[0] < MIN_YEAR:
+            print(f'[ERROR] Pressure trend restore RTC not set')
+            return False
+        # Missed intervals since the save
+        gap = (now - saved) * 1000 // self.interval
+        if size != self.size or gap < 0 or gap >= self.size:
+            return False
+        self.history = history
+        self.base = base
+        self.head = head
+        self.count = count
+        self._gap = gap
+        self._rebuild()
+        return True
+    def report(self):
+        """Get the samples and the change per window as text line."""
+        changes = []
+        for w in range(len(self.windows)):
+            change = self.change(w)
+            changes.append(f'{self.durations[w] // 60000}min=' + ('-' if change is None else f'{change:.1f}hPa'))
+        return f'samples={self.count}, ' + ', '.join(changes)
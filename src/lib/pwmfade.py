@@ -0,0 +1,215 @@
+"""
+File:	pwmfade.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Non-blocking PWM fade engine for LEDs with gamma correction, i.e. for Domoticz dimmer and RGB switches.
+Jumping the PWM duty to the requested level looks steppy, a fade written by hand blocks the server loop.
+The fader runs the fades of several PWM channels at once, stepped by a periodic machine.Timer started by fade()
+and stopped if no fade is active, or with period 0 by calling tick() from the main loop.
+The level 0-255 is mapped to the duty by a gamma LUT (array('H')) computed once, between two LUT entries
+the duty is interpolated, so slow fades at low levels are smooth.
+:notes
+Easing curves: LINEAR, EASE_IN, EASE_OUT, EASE_IN_OUT (smoothstep), computed with integers.
+A new target during a fade (retarget) starts from the current level, so there is no jump.
+A retarget of an EASE_IN_OUT fade uses EASE_OUT, so the level keeps moving instead of easing in again.
+A channel output is a PWM object (duty_u16) or a function called with the duty 0-65535.
+:usage
+from machine import Pin, PWM
+from pwmfade import Fader, EASE_IN_OUT
+fader = Fader(duration=800)
+red = fader.add(PWM(Pin(2), freq=1000))
+fader.fade(red, 255)
+fader.fade(red, 32, duration=2000, curve=EASE_IN_OUT)
+"""
+# Imports
+from array import array
+from machine import Timer
+from time import ticks_ms, ticks_diff
+# Easing curves
+LINEAR = 0
+EASE_IN = 1
+EASE_OUT = 2
+EASE_IN_OUT = 3
+# Max level
+LEVEL_MAX = 255
+# Gamma of the LUT
+GAMMA = 2.2
+def gamma_lut(gamma=GAMMA, size=LEVEL_MAX + 1):
+    """Get the LUT with the duty 0-65535 per level 0-size-1."""
+    return array('H', [round(65535 * (i / (size - 1)) ** gamma) for i in range(size)])
+# Gamma LUT computed once
+LUT = gamma_lut()
+def ease(curve, p):
+    """
+    Get the eased progress.
+    
+    :param int curve
+        Easing curve.
+    
+    :param int p
+        Progress 0-1024.
+    
+    :return int progress
+        Eased progress 0-1024.
+    """
+    if curve == EASE_IN:
+        return p * p >> 10
+    if curve == EASE_OUT:
+        q = 1024 - p
+        return 1024 - (q * q >> 10)
+    if curve == EASE_IN_OUT:
+        # p * p >> 4 keeps the product a small int and the curve monotonic
+        return (p * p >> 4) * (3072 - 2 * p) >> 16
+    return p
+class Channel:
+    """Output, current level & fade of a channel. Levels are fixed point << 8."""
+    def __init__(self, output):
+        self.output = output
+        self.level = 0
+        self.start = 0
+        self.target = 0
+        self.t0 = 0
+        self.duration = 0
+        self.curve = LINEAR
+        self.active = False
+class Fader:
+    def __init__(self, duration=500, curve=EASE_IN_OUT, period=10, lut=LUT):
+        """
+        Init the fader.
+        
+        :param int duration
+            Default fade duration in ms, default 500.
+        
+        :param int curve
+            Default easing curve, default EASE_IN_OUT.
+        
+        :param int period
+            Timer period in ms, default 10 (100 steps per second).
+        
+        :param array lut
+            Gamma LUT with the duty per level 0-255, default LUT (gamma 2.2).
+        """
+        self.duration = duration
+        self.curve = curve
+        self.period = period
+        self.lut = lut
+        self.channels = []
+        self._timer = None
+        self._running = False
+        self._timer_callback = self._on_timer
+    def add(self, output):
+        """
+        Add a channel, the level is 0.
+        
+        :param PWM|function output
+            PWM object or function called with the duty 0-65535.
+        
+        :return int channel
+            Channel number.
+        """
+        self.channels.append(Channel(output))
+        self._write(self.channels[-1])
+        return len(self.channels) - 1
+    def _write(self, channel):
+        """Set the duty of the channel level by the LUT, interpolated between the entries."""
+        i = channel.level >> 8
+        duty = self.lut[i]
+        if i < LEVEL_MAX:
+            duty += (self.lut[i + 1] - duty) * (channel.level & 0xFF) >> 8
+        if hasattr(channel.output, 'duty_u16'):
+            channel.output.duty_u16(duty)
+        else:
+            channel.output(duty)
+    def fade(self, channel, level, duration=None, curve=None):
+        """
+        Fade a channel to a level, a fade in progress is retargeted from the current level.
+        
+        :param int channel
+            Channel number.
+        
+        :param int level
+            Target level 0-255.
+        
+        :param int duration
+            Fade duration in ms, default None uses the default duration. 0 sets the level at once.
+        
+        :param int curve
+            Easing curve, default None uses the default curve.
+        """
+        ch = self.channels[channel]
+        level = max(0, min(LEVEL_MAX, level)) << 8
+        duration = self.duration if duration is None else duration
+        curve = self.curve if curve is None else curve
+        if ch.active and curve == EASE_IN_OUT:
+            curve = EASE_OUT
+        if duration <= 0:
+            self.set(channel, level >> 8)
+            return
+        ch.start = ch.level
+        ch.target = level
+        ch.t0 = ticks_ms()
+        ch.duration = duration
+        ch.curve = curve
+        ch.active = True
+        self._start()
+    def set(self, channel, level):
+        """Set a channel to a level at once, a fade in progress is stopped."""
+        ch = self.channels[channel]
+        ch.active = False
+        ch.level = max(0, min(LEVEL_MAX, level)) << 8
+        self._write(ch)
+    def cancel(self, channel):
+        """Stop the fade of a channel at the current level."""
+        self.channels[channel].active = False
+    def level(self, channel):
+        """Get the current level 0-255 of a channel."""
+        return self.channels[channel].level >> 8
+    def active(self):
+        """Check if a fade is in progress."""
+        for ch in self.channels:
+            if ch.active:
+                return True
+        return False
+    def _start(self):
+        """Start the timer if not running."""
+        if self._running or self.period <= 0:
+            return
+        if self._timer is None:
+            self._timer = Timer()
+        self._timer.init(mode=Timer.PERIODIC, period=self.period, callback=self._timer_callback)
+        self._running = True
+    def stop(self):
+        """Stop the timer, the fades are stepped by tick()."""
+        if self._timer is not None:
+            self._timer.deinit()
+        self._running = False
+    def _on_timer(self, timer):
+        if not self.tick():
+            self.stop()
+    def tick(self, now=None):
+        """
+        Step the active fades.
+        
+        :param int now
+            Time in ms, default None uses ticks_ms().
+        
+        :return bool
+            True if a fade is still active.
+        """
+        if now is None:
+            now = ticks_ms()
+        active = False
+        for ch in self.channels:
+            if not ch.active:
+                continue
+            elapsed = ticks_diff(now, ch.t0)
+            if elapsed >= ch.duration:
+                ch.level = ch.target
+                ch.active = False
+            else:
+                p = ease(ch.curve, (elapsed << 10) // ch.duration)
+                ch.level = ch.start + ((ch.target - ch.start) * p >> 10)
+                active = True
+            self._write(ch)
+        return active
@@ -0,0 +1,154 @@
+"""
+File:	reporter.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Change reporter between sensor readings and the Domoticz/MQTT publishers, suppressing updates without change.
+Per channel: absolute & relative deadband, minimum interval between reports and forced heartbeat interval.
+Replaces the ad hoc change checks like the offset of ikeavindriktning.py or the NOISE_LEVEL of potmeterdimmer.py.
+For slow changing temperature sensors the network traffic drops by an order of magnitude.
+:notes
+A reading is reported if:
+- it is the first reading of the channel, or
+- it differs from the last reported reading by more than the deadband and min_interval ms passed since the last report, or
+- heartbeat ms passed since the last report (heartbeat 0 disables).
+The deadband is the larger of absolute and relative * abs(last reported value).
+The change is compared against the last reported value (not the last reading), so a slow drift is reported.
+A reading is a number, a tuple or list of numbers (reported if any element changed) or a dict of numbers (keys compared).
+Counters per channel: readings, reports, suppressed, the suppression ratio is suppressed / readings.
+A reading held back by the min interval is kept as pending and reported by flush() once the min interval passed,
+so the last change is reported also if no further reading follows (i.e. level change events).
+:usage
+from reporter import Reporter
+reporter = Reporter()
+reporter.add('temp', lambda value: print('publish', value), absolute=0.2, heartbeat=900000)
+reporter.update('temp', 21.4)
+"""
+# Imports
+from time import ticks_ms, ticks_diff
+class Channel:
+    """Deadband, intervals, last report and counters of a channel."""
+    def __init__(self, name, publish, absolute, relative, min_interval, heartbeat):
+        self.name = name
+        self.publish = publish
+        self.absolute = absolute
+        self.relative = relative
+        self.min_interval = min_interval
+        self.heartbeat = heartbeat
+        self.value = None
+        self.time = 0
+        self.pending = None
+        # Counters
+        self.readings = 0
+        self.reports = 0
+        self.suppressed = 0
+class Reporter:
+    def __init__(self):
+        """Init the reporter without channels."""
+        self.channels = {}
+    def add(self, name, publish, absolute=0, relative=0, min_interval=0, heartbeat=0):
+        """
+        Add a channel.
+        
+        :param string name
+            Name of the channel.
+        
+        :param function publish
+            Function publish(value) sending the reading, i.e. to Domoticz.
+        
+        :param float absolute
+            Absolute deadband, default 0 (any change is reported).
+        
+        :param float relative
+            Relative deadband as fraction of the last reported value, default 0.
+        
+        :param int min_interval
+            Min time in ms between reports of a change, default 0.
+        
+        :param int heartbeat
+            Time in ms after which the reading is reported without change, default 0 (no heartbeat).
+        
+        :return Channel channel
+        """
+        channel = Channel(name, publish, absolute, relative, min_interval, heartbeat)
+        self.channels[name] = channel
+        return channel
+    def _exceeds(self, channel, old, new):
+        """Check if a number changed by more than the deadband."""
+        return abs(new - old) > max(channel.absolute, channel.relative * abs(old))
+    def _changed(self, channel, old, new):
+        """Check if a reading changed by more than the deadband."""
+        if isinstance(new, dict):
+            for key in new:
+                if key not in old or self._exceeds(channel, old[key], new[key]):
+                    return True
+            return False
+        if isinstance(new, (tuple, list)):
+            for i in range(len(new)):
+                if self._exceeds(channel, old[i], new[i]):
+                    return True
+            return False
+        return self._exceeds(channel, old, new)
+    def update(self, name, value, now=None):
+        """
+        Update a channel with a reading and publish if reported.
+        
+        :param string name
+            Name of the channel.
+        
+        :param number|tuple|list|dict value
+            Reading.
+        
+        :param int now
+            Time in ms, default None uses ticks_ms().
+        
+        :return bool
+            True if reported.
+        """
+        channel = self.channels[name]
+        if now is None:
+            now = ticks_ms()
+        channel.readings += 1
+        if channel.value is not None:
+            elapsed = ticks_diff(now, channel.time)
+            due = channel.heartbeat > 0 and elapsed >= channel.heartbeat
+            if not due and elapsed < channel.min_interval:
+                channel.pending = value
+                channel.suppressed += 1
+                return False
+            if not due and not self._changed(channel, channel.value, value):
+                channel.pending = None
+                channel.suppressed += 1
+                return False
+        self._publish(channel, value, now)
+        return True
+    def _publish(self, channel, value, now):
+        """Publish a reading and keep it as last reported."""
+        channel.value = value
+        channel.time = now
+        channel.pending = None
+        channel.reports += 1
+        channel.publish(value)
+    def flush(self, now=None):
+        """
+        Report the pending readings held back by the min interval, if the min interval passed and changed.
+        
+        :param int now
+            Time in ms, default None uses ticks_ms().
+        """
+        if now is None:
+            now = ticks_ms()
+        for channel in self.channels.values():
+            value = channel.pending
+            if value is not None and ticks_diff(now, channel.time) >= channel.min_interval:
+                channel.pending = None
+                if self._changed(channel, channel.value, value):
+                    self._publish(channel, value, now)
+    def ratio(self, name):
+        """Get the suppression ratio (0-1) of a channel."""
+        channel = self.channels[name]
+        return channel.suppressed / channel.readings if channel.readings > 0 else 0
+    def report(self):
+        """Get the counters per channel as list of text lines."""
+        return [f'{channel.name}: readings={channel.readings}, reports={channel.reports}, suppressed={channel.suppressed} ({self.ratio(channel.name) * 100:.0f}%)'
+                for channel in self.channels.values()]
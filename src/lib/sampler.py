@@ -0,0 +1,152 @@
+"""
+File:	sampler.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Cooperative sampling scheduler for multi-sensor nodes, one Pico W serving several sensors at different rates.
+A sensor registers a sample coroutine (generator function) with period, phase offset and max jitter.
+The sample coroutine yields the time in ms to wait for a conversion and returns the reading, i.e.
+    def sample():
+        ds.convert_temp()
+        yield 750
+        return ds.read_temp(rom)
+Whilst a sensor waits for its conversion, the other sensors sample, so the slow conversions
+(DS18B20 750ms, BMP280 forced mode) overlap instead of serialising with sleep().
+The sampler runs on the low-power scheduler (lowpower.py), the CPU is parked between the steps.
+:notes
+The phase offset spaces the sampling of sensors with the same period.
+A sample starting later than jitter ms after its due time is counted as miss.
+A sample still running when due again is not started and counted as overrun.
+An exception raised by a sample is counted as error and printed, the sampling continues.
+Per task statistics: runs, misses, overruns, errors, max start lateness, last & max duration (start to reading)
+and the busy time (CPU time of the steps).
+:usage
+from sampler import Sampler
+sampler = Sampler()
+sampler.add('ds18b20', sample, 60000, phase=0, jitter=100, callback=lambda value: print(value))
+sampler.run()
+"""
+# Imports
+from time import ticks_ms, ticks_us, ticks_add, ticks_diff
+from lowpower import Scheduler
+class SampleTask:
+    """Sample coroutine with its timing & statistics."""
+    def __init__(self, name, sample, period, phase, jitter, callback):
+        self.name = name
+        self.sample = sample
+        self.period = period
+        self.jitter = jitter
+        self.callback = callback
+        self.due = ticks_add(ticks_ms(), phase)
+        self.gen = None
+        self.start = 0
+        self.value = None
+        # Statistics
+        self.runs = 0
+        self.misses = 0
+        self.overruns = 0
+        self.errors = 0
+        self.max_late = 0
+        self.duration = 0
+        self.max_duration = 0
+        self.busy_us = 0
+class Sampler:
+    def __init__(self, sched=None):
+        """
+        Init the sampler.
+        
+        :param Scheduler sched
+            Low-power scheduler to run on, default None creates one.
+        """
+        self.sched = Scheduler() if sched is None else sched
+        self.tasks = []
+    def add(self, name, sample, period, phase=0, jitter=0, callback=None):
+        """
+        Add a sensor.
+        
+        :param string name
+            Name of the sensor.
+        
+        :param function sample
+            Generator function yielding the conversion waits in ms and returning the reading.
+            A plain function returning the reading is also accepted.
+        
+        :param int period
+            Sampling period in ms.
+        
+        :param int phase
+            Delay in ms of the first sample, default 0.
+        
+        :param int jitter
+            Max start lateness in ms, default 0.
+        
+        :param function callback
+            Function callback(value) called with the reading, i.e. to send to Domoticz.
+        
+        :return SampleTask task
+        """
+        task = SampleTask(name, sample, period, phase, jitter, callback)
+        # Callbacks created once
+        task.begin = lambda: self._begin(task)
+        task.step = lambda: self._step(task)
+        self.sched.every(period, task.begin, phase=phase)
+        self.tasks.append(task)
+        return task
+    def _begin(self, task):
+        """Start a sample if the previous sample is done."""
+        now = ticks_ms()
+        late = ticks_diff(now, task.due)
+        # Next due time, missed periods are skipped as by the scheduler
+        task.due = ticks_add(task.due, (late // task.period + 1) * task.period)
+        if task.gen is not None:
+            task.overruns += 1
+            return
+        if late > task.jitter:
+            task.misses += 1
+        if late > task.max_late:
+            task.max_late = late
+        task.start = now
+        # The sample is called by the first step, so its exceptions are counted
+        task.gen = task.sample
+        self._step(task)
+    def _step(self, task):
+        """Run the sample until it yields a wait or returns the reading."""
+        t = ticks_us()
+        done = False
+        try:
+            if task.gen is task.sample:
+                task.gen = task.sample()
+            if hasattr(task.gen, 'send'):
+                wait = next(task.gen)
+            else:
+                # Plain function: the reading is returned at once
+                task.value = task.gen
+                done = True
+        except StopIteration as e:
+            task.value = e.value
+            done = True
+        except Exception as e:
+            print(f'[ERROR] Sample {task.name}: {e}')
+            task.errors += 1
+            task.gen = None
+            task.busy_us += ticks_diff(ticks_us(), t)
+            return
+        task.busy_us += ticks_diff(ticks_us(), t)
+        if not done:
+            self.sched.after(wait, task.step)
+            return
+        task.gen = None
+        task.runs += 1
+        task.duration = ticks_diff(ticks_ms(), task.start)
+        if task.duration > task.max_duration:
+            task.max_duration = task.duration
+        if task.callback is not None:
+            task.callback(task.value)
+    def run(self):
+        """Run forever."""
+        self.sched.run()
+    def report(self):
+        """Get the statistics per task as list of text lines."""
+        return [f'{task.name}: runs={task.runs}, misses={task.misses}, overruns={task.overruns}, errors={task.errors}, '
+                f'max_late={task.max_late}ms, duration={task.duration}ms, max_duration={task.max_duration}ms, busy={task.busy_us // 1000}ms'
+                for task in self.tasks]
@@ -0,0 +1,299 @@
+"""
+File:	segmentanimator.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Non-blocking animation engine for the 7-segment LED displays TM1637 (4 digits) and TM1638 (8 digits).
+The driver function scroll() encodes the string and sleeps between each step,
+which freezes the Pico W for the length of the text (no HTTP requests are handled in the meantime).
+The animator encodes the text once into a segment buffer and moves a window over this buffer per step.
+Each animation is a generator yielding the delay in ms until its next step.
+Several animations (scroll, blink, fade brightness) run at the same time, i.e. a blinking scroll text.
+An animation is cancelled by name or all animations are cancelled when a new value from Domoticz arrives.
+The animations are stepped by a periodic machine.Timer (start) or by calling tick() from the main loop.
+The timer runs only whilst animations are active, it is stopped when the last animation ends or is cancelled
+and started again by the next animation.
+:notes
+The display segments are written with TM1637.write(segments, pos) or TM1638.segments(segments, pos).
+The animations only change the animator state (frame, visible, brightness).
+The frame is written to the display once per tick, and only if an animation has changed it.
+Starting an animation with the name of a running animation replaces the running animation.
+:usage
+import tm1637
+from segmentanimator import SegmentAnimator
+tm = tm1637.TM1637(clk=Pin(21), dio=Pin(20))
+anim = SegmentAnimator(tm)
+anim.start()
+anim.scroll('domoticz', delay=250, repeat=True)
+anim.blink(500, count=4)
+# New value from Domoticz: cancel all animations and show the value
+anim.show('21*c')
+"""
+# Imports
+from machine import Timer
+from time import ticks_ms, ticks_add, ticks_diff
+# Animation names
+SCROLL = 'scroll'
+BLINK = 'blink'
+FADE = 'fade'
+class SegmentAnimator:
+    # Default timer period in ms used to step the animations
+    TICK_PERIOD = 10
+    def __init__(self, display, digits=None):
+        """
+        Init the animator for a TM1637 or TM1638 display object.
+        
+        :param object display
+            TM1637 or TM1638 (tm1638ex) object.
+        
+        :param int digits
+            Number of digits of the display. Default 4 for the TM1637, 8 for the TM1638.
+        """
+        self.display = display
+        # The TM1638 writes the digits via segments(), the TM1637 via write()
+        if hasattr(display, 'segments'):
+            self._write = display.segments
+            self.digits = 8 if digits is None else digits
+        else:
+            self._write = display.write
+            self.digits = 4 if digits is None else digits
+        # Brightness to restore after a fade has been cancelled
+        self.brightness = display.brightness()
+        # Active animations as list of [name, generator, due ticks_ms]
+        self._animations = []
+        # Segments shown if visible, blank segments if not visible (blink)
+        self._frame = bytearray(self.digits)
+        self._blank = bytes(self.digits)
+        self._visible = True
+        self._dirty = False
+        # Set whilst writing to the display to avoid the timer writing at the same time
+        self._busy = False
+        # Timer period in ms, 0 = no timer (stepped by tick)
+        self.period = 0
+        self._timer = None
+        self._running = False
+        # Bound once to avoid allocating a bound method on every timer callback
+        self._timer_callback = self._on_timer
+    def start(self, period=TICK_PERIOD):
+        """
+        Step the animations with a periodic timer, the timer runs whilst animations are active.
+        
+        :param int period
+            Timer period in ms. Default 10ms.
+        """
+        self.period = period
+        if self._animations:
+            self._start()
+    def stop(self):
+        """Stop the timer. Active animations are paused, not cancelled, until start() or tick()."""
+        self.period = 0
+        self._stop()
+    def _start(self):
+        # Start the timer if not running
+        if self._running or self.period <= 0:
+            return
+        if self._timer is None:
+            self._timer = Timer()
+        self._timer.init(mode=Timer.PERIODIC, period=self.period, callback=self._timer_callback)
+        self._running = True
+    def _stop(self):
+        if self._timer is not None:
+            self._timer.deinit()
+        self._running = False
+    def _on_timer(self, t):
+        if not self.tick():
+            self._stop()
+    def active(self, name=None):
+        """
+        Check if an animation is running.
+        
+        :param string name
+            Animation name. If None check for any animation.
+        :return bool
+        """
+        if name is None:
+            return len(self._animations) > 0
+        for anim in self._animations:
+            if anim[0] == name:
+                return True
+        return False
+    def add(self, name, generator):
+        """
+        Add an animation generator which yields the delay in ms until its next step.
+        An active animation with the same name is replaced.
+        The first step runs on the next tick.
+        
+        :param string name
+            Animation name, i.e. SCROLL.
+        
+        :param generator generator
+            Animation generator.
+        """
+        self._busy = True
+        self._remove(name)
+        self._animations.append([name, generator, ticks_ms()])
+        self._busy = False
+        self._start()
+    def cancel(self, name=None):
+        """
+        Cancel an animation or all animations.
+        A cancelled blink leaves the display visible, a cancelled fade restores the brightness.
+        
+        :param string name
+            Animation name. If None cancel all animations.
+        """
+        self._busy = True
+        if name is None:
+            fade = self.active(FADE)
+            self._animations.clear()
+        else:
+            fade = name == FADE and self.active(FADE)
+            self._remove(name)
+        if fade:
+            self.display.brightness(self.brightness)
+        if not self.active(BLINK) and not self._visible:
+            self._visible = True
+            self._dirty = True
+        self._render()
+        self._busy = False
+    def _remove(self, name):
+        for i in range(len(self._animations) - 1, -1, -1):
+            if self._animations[i][0] == name:
+                self._animations.pop(i)
+    def tick(self, now=None):
+        """
+        Run the steps of the animations which are due and write the frame to the display if changed.
+        
+        :param int now
+            Time in ticks_ms. Default ticks_ms().
+        
+        :return bool
+            True if an animation is still active.
+        """
+        if self._busy:
+            return True
+        self._busy = True
+        if now is None:
+            now = ticks_ms()
+        animations = self._animations
+        i = len(animations) - 1
+        while i >= 0:
+            anim = animations[i]
+            if ticks_diff(now, anim[2]) >= 0:
+                try:
+                    anim[2] = ticks_add(now, next(anim[1]))
+                except StopIteration:
+                    animations.pop(i)
+            i -= 1
+        self._render()
+        self._busy = False
+        return len(animations) > 0
+    def _render(self):
+        if self._dirty:
+            self._dirty = False
+            self._write(self._frame if self._visible else self._blank)
+    def show(self, string):
+        """
+        Cancel all animations and show a string.
+        
+        :param string string
+            Text up to the number of digits.
+        """
+        self.cancel()
+        self.show_segments(self.display.encode_string(string))
+    def show_segments(self, segments):
+        """
+        Show segments without cancelling the animations, i.e. the value whilst blinking.
+        
+        :param bytearray segments
+            Segments up to the number of digits, unused digits are blank.
+        """
+        self._busy = True
+        self._set_frame(segments)
+        self._render()
+        self._busy = False
+    def _set_frame(self, segments):
+        frame = self._frame
+        n = min(len(segments), self.digits)
+        frame[:n] = segments[:n]
+        for i in range(n, self.digits):
+            frame[i] = 0
+        self._dirty = True
+    def scroll(self, string, delay=250, repeat=False):
+        """
+        Scroll a string from the right to the left.
+        The string starts off-screen right and scrolls until off-screen left.
+        
+        :param string|bytearray string
+            Text or segments to scroll.
+        
+        :param int delay
+            Delay in ms between the scroll steps.
+        
+        :param bool repeat
+            Flag to scroll until cancelled.
+        """
+        segments = string if isinstance(string, (bytes, bytearray)) else self.display.encode_string(string)
+        self.add(SCROLL, self._scroll(segments, delay, repeat))
+    def _scroll(self, segments, delay, repeat):
+        digits = self.digits
+        # Pre-encoded segments with blank padding at both sides
+        buf = bytearray(digits) + segments + bytearray(digits)
+        window = memoryview(buf)
+        steps = len(segments) + digits + 1
+        while True:
+            for i in range(steps):
+                self._set_frame(window[i:i + digits])
+                yield delay
+            if not repeat:
+                return
+    def blink(self, period=500, count=0):
+        """
+        Blink the display.
+        
+        :param int period
+            Blink period in ms (off + on).
+        
+        :param int count
+            Number of blinks. 0 blinks until cancelled.
+        """
+        self.add(BLINK, self._blink(period // 2, count))
+    def _blink(self, delay, count):
+        n = 0
+        while count == 0 or n < count:
+            self._visible = False
+            self._dirty = True
+            yield delay
+            self._visible = True
+            self._dirty = True
+            yield delay
+            n += 1
+    def fade(self, start=0, end=7, delay=100, repeat=False):
+        """
+        Fade the brightness from start to end level.
+        
+        :param int start
+            Start brightness 0-7.
+        
+        :param int end
+            End brightness 0-7.
+        
+        :param int delay
+            Delay in ms between the brightness levels.
+        
+        :param bool repeat
+            Flag to fade back and forth (pulse) until cancelled.
+        """
+        if not 0 <= start <= 7 or not 0 <= end <= 7:
+            raise ValueError("Brightness out of range")
+        self.add(FADE, self._fade(start, end, delay, repeat))
+    def _fade(self, start, end, delay, repeat):
+        while True:
+            step = 1 if end >= start else -1
+            for level in range(start, end + step, step):
+                self.display.brightness(level)
+                yield delay
+            if not repeat:
+                self.brightness = end
+                return
+            start, end = end, start
@@ -8,6 +8,8 @@ Tested with a Tower Pro Micro Servo 9 g SG90.
 Min and max duty default values are obtained via try out.
 Min angle is 0, max angle is 180.
 Servo signal pin is default Pico Pin GP0 (Pin #1).
+The duty is computed with integers and written only if changed.
+For eased, synchronised moves of several servos see servomotion.py.
 """
 # Imports
 import machine
@@ -29,20 +31,42 @@ class Servo:
         self.pwm.freq(frequency)
         self.MIN_DUTY = MIN_DUTY
         self.MAX_DUTY = MAX_DUTY
+        self.duty = None
         
     """
-    Set the servo angle between 0 - 180 degrees.
+    Get the duty in ns of an angle between 0 - 180 degrees.
     
     :parameter int angle
-        Set the angle of the servo between 0 - 180 degrees.
-    :return flat duty_ns
+    :return int duty_ns
     """
-    def setAngle(self, angle):
+    def angle_duty(self, angle):
         if angle < 0:
             angle = 0
         elif angle > 180:
             angle = 180
-        duty_ns = int(self.MAX_DUTY - angle * (self.MAX_DUTY-self.MIN_DUTY)/180)
+        return self.MAX_DUTY - int(angle * (self.MAX_DUTY - self.MIN_DUTY)) // 180
+        
+    """
+    Set the duty in ns, the PWM is written only if the duty changed.
+    
+    :parameter int duty_ns
+    """
+    def set_duty(self, duty_ns):
+        if duty_ns != self.duty:
+            self.pwm.duty_ns(duty_ns)
+            self.duty = duty_ns
+        
+    """
+    Set the servo angle between 0 - 180 degrees.
+    
+    :parameter int angle
+        Set the angle of the servo between 0 - 180 degrees.
+    :return int duty_ns
+    """
+    def setAngle(self, angle):
+        duty_ns = self.angle_duty(angle)
         # print(duty_ns)
-        self.pwm.duty_ns(duty_ns)
+        self.set_duty(duty_ns)
         return duty_ns
+    
+    set_angle = setAngle
@@ -0,0 +1,207 @@
+"""
+File:	servomotion.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Synchronised motion planner for several servos (servo.py), i.e. a pan/tilt rig.
+Servo.setAngle() jumps to the target, the planner moves the servos with eased trajectories instead,
+all servos of a move start and arrive together.
+Per move the eased progress is computed once into a table, the duty in ns per step and servo into array('I'),
+a periodic machine.Timer started by move() steps the servos by indexing the tables, no floats per step.
+The timer stops if no move is active, or with period 0 the moves are stepped by calling tick() from the main loop.
+:notes
+Easing curves of pwmfade.py: LINEAR, EASE_IN, EASE_OUT, EASE_IN_OUT (smoothstep).
+The move duration is the longest of the requested duration and the time each servo needs within its velocity limit
+(degrees per second, 0 no limit), taking the peak velocity of the curve into account (linear 1x, smoothstep 1.5x, in/out 2x).
+Moves are queued (queue size, move() returns False if full), the next move starts when the previous arrived.
+A servo not part of a move (angle None) holds its position.
+The step is taken from the elapsed time, so a late timer callback does not slow down the move.
+The default period 20ms is the frame of the 50Hz servo signal, the duty is written only if changed.
+:usage
+from servo import Servo
+from servomotion import Planner
+planner = Planner(duration=1000)
+pan = planner.add(Servo(pin=0), speed=120)
+tilt = planner.add(Servo(pin=1), speed=60)
+planner.move((180, 45))
+planner.move((None, 90), duration=500)
+"""
+# Imports
+from array import array
+from machine import Timer
+from time import ticks_ms, ticks_diff
+from pwmfade import LINEAR, EASE_IN, EASE_OUT, EASE_IN_OUT, ease
+# Peak velocity of the easing curves as multiple of the mean velocity * 2
+PEAK = {LINEAR: 2, EASE_IN: 4, EASE_OUT: 4, EASE_IN_OUT: 3}
+class Axis:
+    """Servo, velocity limit, position & duty table of an axis. Positions are duty in ns."""
+    def __init__(self, servo, speed, angle):
+        self.servo = servo
+        # Velocity limit in duty ns per s
+        self.speed = speed * (servo.MAX_DUTY - servo.MIN_DUTY) // 180
+        self.duty = servo.angle_duty(angle)
+        self.table = None
+        servo.set_duty(self.duty)
+class Planner:
+    def __init__(self, duration=1000, curve=EASE_IN_OUT, period=20, queue=8):
+        """
+        Init the planner.
+        
+        :param int duration
+            Default move duration in ms, default 1000.
+        
+        :param int curve
+            Default easing curve, default EASE_IN_OUT.
+        
+        :param int period
+            Timer period in ms, default 20 (servo frame 50Hz).
+        
+        :param int queue
+            Max number of moves waiting, default 8.
+        """
+        self.duration = duration
+        self.curve = curve
+        self.period = period
+        self.size = queue
+        self.axes = []
+        self.queue = []
+        self.steps = 0
+        self.t0 = 0
+        self.moving = False
+        # Counters
+        self.moves = 0
+        self.dropped = 0
+        self._timer = None
+        self._running = False
+        self._timer_callback = self._on_timer
+    def add(self, servo, speed=0, angle=90):
+        """
+        Add a servo, set at once to the start angle.
+        
+        :param Servo servo
+            Servo object.
+        
+        :param int speed
+            Velocity limit in degrees per s, default 0 (no limit).
+        
+        :param int angle
+            Start angle 0-180, default 90.
+        
+        :return int axis
+            Axis number.
+        """
+        self.axes.append(Axis(servo, speed, angle))
+        return len(self.axes) - 1
+    def move(self, angles, duration=None, curve=None):
+        """
+        Queue a synchronised move of the servos.
+        
+        :param list angles
+            Target angle 0-180 per axis, None holds the axis.
+        
+        :param int duration
+            Min move duration in ms, default None uses the default duration.
+        
+        :param int curve
+            Easing curve, default None uses the default curve.
+        
+        :return bool
+            True if queued, False if the queue is full.
+        """
+        if len(self.queue) >= self.size:
+            self.dropped += 1
+            return False
+        self.queue.append((angles,
+                           self.duration if duration is None else duration,
+                           self.curve if curve is None else curve))
+        if not self.moving:
+            self._next(ticks_ms())
+        self._start()
+        return True
+    def _next(self, now):
+        """Plan the next queued move: duration, progress & duty tables."""
+        if len(self.queue) == 0:
+            self.moving = False
+            return False
+        (angles, duration, curve) = self.queue.pop(0)
+        targets = []
+        for i in range(len(self.axes)):
+            axis = self.axes[i]
+            angle = angles[i] if i < len(angles) else None
+            target = axis.duty if angle is None else axis.servo.angle_duty(angle)
+            targets.append(target)
+            # Time the axis needs within the velocity limit
+            delta = abs(target - axis.duty)
+            if axis.speed > 0 and delta > 0:
+                duration = max(duration, delta * 500 * PEAK[curve] // axis.speed)
+        steps = max(1, -(-duration // self.period)) if self.period > 0 else max(1, duration)
+        progress = [ease(curve, (i << 10) // steps) for i in range(steps + 1)]
+        for i in range(len(self.axes)):
+            axis = self.axes[i]
+            delta = targets[i] - axis.duty
+            if delta == 0:
+                axis.table = None
+                continue
+            start = axis.duty
+            axis.table = array('I', [start + (delta * p >> 10) for p in progress])
+        self.steps = steps
+        self.t0 = now
+        self.moving = True
+        self.moves += 1
+        return True
+    def cancel(self):
+        """Stop at the current position, the queued moves are dropped."""
+        self.queue.clear()
+        for axis in self.axes:
+            axis.table = None
+        self.moving = False
+    def active(self):
+        """Check if a move is in progress or queued."""
+        return self.moving
+    def angle(self, axis):
+        """Get the current angle 0-180 of an axis."""
+        servo = self.axes[axis].servo
+        return (servo.MAX_DUTY - self.axes[axis].duty) * 180 // (servo.MAX_DUTY - servo.MIN_DUTY)
+    def _start(self):
+        """Start the timer if not running."""
+        if self._running or self.period <= 0:
+            return
+        if self._timer is None:
+            self._timer = Timer()
+        self._timer.init(mode=Timer.PERIODIC, period=self.period, callback=self._timer_callback)
+        self._running = True
+    def stop(self):
+        """Stop the timer, the moves are stepped by tick()."""
+        if self._timer is not None:
+            self._timer.deinit()
+        self._running = False
+    def _on_timer(self, timer):
+        if not self.tick():
+            self.stop()
+    def tick(self, now=None):
+        """
+        Step the servos of the active move, start the next queued move on arrival.
+        
+        :param int now
+            Time in ms, default None uses ticks_ms().
+        
+        :return bool
+            True if a move is still active.
+        """
+        if not self.moving:
+            return False
+        if now is None:
+            now = ticks_ms()
+        period = self.period if self.period > 0 else 1
+        step = ticks_diff(now, self.t0) // period
+        if step > self.steps:
+            step = self.steps
+        for axis in self.axes:
+            if axis.table is not None:
+                axis.duty = axis.table[step]
+                axis.servo.set_duty(axis.duty)
+        if step == self.steps:
+            for axis in self.axes:
+                axis.table = None
+            return self._next(now)
+        return True
@@ -0,0 +1,175 @@
+"""
+File:	sevensegment.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Shared 7-segment codec used by the TM1637, TM1638 and TM1638ex display drivers.
+Each driver had its own segment table and an if-chain per character to get the segment code.
+This codec uses one 128-entry lookup table indexed by the ASCII code of the character.
+A decimal point '.' or colon ':' is folded into the MSB of the previous segment.
+The number, temperature and humidity functions write the segments into a buffer supplied by the caller,
+without formatting a string first, so the drivers can reuse one preallocated buffer.
+:notes
+Supported characters: 0-9, a-z, A-Z (same segments), space, dash, star (degrees), dot & colon.
+A dot or colon without a previous segment is encoded as decimal point only.
+The MSB of a segment is the decimal point or the colon (2nd digit of the TM1637) depending on the display.
+Tests: tests/test_sevensegment.py (runs on a host with CPython and pytest).
+:usage
+import sevensegment
+segments = sevensegment.encode_string('12.5*c')
+buf = bytearray(4)
+sevensegment.number_into(buf, -42)
+sevensegment.temperature_into(buf, 21)
+"""
+# Imports
+from micropython import const
+# Segment for the decimal point or colon
+DP = const(0x80)
+# Marker in the lookup table for characters which can not be displayed
+_INVALID = const(0xFF)
+# 0-9, a-z, blank, dash, star - the table used by the drivers
+_SEGMENTS = b'\x3F\x06\x5B\x4F\x66\x6D\x7D\x07\x7F\x6F\x77\x7C\x39\x5E\x79\x71\x3D\x76\x06\x1E\x76\x38\x55\x54\x3F\x73\x67\x50\x6D\x78\x3E\x1C\x2A\x76\x6E\x5B\x00\x40\x63'
+# Segments for often used characters
+BLANK = const(0x00)
+MINUS = const(0x40)
+DEGREES = const(0x63)
+# Digits 0-9 & hex digits a-f
+HEXDIGITS = _SEGMENTS[0:16]
+def _table():
+    """Create the 128-entry lookup table indexed by the ASCII code."""
+    table = bytearray(b'\xff' * 128)
+    for i in range(10):
+        table[48 + i] = _SEGMENTS[i]		# 0-9
+    for i in range(26):
+        table[65 + i] = _SEGMENTS[10 + i]	# uppercase A-Z
+        table[97 + i] = _SEGMENTS[10 + i]	# lowercase a-z
+    table[32] = _SEGMENTS[36]	# space
+    table[45] = _SEGMENTS[37]	# dash
+    table[42] = _SEGMENTS[38]	# star/degrees
+    table[46] = DP				# dot
+    table[58] = DP				# colon
+    return table
+# Lookup table segment = SEGMENTS[ord(char)]
+SEGMENTS = _table()
+# Powers of 10 used to limit the numbers to the digits available
+_POW10 = (1, 10, 100, 1000, 10000, 100000, 1000000, 10000000, 100000000)
+def encode_digit(digit):
+    """Convert a digit 0-9, a-f (0-15) to a segment."""
+    return HEXDIGITS[digit & 0x0f]
+def encode_char(char):
+    """Convert a character 0-9, a-z, space, dash or star to a segment."""
+    o = ord(char)
+    segment = SEGMENTS[o] if o < 128 else _INVALID
+    if segment == _INVALID:
+        raise ValueError("Character out of range: {:d} '{:s}'".format(o, chr(o)))
+    return segment
+def encode_into(buf, string, pos=0):
+    """
+    Convert a string to segments written into a buffer.
+    Dots and colons are merged with the previous character.
+    
+    :param bytearray buf
+        Buffer to write the segments to.
+    
+    :param string string
+        String containing 0-9, a-z, space, dash, star, dot or colon.
+    
+    :param int pos
+        Position in the buffer of the first segment.
+    :return int
+        Number of segments written.
+    """
+    table = SEGMENTS
+    j = pos
+    for char in string:
+        o = ord(char)
+        segment = table[o] if o < 128 else _INVALID
+        if segment == DP and j > pos:
+            buf[j - 1] |= DP
+            continue
+        if segment == _INVALID:
+            raise ValueError("Character out of range: {:d} '{:s}'".format(o, chr(o)))
+        buf[j] = segment
+        j += 1
+    return j - pos
+def encoded_length(string):
+    """Get the number of segments of a string, i.e. the dots and colons merged."""
+    n = 0
+    for char in string:
+        if (char == '.' or char == ':') and n > 0:
+            continue
+        n += 1
+    return n
+def encode_string(string):
+    """Convert a string to a new bytearray of segments, dots and colons merged with the previous character."""
+    segments = bytearray(encoded_length(string))
+    encode_into(segments, string)
+    return segments
+def number_into(buf, num, pos=0, width=4, zeros=False):
+    """
+    Write an integer right aligned into a buffer.
+    The number is limited to the width, i.e. for width 4 to the range -999 through 9999.
+    
+    :param bytearray buf
+        Buffer to write the segments to.
+    
+    :param int num
+        Number to write.
+    
+    :param int pos
+        Position in the buffer of the first digit.
+    
+    :param int width
+        Number of digits 1-8.
+    
+    :param bool zeros
+        Flag to pad with leading zeros instead of blanks.
+    :return int
+        Number of segments written (width).
+    """
+    num = max(1 - _POW10[width - 1], min(num, _POW10[width] - 1))
+    negative = num < 0
+    if negative:
+        num = -num
+    digits = HEXDIGITS
+    i = pos + width - 1
+    while True:
+        buf[i] = digits[num % 10]
+        num //= 10
+        i -= 1
+        if num == 0:
+            break
+    if negative:
+        buf[i] = MINUS
+        i -= 1
+    padding = digits[0] if zeros else BLANK
+    while i >= pos:
+        buf[i] = padding
+        i -= 1
+    return width
+def hex_into(buf, val, pos=0, width=4):
+    """Write a hex value right aligned with leading zeros into a buffer."""
+    digits = HEXDIGITS
+    for i in range(pos + width - 1, pos - 1, -1):
+        buf[i] = digits[val & 0x0f]
+        val >>= 4
+    return width
+def _value_unit_into(buf, num, pos, unit1, unit2):
+    # 2 digit value -9 through 99 or lo/hi followed by 2 unit segments
+    if num < -9:
+        buf[pos] = SEGMENTS[108]	# l
+        buf[pos + 1] = SEGMENTS[111]	# o
+    elif num > 99:
+        buf[pos] = SEGMENTS[104]	# h
+        buf[pos + 1] = SEGMENTS[105]	# i
+    else:
+        number_into(buf, num, pos, 2)
+    buf[pos + 2] = unit1
+    buf[pos + 3] = unit2
+    return 4
+def temperature_into(buf, num, pos=0):
+    """Write a 2 digit temperature followed by degrees C into a buffer (4 segments)."""
+    return _value_unit_into(buf, num, pos, DEGREES, SEGMENTS[99])
+def humidity_into(buf, num, pos=0):
+    """Write a 2 digit humidity followed by RH into a buffer (4 segments)."""
+    return _value_unit_into(buf, num, pos, SEGMENTS[114], SEGMENTS[104])
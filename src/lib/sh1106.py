@@ -69,6 +69,12 @@
 # display.fill(0)
 # display.text('Testing 1', 0, 0, 1)
 # display.show()
+#
+# Modifications by rwbl 20261019:
+# With rotate=90/270 show() remaps only the changed region of the render buffer,
+# the drawing functions register the changed pages from the x coordinates.
+# The pages are sent as preallocated memoryview slices without copies, I2C with writevto
+# and the control byte, SPI with a preallocated command buffer.
 from micropython import const
 import utime as time
 import framebuf
@@ -92,6 +98,9 @@ class SH1106(framebuf.FrameBuffer):
         self.bufsize = self.pages * self.width
         self.renderbuf = bytearray(self.bufsize)
         self.pages_to_update = 0
+        # Changed render buffer rows y0 (inclusive) to y1 (exclusive) with rotate 90/270 (rwbl)
+        self.update_y0 = self.width
+        self.update_y1 = 0
         if self.rotate90:
             self.displaybuf = bytearray(self.bufsize)
             # HMSB is required to keep the bit order in the render buffer
@@ -103,6 +112,10 @@ class SH1106(framebuf.FrameBuffer):
             self.displaybuf = self.renderbuf
             super().__init__(self.renderbuf, self.width, self.height,
                              framebuf.MONO_VLSB)
+        # Preallocated memoryview slice per page of the display buffer (rwbl)
+        displaymv = memoryview(self.displaybuf)
+        self.pagebufs = [displaymv[self.width * page:self.width * (page + 1)]
+                         for page in range(self.pages)]
         # flip() was called rotate() once, provide backwards compatibility.
         self.rotate = self.flip
         self.init_display()
@@ -140,60 +153,93 @@ class SH1106(framebuf.FrameBuffer):
         # self.* lookups in loops take significant time (~4fps).
         (w, p, db, rb) = (self.width, self.pages,
                           self.displaybuf, self.renderbuf)
-        if self.rotate90:
-            for i in range(self.bufsize):
-                db[w * (i % p) + (i // p)] = rb[i]
         if full_update:
             pages_to_update = (1 << self.pages) - 1
         else:
             pages_to_update = self.pages_to_update
+        if self.rotate90:
+            # Remap only the changed region (rwbl): the changed pages and within a page the
+            # changed render buffer rows (display columns). Render buffer row y holds byte page
+            # of display column y at index y * p + page, so the source index steps by p.
+            if full_update:
+                (y0, y1) = (0, w)
+            else:
+                (y0, y1) = (self.update_y0, self.update_y1)
+            for page in range(p):
+                if (pages_to_update & (1 << page)):
+                    j = y0 * p + page
+                    for i in range(w * page + y0, w * page + y1):
+                        db[i] = rb[j]
+                        j += p
+            self.update_y0 = w
+            self.update_y1 = 0
         #print("Updating pages: {:08b}".format(pages_to_update))
         for page in range(self.pages):
             if (pages_to_update & (1 << page)):
                 self.write_cmd(_SET_PAGE_ADDRESS | page)
                 self.write_cmd(_LOW_COLUMN_ADDRESS | 2)
                 self.write_cmd(_HIGH_COLUMN_ADDRESS | 0)
-                self.write_data(db[(w*page):(w*page+w)])
+                self.write_data(self.pagebufs[page])
         self.pages_to_update = 0
     def pixel(self, x, y, color=None):
         if color is None:
             return super().pixel(x, y)
         else:
             super().pixel(x, y , color)
-            page = y // 8
-            self.pages_to_update |= 1 << page
+            self.register_updates(y, y, x, x)
     def text(self, text, x, y, color=1):
         super().text(text, x, y, color)
-        self.register_updates(y, y+7)
+        self.register_updates(y, y+7, x, x+8*len(text)-1)
     def line(self, x0, y0, x1, y1, color):
         super().line(x0, y0, x1, y1, color)
-        self.register_updates(y0, y1)
+        self.register_updates(y0, y1, x0, x1)
     def hline(self, x, y, w, color):
         super().hline(x, y, w, color)
-        self.register_updates(y)
+        self.register_updates(y, y, x, x+w-1)
     def vline(self, x, y, h, color):
         super().vline(x, y, h, color)
-        self.register_updates(y, y+h-1)
+        self.register_updates(y, y+h-1, x, x)
     def fill(self, color):
         super().fill(color)
-        self.pages_to_update = (1 << self.pages) - 1
+        self.register_all_updates()
     def blit(self, fbuf, x, y, key=-1, palette=None):
         super().blit(fbuf, x, y, key, palette)
-        self.register_updates(y, y+self.height)
+        # with rotate 90/270 the render buffer is height wide and width high (rwbl)
+        if self.rotate90:
+            self.register_updates(y, y+self.width, x, x+self.height)
+        else:
+            self.register_updates(y, y+self.height, x, x+self.width)
     def scroll(self, x, y):
         # my understanding is that scroll() does a full screen change
         super().scroll(x, y)
-        self.pages_to_update =  (1 << self.pages) - 1
+        self.register_all_updates()
     def fill_rect(self, x, y, w, h, color):
         super().fill_rect(x, y, w, h, color)
-        self.register_updates(y, y+h-1)
+        self.register_updates(y, y+h-1, x, x+w-1)
     def rect(self, x, y, w, h, color):
         super().rect(x, y, w, h, color)
-        self.register_updates(y, y+h-1)
-    def register_updates(self, y0, y1=None):
+        self.register_updates(y, y+h-1, x, x+w-1)
+    def register_all_updates(self):
+        self.pages_to_update = (1 << self.pages) - 1
+        self.update_y0 = 0
+        self.update_y1 = self.width
+    def register_updates(self, y0, y1=None, x0=None, x1=None):
         # this function takes the top and optional bottom address of the changes made
         # and updates the pages_to_change list with any changed pages
         # that are not yet on the list
+        # with rotate 90/270 the render buffer y is the display column and the
+        # render buffer x gives the display page (rwbl), x0 None = all pages
+        if self.rotate90:
+            if y1 is None:
+                y1 = y0
+            if y0 > y1:
+                y0, y1 = y1, y0
+            self.update_y0 = min(self.update_y0, max(0, y0))
+            self.update_y1 = max(self.update_y1, min(self.width, y1 + 1))
+            if x0 is None:
+                (y0, y1) = (0, self.height - 1)
+            else:
+                (y0, y1) = (x0, x1)
         start_page = max(0, y0 // 8)
         end_page = max(0, y1 // 8) if y1 is not None else start_page
         # rearrange start_page and end_page if coordinates were given from bottom to top
@@ -216,6 +262,7 @@ class SH1106_I2C(SH1106):
         self.addr = addr
         self.res = res
         self.temp = bytearray(2)
+        self.write_list = [b'\x40', None]  # Co=0, D/C#=1
         self.delay = delay
         if res is not None:
             res.init(res.OUT, value=1)
@@ -225,7 +272,8 @@ class SH1106_I2C(SH1106):
         self.temp[1] = cmd
         self.i2c.writeto(self.addr, self.temp)
     def write_data(self, buf):
-        self.i2c.writeto(self.addr, b'\x40'+buf)
+        self.write_list[1] = buf
+        self.i2c.writevto(self.addr, self.write_list)
     def reset(self):
         super().reset(self.res)
 class SH1106_SPI(SH1106):
@@ -240,6 +288,7 @@ class SH1106_SPI(SH1106):
         self.dc = dc
         self.res = res
         self.cs = cs
+        self.temp = bytearray(1)
         self.delay = delay
         super().__init__(width, height, external_vcc, rotate)
     def write_cmd(self, cmd):
@@ -247,11 +296,13 @@ class SH1106_SPI(SH1106):
             self.cs(1)
             self.dc(0)
             self.cs(0)
-            self.spi.write(bytearray([cmd]))
+            self.temp[0] = cmd
+            self.spi.write(self.temp)
             self.cs(1)
         else:
             self.dc(0)
-            self.spi.write(bytearray([cmd]))
+            self.temp[0] = cmd
+            self.spi.write(self.temp)
     def write_data(self, buf):
         if self.cs is not None:
             self.cs(1)
@@ -1,4 +1,7 @@
 # MicroPython SSD1306 OLED driver, I2C and SPI interfaces
+# Modifications by rwbl 20261019: changed column range per page tracked by the drawing functions,
+# show() sends only the changed windows (see ssd1306ex.py).
+# The data is sent without copies: the buffer or memoryview slices, the SPI command buffer is preallocated.
 from micropython import const
 import framebuf
 # register definitions
@@ -28,6 +31,10 @@ class SSD1306(framebuf.FrameBuffer):
         self.external_vcc = external_vcc
         self.pages = self.height // 8
         self.buffer = bytearray(self.pages * self.width)
+        self._mv = memoryview(self.buffer)
+        # Changed column range x0 (inclusive) to x1 (exclusive) per page, empty if x0 >= x1
+        self.dirty_x0 = bytearray([self.width] * self.pages)
+        self.dirty_x1 = bytearray(self.pages)
         super().__init__(self.buffer, self.width, self.height, framebuf.MONO_VLSB)
         self.init_display()
     def init_display(self):
@@ -75,20 +82,113 @@ class SSD1306(framebuf.FrameBuffer):
         self.write_cmd(contrast)
     def invert(self, invert):
         self.write_cmd(SET_NORM_INV | (invert & 1))
-    def show(self):
-        x0 = 0
-        x1 = self.width - 1
-        if self.width == 64:
-            # displays with width of 64 pixels are shifted by 32
-            x0 += 32
-            x1 += 32
-        self.write_cmd(SET_COL_ADDR)
-        self.write_cmd(x0)
-        self.write_cmd(x1)
-        self.write_cmd(SET_PAGE_ADDR)
-        self.write_cmd(0)
-        self.write_cmd(self.pages - 1)
-        self.write_data(self.buffer)
+    def show(self, full_update=False):
+        """
+        Send the changed windows of the buffer to the display.
+        Pages with the same changed column range are sent as one window.
+        
+        :param bool full_update
+            Flag to send the full buffer.
+        """
+        if full_update:
+            self.invalidate()
+        w = self.width
+        pages = self.pages
+        dirty_x0 = self.dirty_x0
+        dirty_x1 = self.dirty_x1
+        mv = self._mv
+        # displays with width of 64 pixels are shifted by 32
+        offset = 32 if w == 64 else 0
+        page = 0
+        while page < pages:
+            x0 = dirty_x0[page]
+            x1 = dirty_x1[page]
+            if x0 >= x1:
+                page += 1
+                continue
+            last = page
+            while last + 1 < pages and dirty_x0[last + 1] == x0 and dirty_x1[last + 1] == x1:
+                last += 1
+            self.write_cmd(SET_COL_ADDR)
+            self.write_cmd(x0 + offset)
+            self.write_cmd(x1 - 1 + offset)
+            self.write_cmd(SET_PAGE_ADDR)
+            self.write_cmd(page)
+            self.write_cmd(last)
+            if x1 - x0 == w and page == 0 and last == pages - 1:
+                # Full refresh, the buffer is sent without slicing
+                self.write_data(self.buffer)
+            elif x1 - x0 == w:
+                # Full width pages are contiguous in the buffer
+                self.write_data(mv[page * w:(last + 1) * w])
+            else:
+                for p in range(page, last + 1):
+                    self.write_data(mv[p * w + x0:p * w + x1])
+            for p in range(page, last + 1):
+                dirty_x0[p] = w
+                dirty_x1[p] = 0
+            page = last + 1
+    def invalidate(self, x=0, y=0, w=None, h=None):
+        """
+        Mark a rectangle as changed, so show() sends it to the display.
+        Default the full display.
+        """
+        if w is None:
+            w = self.width - x
+        if h is None:
+            h = self.height - y
+        x0 = max(0, x)
+        x1 = min(self.width, x + w)
+        if x0 >= x1 or h <= 0:
+            return
+        page0 = max(0, y // 8)
+        page1 = min(self.pages - 1, (y + h - 1) // 8)
+        dirty_x0 = self.dirty_x0
+        dirty_x1 = self.dirty_x1
+        for page in range(page0, page1 + 1):
+            if x0 < dirty_x0[page]:
+                dirty_x0[page] = x0
+            if x1 > dirty_x1[page]:
+                dirty_x1[page] = x1
+    def pixel(self, x, y, color=None):
+        if color is None:
+            return super().pixel(x, y)
+        super().pixel(x, y, color)
+        self.invalidate(x, y, 1, 1)
+    def fill(self, color):
+        super().fill(color)
+        self.invalidate()
+    def text(self, text, x, y, color=1):
+        super().text(text, x, y, color)
+        self.invalidate(x, y, 8 * len(text), 8)
+    def hline(self, x, y, w, color):
+        super().hline(x, y, w, color)
+        self.invalidate(x, y, w, 1)
+    def vline(self, x, y, h, color):
+        super().vline(x, y, h, color)
+        self.invalidate(x, y, 1, h)
+    def line(self, x0, y0, x1, y1, color):
+        super().line(x0, y0, x1, y1, color)
+        self.invalidate(min(x0, x1), min(y0, y1), abs(x1 - x0) + 1, abs(y1 - y0) + 1)
+    def rect(self, x, y, w, h, color, *args):
+        super().rect(x, y, w, h, color, *args)
+        self.invalidate(x, y, w, h)
+    def fill_rect(self, x, y, w, h, color):
+        super().fill_rect(x, y, w, h, color)
+        self.invalidate(x, y, w, h)
+    def ellipse(self, x, y, xr, yr, color, *args):
+        super().ellipse(x, y, xr, yr, color, *args)
+        self.invalidate(x - xr, y - yr, 2 * xr + 1, 2 * yr + 1)
+    def poly(self, x, y, coords, color, *args):
+        super().poly(x, y, coords, color, *args)
+        self.invalidate()
+    def blit(self, fbuf, x, y, *args):
+        # The size of fbuf is not known, so the area from x, y to the end of the display is marked
+        super().blit(fbuf, x, y, *args)
+        self.invalidate(x, y)
+    def scroll(self, xstep, ystep):
+        super().scroll(xstep, ystep)
+        self.invalidate()
 class SSD1306_I2C(SSD1306):
     def __init__(self, width, height, i2c, addr=0x3C, external_vcc=False):
         self.i2c = i2c
@@ -113,6 +213,7 @@ class SSD1306_SPI(SSD1306):
         self.dc = dc
         self.res = res
         self.cs = cs
+        self.temp = bytearray(1)
         import time
         self.res(1)
         time.sleep_ms(1)
@@ -125,7 +226,8 @@ class SSD1306_SPI(SSD1306):
         self.cs(1)
         self.dc(0)
         self.cs(0)
-        self.spi.write(bytearray([cmd]))
+        self.temp[0] = cmd
+        self.spi.write(self.temp)
         self.cs(1)
     def write_data(self, buf):
         self.spi.init(baudrate=self.rate, polarity=0, phase=0)
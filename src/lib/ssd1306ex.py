@@ -10,6 +10,12 @@ text_col_row(self, text, col, row) - Write text at row 0-3 and col 0-15.
 text_block(self, block, title, value) - Write title & value in a text block. Max 6 text blocks.
 text_rows(self, row1="", row2="", row3="", row4="") - Display text at col 0 on rows 1 to 4.
 clear(self) - Clear the display.
+20261019
+invalidate(self, x, y, w, h) - Mark a rectangle as changed. The drawing functions mark the area drawn.
+show(self, full_update=False) - Send only the changed windows (column range per page) to the display.
+text_block clears the title & value area of the block before writing.
+write_data sends the buffer or memoryview slices without copies, the SPI command buffer is preallocated.
+BLOCKS - col & row of the text blocks, used by text_block and for layouts (oled_layout.py).
 Notes
 A character has a size 8px width x 16px height. Max chars per row is 16, max rows is 4.
 The starting index for the cols and rows is 0.
@@ -50,6 +56,8 @@ COL_MIN = const(0)
 COL_MAX = const(15)
 ROW_MIN = const(0)
 ROW_MAX = const(3)
+# Text blocks 1-6 col & row of the title, the value is shown underneath
+BLOCKS = ((1, 0), (6, 0), (11, 0), (1, 2), (6, 2), (11, 2))
 # Subclassing FrameBuffer provides support for graphics primitives
 # http://docs.micropython.org/en/latest/pyboard/library/framebuf.html
 class SSD1306(framebuf.FrameBuffer):
@@ -59,6 +67,10 @@ class SSD1306(framebuf.FrameBuffer):
         self.external_vcc = external_vcc
         self.pages = self.height // 8
         self.buffer = bytearray(self.pages * self.width)
+        self._mv = memoryview(self.buffer)
+        # Changed column range x0 (inclusive) to x1 (exclusive) per page, empty if x0 >= x1
+        self.dirty_x0 = bytearray([self.width] * self.pages)
+        self.dirty_x1 = bytearray(self.pages)
         super().__init__(self.buffer, self.width, self.height, framebuf.MONO_VLSB)
         self.init_display()
     def init_display(self):
@@ -107,20 +119,113 @@ class SSD1306(framebuf.FrameBuffer):
         self.write_cmd(contrast)
     def invert(self, invert):
         self.write_cmd(SET_NORM_INV | (invert & 1))
-    def show(self):
-        x0 = 0
-        x1 = self.width - 1
-        if self.width == 64:
-            # displays with width of 64 pixels are shifted by 32
-            x0 += 32
-            x1 += 32
-        self.write_cmd(SET_COL_ADDR)
-        self.write_cmd(x0)
-        self.write_cmd(x1)
-        self.write_cmd(SET_PAGE_ADDR)
-        self.write_cmd(0)
-        self.write_cmd(self.pages - 1)
-        self.write_data(self.buffer)
+    def show(self, full_update=False):
+        """
+        Send the changed windows of the buffer to the display.
+        Pages with the same changed column range are sent as one window.
+        
+        :param bool full_update
+            Flag to send the full buffer.
+        """
+        if full_update:
+            self.invalidate()
+        w = self.width
+        pages = self.pages
+        dirty_x0 = self.dirty_x0
+        dirty_x1 = self.dirty_x1
+        mv = self._mv
+        # displays with width of 64 pixels are shifted by 32
+        offset = 32 if w == 64 else 0
+        page = 0
+        while page < pages:
+            x0 = dirty_x0[page]
+            x1 = dirty_x1[page]
+            if x0 >= x1:
+                page += 1
+                continue
+            last = page
+            while last + 1 < pages and dirty_x0[last + 1] == x0 and dirty_x1[last + 1] == x1:
+                last += 1
+            self.write_cmd(SET_COL_ADDR)
+            self.write_cmd(x0 + offset)
+            self.write_cmd(x1 - 1 + offset)
+            self.write_cmd(SET_PAGE_ADDR)
+            self.write_cmd(page)
+            self.write_cmd(last)
+            if x1 - x0 == w and page == 0 and last == pages - 1:
+                # Full refresh, the buffer is sent without slicing
+                self.write_data(self.buffer)
+            elif x1 - x0 == w:
+                # Full width pages are contiguous in the buffer
+                self.write_data(mv[page * w:(last + 1) * w])
+            else:
+                for p in range(page, last + 1):
+                    self.write_data(mv[p * w + x0:p * w + x1])
+            for p in range(page, last + 1):
+                dirty_x0[p] = w
+                dirty_x1[p] = 0
+            page = last + 1
+    def invalidate(self, x=0, y=0, w=None, h=None):
+        """
+        Mark a rectangle as changed, so show() sends it to the display.
+        Default the full display.
+        """
+        if w is None:
+            w = self.width - x
+        if h is None:
+            h = self.height - y
+        x0 = max(0, x)
+        x1 = min(self.width, x + w)
+        if x0 >= x1 or h <= 0:
+            return
+        page0 = max(0, y // 8)
+        page1 = min(self.pages - 1, (y + h - 1) // 8)
+        dirty_x0 = self.dirty_x0
+        dirty_x1 = self.dirty_x1
+        for page in range(page0, page1 + 1):
+            if x0 < dirty_x0[page]:
+                dirty_x0[page] = x0
+            if x1 > dirty_x1[page]:
+                dirty_x1[page] = x1
+    def pixel(self, x, y, color=None):
+        if color is None:
+            return super().pixel(x, y)
+        super().pixel(x, y, color)
+        self.invalidate(x, y, 1, 1)
+    def fill(self, color):
+        super().fill(color)
+        self.invalidate()
+    def text(self, text, x, y, color=1):
+        super().text(text, x, y, color)
+        self.invalidate(x, y, 8 * len(text), 8)
+    def hline(self, x, y, w, color):
+        super().hline(x, y, w, color)
+        self.invalidate(x, y, w, 1)
+    def vline(self, x, y, h, color):
+        super().vline(x, y, h, color)
+        self.invalidate(x, y, 1, h)
+    def line(self, x0, y0, x1, y1, color):
+        super().line(x0, y0, x1, y1, color)
+        self.invalidate(min(x0, x1), min(y0, y1), abs(x1 - x0) + 1, abs(y1 - y0) + 1)
+    def rect(self, x, y, w, h, color, *args):
+        super().rect(x, y, w, h, color, *args)
+        self.invalidate(x, y, w, h)
+    def fill_rect(self, x, y, w, h, color):
+        super().fill_rect(x, y, w, h, color)
+        self.invalidate(x, y, w, h)
+    def ellipse(self, x, y, xr, yr, color, *args):
+        super().ellipse(x, y, xr, yr, color, *args)
+        self.invalidate(x - xr, y - yr, 2 * xr + 1, 2 * yr + 1)
+    def poly(self, x, y, coords, color, *args):
+        super().poly(x, y, coords, color, *args)
+        self.invalidate()
+    def blit(self, fbuf, x, y, *args):
+        # The size of fbuf is not known, so the area from x, y to the end of the display is marked
+        super().blit(fbuf, x, y, *args)
+        self.invalidate(x, y)
+    def scroll(self, xstep, ystep):
+        super().scroll(xstep, ystep)
+        self.invalidate()
         
     def text_col_row(self, text, col, row):
         """
@@ -156,27 +261,21 @@ class SSD1306(framebuf.FrameBuffer):
             title = title[0:4]
         if len(value) > 4:
             value = value[0:4]
-        # Select each of the blocks and set the title & value
-        if block == 1:
-            self.text_col_row(title, 1, 0)
-            self.text_col_row(value, 1, 1)
-        elif block == 2:
-            self.text_col_row(title, 6, 0)
-            self.text_col_row(value, 6, 1)
-        elif block == 3:
-            self.text_col_row(title, 11, 0)
-            self.text_col_row(value, 11, 1)
-        elif block == 4:
-            self.text_col_row(title, 1, 2)
-            self.text_col_row(value, 1, 3)
-        elif block == 5:
-            self.text_col_row(title, 6, 2)
-            self.text_col_row(value, 6, 3)
-        elif block == 6:
-            self.text_col_row(title, 11, 2)
-            self.text_col_row(value, 11, 3)
-        else:
+        # Select the block and set the title & value
+        if not 1 <= block <= len(BLOCKS):
             print(f'[ERROR] Block {block} out of range 1-6')
+            return
+        col, row = BLOCKS[block - 1]
+        self.text_block_col_row(title, value, col, row)
+    def text_block_col_row(self, title, value, col, row):
+        """
+        Clear the title & value area (4 chars) of a block and write the title at col, row and the value underneath.
+        Only the text lines are cleared, so only their pages are sent by show().
+        """
+        self.fill_rect(col * COL_WIDTH, row * ROW_HEIGHT, 4 * COL_WIDTH, 8, 0)
+        self.text_col_row(title, col, row)
+        self.fill_rect(col * COL_WIDTH, (row + 1) * ROW_HEIGHT, 4 * COL_WIDTH, 8, 0)
+        self.text_col_row(value, col, row + 1)
     def text_rows(self, row1="", row2="", row3="", row4=""):
         """
         Display text at col 0 on rows 1 to 4.
@@ -217,6 +316,7 @@ class SSD1306_SPI(SSD1306):
         self.dc = dc
         self.res = res
         self.cs = cs
+        self.temp = bytearray(1)
         import time
         self.res(1)
         time.sleep_ms(1)
@@ -229,7 +329,8 @@ class SSD1306_SPI(SSD1306):
         self.cs(1)
         self.dc(0)
         self.cs(0)
-        self.spi.write(bytearray([cmd]))
+        self.temp[0] = cmd
+        self.spi.write(self.temp)
         self.cs(1)
     def write_data(self, buf):
         self.spi.init(baudrate=self.rate, polarity=0, phase=0)
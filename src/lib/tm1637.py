@@ -18,18 +18,20 @@ AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
 LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
+Modifications by rwbl 20261019
+The segment table and character encoding moved to the shared codec sevensegment.py.
+hex, number, numbers and temperature write via a preallocated segment buffer.
 """
 from micropython import const
 from machine import Pin
 from time import sleep_us, sleep_ms
+import sevensegment
 TM1637_CMD1 = const(64)  # 0x40 data command
 TM1637_CMD2 = const(192) # 0xC0 address command
 TM1637_CMD3 = const(128) # 0x80 display control command
 TM1637_DSP_ON = const(8) # 0x08 display on
 TM1637_DELAY = const(10) # 10us delay between clk/dio pulses
 TM1637_MSB = const(128)  # msb is the decimal point or the colon depending on your display
-# 0-9, a-z, blank, dash, star
-_SEGMENTS = bytearray(b'\x3F\x06\x5B\x4F\x66\x6D\x7D\x07\x7F\x6F\x77\x7C\x39\x5E\x79\x71\x3D\x76\x06\x1E\x76\x38\x55\x54\x3F\x73\x67\x50\x6D\x78\x3E\x1C\x2A\x76\x6E\x5B\x00\x40\x63')
 class TM1637(object):
     """Library for quad 7-segment LED modules based on the TM1637 LED driver."""
     def __init__(self, clk, dio, brightness=7):
@@ -38,6 +40,8 @@ class TM1637(object):
         if not 0 <= brightness <= 7:
             raise ValueError("Brightness out of range")
         self._brightness = brightness
+        # Segment buffer reused by hex, number, numbers and temperature
+        self._buf = bytearray(4)
         self.clk.init(Pin.OUT, value=0)
         self.dio.init(Pin.OUT, value=0)
         sleep_us(TM1637_DELAY)
@@ -104,59 +108,37 @@ class TM1637(object):
         self._write_dsp_ctrl()
     def encode_digit(self, digit):
         """Convert a character 0-9, a-f to a segment."""
-        return _SEGMENTS[digit & 0x0f]
+        return sevensegment.encode_digit(digit)
     def encode_string(self, string):
         """Convert an up to 4 character length string containing 0-9, a-z,
         space, dash, star to an array of segments, matching the length of the
-        source string."""
-        segments = bytearray(len(string))
-        for i in range(len(string)):
-            segments[i] = self.encode_char(string[i])
-        return segments
+        source string excluding dots and colons, which are merged with the previous char."""
+        return sevensegment.encode_string(string)
     def encode_char(self, char):
         """Convert a character 0-9, a-z, space, dash or star to a segment."""
-        o = ord(char)
-        if o == 32:
-            return _SEGMENTS[36] # space
-        if o == 42:
-            return _SEGMENTS[38] # star/degrees
-        if o == 45:
-            return _SEGMENTS[37] # dash
-        if o >= 65 and o <= 90:
-            return _SEGMENTS[o-55] # uppercase A-Z
-        if o >= 97 and o <= 122:
-            return _SEGMENTS[o-87] # lowercase a-z
-        if o >= 48 and o <= 57:
-            return _SEGMENTS[o-48] # 0-9
-        raise ValueError("Character out of range: {:d} '{:s}'".format(o, chr(o)))
+        return sevensegment.encode_char(char)
     def hex(self, val):
         """Display a hex value 0x0000 through 0xffff, right aligned."""
-        string = '{:04x}'.format(val & 0xffff)
-        self.write(self.encode_string(string))
+        sevensegment.hex_into(self._buf, val, 0, 4)
+        self.write(self._buf)
     def number(self, num):
         """Display a numeric value -999 through 9999, right aligned."""
         # limit to range -999 to 9999
-        num = max(-999, min(num, 9999))
-        string = '{0: >4d}'.format(num)
-        self.write(self.encode_string(string))
+        sevensegment.number_into(self._buf, num, 0, 4)
+        self.write(self._buf)
     def numbers(self, num1, num2, colon=True):
         """Display two numeric values -9 through 99, with leading zeros
         and separated by a colon."""
-        num1 = max(-9, min(num1, 99))
-        num2 = max(-9, min(num2, 99))
-        segments = self.encode_string('{0:0>2d}{1:0>2d}'.format(num1, num2))
+        segments = self._buf
+        sevensegment.number_into(segments, num1, 0, 2, True)
+        sevensegment.number_into(segments, num2, 2, 2, True)
         if colon:
             segments[1] |= 0x80 # colon on
         self.write(segments)
     def temperature(self, num):
-        if num < -9:
-            self.show('lo') # low
-        elif num > 99:
-            self.show('hi') # high
-        else:
-            string = '{0: >2d}'.format(num)
-            self.write(self.encode_string(string))
-        self.write([_SEGMENTS[38], _SEGMENTS[12]], 2) # degrees C
+        """Display a 2 digit temperature -9 through 99 followed by degrees C."""
+        sevensegment.temperature_into(self._buf, num)
+        self.write(self._buf)
     def show(self, string, colon=False):
         segments = self.encode_string(string)
         if len(segments) > 1 and colon:
@@ -173,18 +155,6 @@ class TM1637Decimal(TM1637):
     """Library for quad 7-segment LED modules based on the TM1637 LED driver.
     This class is meant to be used with decimal display modules (modules
     that have a decimal point after each 7-segment LED).
+    The decimal points are merged with the previous char by the shared codec (sevensegment.py).
     """
-    def encode_string(self, string):
-        """Convert a string to LED segments.
-        Convert an up to 4 character length string containing 0-9, a-z,
-        space, dash, star and '.' to an array of segments, matching the length of
-        the source string."""
-        segments = bytearray(len(string.replace('.','')))
-        j = 0
-        for i in range(len(string)):
-            if string[i] == '.' and j > 0:
-                segments[j-1] |= TM1637_MSB
-                continue
-            segments[j] = self.encode_char(string[i])
-            j += 1
-        return segments
+    pass
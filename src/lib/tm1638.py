@@ -7,10 +7,14 @@ Global constants for default pin numbers.
 Class constants for state on/off, led1-8 index.
 function led_value(pos) - Get the value 0 (off) or 1 (on) of a single LED with pos 0-7.
 function leds_value() - Get the value 0 (off) or 1 (on) of all LEDs.
+Modifications by rwbl 20261019
+The segment table and character encoding moved to the shared codec sevensegment.py.
+hex, number, temperature and humidity write via a preallocated segment buffer.
 """
 from micropython import const
 from machine import Pin
 from time import sleep_us, sleep_ms
+import sevensegment
 # Default pin numbers
 PIN_STB = const(13)
 PIN_CLK = const(14)
@@ -23,8 +27,6 @@ TM1638_CMD4 = const(68)	 # 0x44 single data command - arguments 0xc? 0x?? - writ
 TM1638_DSP_ON = const(8) # 0x08 display on - activate board (bit a), set brightness (bits b)
 TM1638_READ = const(2)   # 0x02 read key scan data
 TM1638_FIXED = const(4)  # 0x04 fixed address mode
-# 0-9, a-z, blank, dash, star
-_SEGMENTS = bytearray(b'\x3F\x06\x5B\x4F\x66\x6D\x7D\x07\x7F\x6F\x77\x7C\x39\x5E\x79\x71\x3D\x76\x06\x1E\x76\x38\x55\x54\x3F\x73\x67\x50\x6D\x78\x3E\x1C\x2A\x76\x6E\x5B\x00\x40\x63')
 # LEDs 1-8 (index 0-7) value 0 (off) or 1 (on)
 _leds_value = [0,0,0,0,0,0,0,0]
 class TM1638(object):
@@ -52,6 +54,9 @@ class TM1638(object):
             raise ValueError("Brightness out of range")
         self._brightness = brightness
         self._on = TM1638_DSP_ON
+        # Segment buffer reused by hex, number, temperature and humidity
+        self._buf = bytearray(8)
+        self._mv = memoryview(self._buf)
         self.clk.init(Pin.OUT, value=1)
         self.dio.init(Pin.OUT, value=0)
         self.stb.init(Pin.OUT, value=1)
@@ -168,70 +173,36 @@ class TM1638(object):
         return keys
     def encode_digit(self, digit):
         """Convert a character 0-9, a-f to a segment."""
-        return _SEGMENTS[digit & 0x0f]
+        return sevensegment.encode_digit(digit)
     def encode_string(self, string):
         """Convert an up to 8 character length string containing 0-9, a-z,
         space, dash, star to an array of segments, matching the length of the
         source string excluding dots, which are merged with previous char."""
-        segments = bytearray(len(string.replace('.','')))
-        j = 0
-        for i in range(len(string)):
-            if string[i] == '.' and j > 0:
-                segments[j-1] |= (1 << 7)
-                continue
-            segments[j] = self.encode_char(string[i])
-            j += 1
-        return segments
+        return sevensegment.encode_string(string)
     def encode_char(self, char):
         """Convert a character 0-9, a-z, space, dash or star to a segment."""
-        o = ord(char)
-        if o == 32:
-            return _SEGMENTS[36] # space
-        if o == 42:
-            return _SEGMENTS[38] # star/degrees
-        if o == 45:
-            return _SEGMENTS[37] # dash
-        if o >= 65 and o <= 90:
-            return _SEGMENTS[o-55] # uppercase A-Z
-        if o >= 97 and o <= 122:
-            return _SEGMENTS[o-87] # lowercase a-z
-        if o >= 48 and o <= 57:
-            return _SEGMENTS[o-48] # 0-9
-        raise ValueError("Character out of range: {:d} '{:s}'".format(o, chr(o)))
+        return sevensegment.encode_char(char)
     def hex(self, val):
         """Display a hex value 0x00000000 through 0xffffffff, right aligned, leading zeros."""
-        string = '{:08x}'.format(val & 0xffffffff)
-        self.segments(self.encode_string(string))
+        sevensegment.hex_into(self._buf, val, 0, 8)
+        self.segments(self._buf)
     def number(self, num):
         """Display a numeric value -9999999 through 99999999, right aligned."""
         # limit to range -9999999 to 99999999
-        num = max(-9999999, min(num, 99999999))
-        string = '{0: >8d}'.format(num)
-        self.segments(self.encode_string(string))
+        sevensegment.number_into(self._buf, num, 0, 8)
+        self.segments(self._buf)
     #def float(self, num):
     #    # needs more work
     #    string = '{0:>9f}'.format(num)
     #    self.segments(self.encode_string(string[0:9]))
     def temperature(self, num, pos=0):
         """Displays 2 digit temperature followed by degrees C"""
-        if num < -9:
-            self.show('lo', pos) # low
-        elif num > 99:
-            self.show('hi', pos) # high
-        else:
-            string = '{0: >2d}'.format(num)
-            self.segments(self.encode_string(string), pos)
-        self.show('*C', pos + 2) # degrees C
+        sevensegment.temperature_into(self._buf, num)
+        self.segments(self._mv[0:4], pos)
     def humidity(self, num, pos=4):
         """Displays 2 digit humidity followed by RH"""
-        if num < -9:
-            self.show('lo', pos) # low
-        elif num > 99:
-            self.show('hi', pos) # high
-        else:
-            string = '{0: >2d}'.format(num)
-            self.segments(self.encode_string(string), pos)
-        self.show('rh', pos + 2) # relative humidity
+        sevensegment.humidity_into(self._buf, num)
+        self.segments(self._mv[0:4], pos)
     def show(self, string, pos=0):
         """Displays a string"""
         segments = self.encode_string(string)
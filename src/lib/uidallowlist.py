@@ -0,0 +1,171 @@
+"""
+File:	uidallowlist.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Local allowlist of RFID card UIDs for access decisions on the device, without a round trip to Domoticz.
+The UIDs (4 or 7 bytes) are stored as sorted packed array of 64-bit keys, a lookup is a binary search.
+10-byte UIDs do not fit in a 64-bit key and are rejected: not allowed and not added to the allowlist.
+The allowlist has a version number and is synced from Domoticz by full list or by the changes to a base version.
+The allowlist is saved to a file, so the decisions work after a restart with Domoticz not reachable.
+:notes
+The key of a UID is the UID value with the number of bytes in the top byte, so 4 and 7-byte UIDs do not collide.
+UIDs longer than MAX_UID_SIZE bytes have no key, sync data with such a UID logs an error and skips the UID.
+A UID is a list of bytes (as read by mfrc522) or a hex string with 2 characters per byte, i.e. 346FC2CF.
+Sync data (dict or JSON string):
+Full list: {"version": 7, "uids": ["346FC2CF", "04A1B2C3D4E580"]}
+Changes: {"version": 8, "base": 7, "add": ["56381D00"], "remove": ["346FC2CF"]}
+Changes to another base version than the local version are not applied, a full list is required.
+The file holds the version (4 bytes little endian) followed by the array.
+:usage
+from uidallowlist import UidAllowlist
+allowlist = UidAllowlist('allowlist.bin')
+allowlist.sync('{"version": 1, "uids": ["346FC2CF"]}')
+allowlist.allowed('346FC2CF')
+"""
+# Imports
+import json
+import os
+from array import array
+# Max UID size in bytes with a 64-bit key (top byte holds the size)
+MAX_UID_SIZE = 7
+def key(uid):
+    """
+    Get the key of a UID.
+    
+    :param list|string uid
+        UID as list of bytes or hex string.
+    
+    :return int key
+        UID value with the number of bytes in the top byte, None if the UID is longer than MAX_UID_SIZE bytes.
+    """
+    if isinstance(uid, str):
+        if len(uid) // 2 > MAX_UID_SIZE:
+            return None
+        return (len(uid) // 2) << 56 | int(uid, 16)
+    if len(uid) > MAX_UID_SIZE:
+        return None
+    value = 0
+    for b in uid:
+        value = value << 8 | b
+    return len(uid) << 56 | value
+def keys(uids):
+    """
+    Get the keys of the UIDs, UIDs without key are skipped with an error.
+    
+    :param list uids
+        UIDs as list of bytes or hex string.
+    
+    :return set keys
+        Keys of the UIDs.
+    """
+    result = set()
+    for uid in uids:
+        k = key(uid)
+        if k is None:
+            print(f'[ERROR] Allowlist UID {uid} longer than {MAX_UID_SIZE} bytes skipped')
+        else:
+            result.add(k)
+    return result
+class UidAllowlist:
+    def __init__(self, file=None):
+        """
+        Init the allowlist, restored from the file if the file exists.
+        
+        :param string file
+            Name of the file to save the allowlist, default None is not saved.
+        """
+        self.file = file
+        self.uids = array('Q')
+        self.version = 0
+        if file is not None:
+            self.restore()
+    def allowed(self, uid):
+        """
+        Check if a UID is in the allowlist.
+        
+        :param list|string uid
+            UID as list of bytes or hex string.
+        
+        :return bool
+            True if the UID is allowed.
+        """
+        k = key(uid)
+        if k is None:
+            return False
+        uids = self.uids
+        lo = 0
+        hi = len(uids)
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            value = uids[mid]
+            if value < k:
+                lo = mid + 1
+            elif value > k:
+                hi = mid
+            else:
+                return True
+        return False
+    def load(self, uids, version):
+        """Replace the allowlist by the list of UIDs with the version."""
+        self.uids = array('Q', sorted(keys(uids)))
+        self.version = version
+        self.save()
+    def apply(self, version, base, add=(), remove=()):
+        """
+        Apply the changes from the base version to the version.
+        
+        :return bool
+            True if applied, False if the base is not the local version (a full list is required).
+        """
+        if base != self.version:
+            return False
+        result = set(self.uids)
+        result.update(keys(add))
+        result.difference_update(keys(remove))
+        self.uids = array('Q', sorted(result))
+        self.version = version
+        self.save()
+        return True
+    def sync(self, data):
+        """
+        Sync the allowlist with the data from Domoticz, full list or changes.
+        
+        :param dict|string data
+            Sync data, see notes.
+        
+        :return bool
+            True if the allowlist is up to date with the version of the data.
+        """
+        if isinstance(data, str):
+            data = json.loads(data)
+        version = data['version']
+        if version == self.version:
+            return True
+        if 'uids' in data:
+            self.load(data['uids'], version)
+            return True
+        return self.apply(version, data.get('base'), data.get('add', ()), data.get('remove', ()))
+    def save(self):
+        """Save the version and the array to the file."""
+        if self.file is None:
+            return
+        with open(self.file, 'wb') as f:
+            f.write(self.version.to_bytes(4, 'little'))
+            f.write(self.uids)
+    def restore(self):
+        """Restore the version and the array from the file, if the file exists."""
+        try:
+            n = (os.stat(self.file)[6] - 4) // 8
+            with open(self.file, 'rb') as f:
+                version = int.from_bytes(f.read(4), 'little')
+                uids = array('Q', [0] * n)
+                f.readinto(uids)
+        except OSError:
+            return False
+        self.uids = uids
+        self.version = version
+        return True
+    def count(self):
+        """Get the number of UIDs."""
+        return len(self.uids)
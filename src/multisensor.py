@@ -0,0 +1,193 @@
+"""
+File:	multisensor.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+One Pico W serving several sensors at different sampling rates with the cooperative sampler (sampler.py):
+BMP280 (temp+baro), DHT22 (temp+hum), HC-SR04 (distance) and DS18B20 (one-wire temperature).
+Each sensor has a sample coroutine, the DS18B20 yields during its 750ms conversion and the BMP280 (forced mode)
+during its conversion, so the other sensors sample in the meantime instead of waiting. The CPU is parked between the samples by the low-power scheduler (lowpower.py).
+The readings are sent to the Domoticz devices as by the single sensor projects
+bmp280.py, dht22.py, distancesensor.py and ds18b20_customevent.py.
+The readings pass the change reporter (reporter.py), a reading is sent if it changed by more than the deadband
+of the sensor or the heartbeat interval passed, so the slow changing temperatures are not sent every sample.
+The sampler statistics and the reporter counters are printed every REPORT_PERIOD.
+The BMP280 barometer forecast is set by the pressure trend (pressuretrend.py) of all samples, not only those sent.
+:log
+Multi Sensor v20261019
+Network connected OK
+DHT22 svalue=16;55;0
+DS18B20 data={'X28FF5E1804150334': 16.5}
+BMP280 svalue=19;1004;6;0
+Distance svalue=101.5
+dht22: runs=10, misses=0, overruns=0, errors=0, max_late=0ms, duration=24ms, max_duration=24ms, busy=240ms
+ds18b20: runs=10, misses=0, overruns=0, errors=0, max_late=0ms, duration=750ms, max_duration=751ms, busy=120ms
+bmp280: runs=10, misses=0, overruns=0, errors=0, max_late=0ms, duration=6ms, max_duration=7ms, busy=10ms
+distance: runs=60, misses=0, overruns=0, errors=0, max_late=0ms, duration=2ms, max_duration=3ms, busy=140ms
+dht22: readings=10, reports=2, suppressed=8 (80%)
+ds18b20: readings=10, reports=1, suppressed=9 (90%)
+bmp280: readings=10, reports=1, suppressed=9 (90%)
+distance: readings=60, reports=7, suppressed=53 (88%)
+:wiring
+BMP280 SDA = GP0, SCK = GP1
+DHT22 signal = GP22
+HC-SR04 trigger = GP15, echo = GP14
+DS18B20 signal = GP16
+"""
+# Imports
+from machine import Pin, I2C
+import ntptime
+from onewire import OneWire
+from ds18x20 import DS18X20
+from dht import DHT22
+# BMP280 forced mode driver from bmp280forced.py
+from bmp280forced import BMP280Forced, WEATHER
+# HCSR04 from hcsr04.py
+from hcsr04 import HCSR04
+# Sampler from sampler.py
+from sampler import Sampler
+# Change reporter from reporter.py
+from reporter import Reporter
+# Pressure trend from pressuretrend.py
+from pressuretrend import PressureTrend
+# Server from server.py
+from server import Server
+# Configuration (must be uploaded to the picow)
+import config
+# Constants
+VERSION = 'Multi Sensor v20261019'
+# Time in ms between the sampler reports
+REPORT_PERIOD = 600000
+# Time in ms after which a reading is sent without change
+HEARTBEAT = 900000
+"""
+DOMOTICZ
+"""
+URL_DOM = "http://"+ config.DOMOTICZ_IP +"/json.htm?type=command&param=udevice&idx={IDX}&nvalue=0&svalue="
+URL_DOM_BMP280 = URL_DOM.replace('{IDX}', '29')
+URL_DOM_DHT22 = URL_DOM.replace('{IDX}', '15')
+URL_DOM_DISTANCE = URL_DOM.replace('{IDX}', '44')
+URL_DOM_DS18B20 = "http://"+ config.DOMOTICZ_IP +"/json.htm?type=command&param=customevent&event=DS18B20&data="
+"""
+SENSORS
+Sampling period, phase offset & max jitter in ms.
+The DHT22 and DS18B20 start together, the DHT22 samples whilst the DS18B20 converts.
+"""
+bmp = BMP280Forced(I2C(0, scl=Pin(1), sda=Pin(0), freq=200000), addr=0x77)
+bmp.configure(*WEATHER)
+BMP280_SAMPLING = (60000, 2000, 100)
+dht22_sensor = DHT22(Pin(22, Pin.IN, Pin.PULL_UP))
+DHT22_SAMPLING = (60000, 0, 100)
+distance_sensor = HCSR04(trigger_pin=15, echo_pin=14)
+DISTANCE_SAMPLING = (10000, 5000, 100)
+ds_sensor = DS18X20(OneWire(Pin(16)))
+devices = ds_sensor.scan()
+DS18B20_SAMPLING = (60000, 0, 100)
+# Deadbands: temperature 0.2 °C, humidity 1%, pressure 0.5 hPa, distance 1 cm
+DS18B20_DEADBAND = 0.2
+DHT22_DEADBAND = 1
+BMP280_DEADBAND = 0.5
+DISTANCE_DEADBAND = 1
+"""
+Barometer forecast depending pressure, see bmp280.py. Used until the pressure trend is available.
+"""
+def barometer_forecast(pressure):
+    if pressure < 966:
+        return 4
+    elif pressure < 993:
+        return 2
+    elif pressure < 1007:
+        return 6
+    elif pressure < 1013:
+        return 3
+    elif pressure < 1033:
+        return 0
+    else:
+        return 5
+"""
+Humidity status, see dht22.py.
+"""
+def humidity_status(hum, temp):
+    if hum <= 30:
+        return 2
+    elif hum >= 70:
+        return 3
+    elif hum >= 35 and hum <= 65 and temp >=22 and temp <= 26:
+        return 1
+    return 0
+"""
+Sample coroutines returning the reading, the svalue is set when sent.
+"""
+def sample_bmp280():
+    # The sensor sleeps between the samples, the other sensors sample during the conversion
+    yield bmp.trigger()
+    (temperature, pressure) = bmp.read()
+    return (temperature, pressure / 100)
+def sample_dht22():
+    dht22_sensor.measure()
+    return (dht22_sensor.temperature(), dht22_sensor.humidity())
+def sample_distance():
+    return distance_sensor.distance_cm()
+def sample_ds18b20():
+    ds_sensor.convert_temp()
+    # The other sensors sample during the conversion
+    yield 750
+    result = {}
+    for device in devices:
+        result['X' + bytes(device).hex().upper()] = ds_sensor.read_temp(device)
+    return result
+"""
+Send the reading to Domoticz, a failed request is not repeated, the next sample is sent.
+"""
+def send(name, url, svalue):
+    print(f'{name} svalue={svalue}')
+    try:
+        network.send_get_request(url + svalue)
+    except Exception as e:
+        print(f'[ERROR] {name} {e}')
+def send_bmp280(reading):
+    temperature = round(reading[0])
+    p_hpa = round(reading[1])
+    forecast = trend.forecast(p_hpa)
+    if forecast is None:
+        forecast = barometer_forecast(p_hpa)
+    send('BMP280', URL_DOM_BMP280, f'{temperature};{p_hpa};{forecast};0')
+def send_dht22(reading):
+    temperature = round(reading[0])
+    humidity = round(reading[1])
+    send('DHT22', URL_DOM_DHT22, f'{temperature};{humidity};{humidity_status(humidity, temperature)}')
+def send_ds18b20(data):
+    print(f'DS18B20 data={data}')
+    try:
+        network.send_post_request(URL_DOM_DS18B20, data)
+    except Exception as e:
+        print(f'[ERROR] DS18B20 {e}')
+"""
+Main
+"""
+print(f'{VERSION}')
+# Create network object
+network = Server(config.WIFI_SSID, config.WIFI_PASSWORD, DEBUG=True)
+# Connect to the network and get the server object
+server = network.connect()
+# Set the RTC, the time of the pressure trend history file
+try:
+    ntptime.settime()
+except Exception as e:
+    print(f'[ERROR] NTP {e}')
+# Pressure trend, the history is restored from the file
+trend = PressureTrend()
+# Register the channels with deadband & heartbeat
+reporter = Reporter()
+reporter.add('dht22', send_dht22, absolute=DHT22_DEADBAND, heartbeat=HEARTBEAT)
+reporter.add('ds18b20', send_ds18b20, absolute=DS18B20_DEADBAND, heartbeat=HEARTBEAT)
+reporter.add('bmp280', send_bmp280, absolute=BMP280_DEADBAND, heartbeat=HEARTBEAT)
+reporter.add('distance', lambda distance: send('Distance', URL_DOM_DISTANCE, str(distance)), absolute=DISTANCE_DEADBAND, heartbeat=HEARTBEAT)
+# Register the sensors with period, phase & jitter, the readings are passed to the reporter
+sampler = Sampler()
+sampler.add('dht22', sample_dht22, *DHT22_SAMPLING, callback=lambda reading: reporter.update('dht22', reading))
+sampler.add('ds18b20', sample_ds18b20, *DS18B20_SAMPLING, callback=lambda reading: reporter.update('ds18b20', reading))
+sampler.add('bmp280', sample_bmp280, *BMP280_SAMPLING, callback=lambda reading: (trend.add(reading[1] * 100), reporter.update('bmp280', reading)))
+sampler.add('distance', sample_distance, *DISTANCE_SAMPLING, callback=lambda reading: reporter.update('distance', reading))
+sampler.sched.every(REPORT_PERIOD, lambda: print('\n'.join(sampler.report() + reporter.report())), phase=REPORT_PERIOD)
+sampler.run()
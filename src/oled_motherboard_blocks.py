@@ -9,6 +9,10 @@ The incoming data is received from a HTTP POST request with JSON object to set t
 The JSON object contains for each of the displayed sensor data the block number, title and value.
 [{'block': 1, 'title': 'Time', 'value': '1403'}, {'block': 2, 'title': 'Temp', 'value': 42}, {'block': 3, 'title': 'CPU', 'value': 0.37}, {'block': 4, 'title': 'Mem', 'value': 22}, {'block': 5, 'title': 'ARM', 'value': 600}, {'block': 6, 'title': 'HDD', 'value': 39}]
 This enables to set the OLED display layout from the Domoticz event.
+20261019: The blocks are regions of a retained-mode layout (lib oled_layout.py), only changed values are redrawn and sent.
+Domoticz can also send a layout once and then the values only:
+{"layout": [{"name": "temp", "col": 1, "row": 0, "width": 4, "title": "Temp", "format": "{:.0f}", "align": "right"}, ...]}
+{"values": {"temp": 42, ...}}
 :log
 Domoticz Motherboard v20230323
 Init OLED address=60, sda=GP0, scl=GP1
@@ -28,7 +32,6 @@ SDA = GP0 (pin #1)
 """
 # Libraries
 import time
-from time import sleep
 from machine import Pin, I2C
 import json
 # Call server from server.py (must be uploaded to the picow)
@@ -36,15 +39,18 @@ from server import Server
 # OLED display lib stored in PicoW folder lib
 import ssd1306ex
 from ssd1306ex import SSD1306_I2C
+from oled_layout import Layout
 # Configuration read from config.py (must be uploaded to the picow prior testing)
 import config
 # Constants
 ## Name (row 0), Version (row 1), Waiting (row 3) are displayed on the OLED
 NAME	= 'Domoticz Motherboard'
-VERSION = 'v20230324'
+VERSION = 'v20261019'
 WAITING = 'Waiting for data...'
 ## Title used for the HTTP JSON response to Domoticz key title
 TITLE 	= 'Set OLED'
+# Layout with the 6 text blocks named 1-6
+BLOCKS_LAYOUT = [{'name': str(i + 1), 'col': block[0], 'row': block[1]} for i, block in enumerate(ssd1306ex.BLOCKS)]
 def init_oled(pin_sda=ssd1306ex.PIN_SDA, pin_scl=ssd1306ex.PIN_SCL, width=ssd1306ex.DISPLAY_WIDTH, height=ssd1306ex.DISPLAY_HEIGHT):
     """
     Create the OLED object. The I2C 0 is used.
@@ -92,15 +98,20 @@ def handle_request(cmd, status):
     response[config.KEY_TITLE] = cmd
     # If the status is 1 (OK) then set the OLED display with the sensor data.
     if status == 1:
-        # Clear the display first
-        oled.clear()
-        sleep(.1)
-        # Set the sensor data in the text blocks 1-6
-        for item in cmd:
-            oled.text_block(item['block'],item['title'],item['value'])
+        if isinstance(cmd, dict):
+            # Set the layout (the display is cleared) and or the values
+            if 'layout' in cmd:
+                layout.load(cmd['layout'])
+            if 'values' in cmd:
+                layout.update(cmd['values'])
+        else:
+            # Set the sensor data in the text blocks 1-6
+            for item in cmd:
+                layout.set_title(str(item['block']), item['title'])
+                layout.set(str(item['block']), item['value'])
     
-        # Show the text blocks
-        oled.show()
+        # Show the changed regions, only the changed pages & columns are sent
+        layout.show()
         
         # Set the response
         response[config.KEY_STATE] = config.STATE_OK
@@ -116,6 +127,8 @@ print(f'{NAME} {VERSION}')
 oled = init_oled(ssd1306ex.PIN_SDA, ssd1306ex.PIN_SCL, ssd1306ex.DISPLAY_WIDTH, ssd1306ex.DISPLAY_HEIGHT)
 # Show initial info on the OLED. Waiting is replaced by RPi motherboard sensor data
 oled.text_rows(NAME, VERSION, '', WAITING)
+# Create the layout, the display is cleared at the first data received
+layout = Layout(oled, BLOCKS_LAYOUT)
 # Create network object
 network = Server(config.WIFI_SSID, config.WIFI_PASSWORD, DEBUG=True)
 # Connect to the network and get the server object
@@ -7,8 +7,12 @@ PicoW RESTful webserver listening if a motion is detected.
 If a motion is detected, an HTTP API/JSON request is send to Domoticz to set an the Level and Text for an Alert Device.
 Also a RED LED is blinking for a sec. In addition a GREEN LED is on every 5 seconds to indicate the motion detector is working.
 Example: Motion detected sets alert level 4 with text "Motion detected".
+The PIR interrupt handler only timestamps and enqueues the trigger (irqevents.py), the main loop dispatches the triggers
+every LOOP_PERIOD ms and sends the request, so the blocking request does not run in a scheduled callback.
+Retriggers whilst the motion continues are coalesced for MOTION_HOLDOFF ms to one alert.
+The red LED blinks by timer, so the interrupt handler and the dispatcher do not sleep.
 :log
-pir-motion-detection v20230326
+pir-motion-detection v20261019
 Network connected OK
 Network IP webserver-ip
 Network listening on ('0.0.0.0', 80)
@@ -20,47 +24,69 @@ Send GET request status=OK
 import network
 import socket
 import time
-from machine import Pin
+from machine import Pin, Timer
+# Interrupt event layer from irqevents.py
+from irqevents import IrqEvents
 # Server class from server.py
 from server import Server
 # Configuration read from config.py (must be uploaded to the picow prior testing)
 import config
 # Constants
 NAME = 'pir-motion-detection'
-VERSION = 'v20230326'
+VERSION = 'v20261019'
 # Domoticz alert sensor
-URL_DOM_ALERT_DEVICE = 'http://' + config.DOMOTICZ_IP + '/json.htm?type=command&param=udevice&idx={IDX}&nvalue={LEVEL}&svalue={TEXT}'
 IDX_ALERT_DEVICE = 7
 ALERT_LEVEL = 4
 ALERT_TEXT = 'Motion Detected'
+# URL built once
+URL_DOM_ALERT_DEVICE = 'http://' + config.DOMOTICZ_IP + '/json.htm?type=command&param=udevice&idx=' + str(IDX_ALERT_DEVICE) + '&nvalue=' + str(ALERT_LEVEL) + '&svalue=' + ALERT_TEXT
 # Motion detection duration (red led blinking): 1s = 10 cycles a 100ms
 MOTION_DETECTION_DURATION = 10
+# Time in ms a PIR retrigger is dropped as bounce
+MOTION_DEBOUNCE = 100
+# Time in ms retriggers are coalesced to one alert whilst the motion continues
+MOTION_HOLDOFF = 10000
+# Time in ms between the main loop dispatches
+LOOP_PERIOD = 100
+# Time in ms between the green led toggles
+ALIVE_PERIOD = 5000
 # Create LED objects
 # LED RED GPIO2 indicated motion detected (blinking)
-led_red = machine.Pin(2, machine.Pin.OUT)
+led_red = Pin(2, Pin.OUT)
 led_red.value(0)
 # LED GREEN GPIO4 indicates motion detection process running
-led_green = machine.Pin(4, machine.Pin.OUT)
+led_green = Pin(4, Pin.OUT)
 led_green.value(0)
+# Timer blinking the red led
+blink_timer = Timer()
+blink_cycles = 0
 # Set GPIO13 PIR_Interrupt as input
 sensor_pir=Pin(13, Pin.IN, Pin.PULL_UP)
-# Handle motion detection triggered by the interrupt
-def pir_handler(pin):
-    print("Motion detected!")
-    url = URL_DOM_ALERT_DEVICE
-    url = url.replace('{IDX}', str(IDX_ALERT_DEVICE))
-    url = url.replace('{LEVEL}', str(ALERT_LEVEL))
-    url = url.replace('{TEXT}', str(ALERT_TEXT))
-    
-    network.send_get_request(url)
-    
+# Toggle the red led by timer until the blink cycles are done
+def blink(timer):
+    global blink_cycles
+    blink_cycles -= 1
+    if blink_cycles > 0:
+        led_red.toggle()
+    else:
+        led_red.value(0)
+        blink_timer.deinit()
+# Handle motion detection dispatched by the main loop
+def pir_handler(ticks, count):
+    global blink_cycles
+    print(f'Motion detected! triggers={count}')
     # Let red led blink for a sec
-    for i in range(MOTION_DETECTION_DURATION): 
-        led_red.toggle() 
-        time.sleep_ms(100)
-    led_red.value(0)
-# Attach external interrupt to GPIO13 and rising edge as an external event source
-sensor_pir.irq(trigger=machine.Pin.IRQ_RISING, handler=pir_handler)
+    blink_cycles = MOTION_DETECTION_DURATION
+    led_red.value(1)
+    blink_timer.init(mode=Timer.PERIODIC, period=100, callback=blink)
+    try:
+        network.send_get_request(URL_DOM_ALERT_DEVICE)
+    except Exception as e:
+        print(f'[ERROR] {e}')
+# Attach external interrupt to GPIO13 and rising edge as an external event source,
+# the interrupt handler only enqueues the trigger, the main loop dispatches
+events = IrqEvents(schedule=False)
+events.add(sensor_pir, pir_handler, trigger=Pin.IRQ_RISING, debounce=MOTION_DEBOUNCE, holdoff=MOTION_HOLDOFF)
 """
 Handle Request
 """
@@ -75,6 +101,11 @@ print(f'{NAME} {VERSION}')
 network = Server(config.WIFI_SSID, config.WIFI_PASSWORD)
 # Connect to the network and get the server object
 server = network.connect()
+alive_time = time.ticks_ms()
 while True:
-    led_green.toggle() 
-    time.sleep(5)
+    # Handle the motion triggers, incl. the network request
+    events.dispatch()
+    if time.ticks_diff(time.ticks_ms(), alive_time) >= ALIVE_PERIOD:
+        led_green.toggle()
+        alive_time = time.ticks_ms()
+    time.sleep_ms(LOOP_PERIOD)
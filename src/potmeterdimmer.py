@@ -6,15 +6,20 @@ The Domoticz device is updated using HTTP API/JSON request to the Domoticz serve
 :notes
 Pico Breadboard Kit is used to wire up the potmeter.
 Configuration stored in config.py, ensure to upload to the picow.
+The potmeter is read by the ADC input (adcinput.py) every SAMPLE_PERIOD ms with a burst of ADC_BURST samples,
+integer boxcar & EMA filtered and quantised to the level 0-100 with hysteresis, so the level does not jitter.
+A level change sets the LED brightness and passes the change reporter (reporter.py), which keeps a min interval
+between the Domoticz updates. The low-power scheduler (lowpower.py) paces the sampling and parks the CPU in between,
+instead of the unthrottled main loop.
 :log
-PotMeterDimmer v20230330
+PotMeterDimmer v20261019
 Network connected OK
 Network IP webserver-ip
 Network listening on ('0.0.0.0', 80)
-value=11026, level=17, prev_level=-1, abs=18
+level=17
 Send GET request url=http://domoticz-ip:port/json.htm?type=command&param=switchlight&idx=1&switchcmd=Set%20Level&level=17
 Send GET request status=OK
-value=224, level=0, prev_level=17, abs=17
+level=0
 Send GET request url=http://domoticz-ip:port/json.htm?type=command&param=switchlight&idx=1&switchcmd=Set%20Level&level=0
 Send GET request status=OK
 :wiring
@@ -27,19 +32,27 @@ LED = PicoW
 """
 # Imports
 from machine import Pin, ADC, PWM
-from utime import sleep
 # Call server from server.py (must be uploaded to the picow)
 from server import Server
+# Change reporter from reporter.py
+from reporter import Reporter
+# ADC input from adcinput.py
+from adcinput import AdcInput
+# Low-power scheduler from lowpower.py
+from lowpower import Scheduler
 # Configuration (must be uploaded to the picow)
 import config
 # Constants
-VERSION = 'PotMeterDimmer v20230330'
+VERSION = 'PotMeterDimmer v20261019'
 # Dimmer min max range using offsets
 DIMMER_MAX = const(65500)	# 65535
 DIMMER_MIN = const(250)		# 0
-# Helper to map the PWM range to 0-100%
-def mapRange(value, inMin, inMax, outMin, outMax):
-    return outMin + (((value - inMin) / (inMax - inMin)) * (outMax - outMin))
+# Time in ms between the ADC bursts
+SAMPLE_PERIOD = const(20)
+# Number of ADC samples per burst
+ADC_BURST = const(8)
+# Level hysteresis in raw ADC units beyond the half step (step = 652)
+ADC_HYSTERESIS = const(160)
 # Create ADC0 object GP26
 adc0 = ADC(0)
 # Create PWM LED GP16 to control the dimmer level 0-100%
@@ -51,36 +64,31 @@ IDX_DIMMER = 1
 # Note the idx of the domoticz device ( see GUI > Setup > Devices)
 # /json.htm?type=command&param=switchlight&idx=99&switchcmd=Set%20Level&level=6
 URL_DOM = 'http://'+config.DOMOTICZ_IP+'/json.htm?type=command&param=switchlight&idx='+str(IDX_DIMMER)+'&switchcmd=Set%20Level&level='
-# Por meter noise level 2%
-NOISE_LEVEL = 2
-# Keep the previous level
-prev_level = -1
+# Min time in ms between the Domoticz updates
+MIN_INTERVAL = 500
 """
-Get the dimmer level between 0-100.
-:return int level
+Set the dimmer level between 0-100 on level change.
+:param int level
     level between 0-100
-:example
-    18
 """
-def set_dimmer_level():
-    global prev_level
-    # Read ADC0
-    # Noise reduction: Not used but either LSB divide (adc0.read_u16() >> 2) or remove (adc0.read_u16() & 0b1111111111111100)
-    value = adc0.read_u16()
-    
-    # Map the potmeter range to 0-100
-    level = round(mapRange(value, DIMMER_MIN, DIMMER_MAX, 0, 100))
-    # Check if the abs value between the current and prev reading is greater noise level
-    if abs(prev_level - level) > NOISE_LEVEL:
-        print(f'value={value}, level={level}, prev_level={prev_level}, abs={abs(level - prev_level)}')
-        # Set PWM-Duty-Cycle = brightness of the control LED
-        pwmled.duty_u16(value)
-        
-        # Keep the prev level
-        prev_level = level
-        # Submit Domoticz HTTP API/JSON GET request to update the device
+def set_dimmer_level(level):
+    # Set PWM-Duty-Cycle = brightness of the control LED
+    pwmled.duty_u16(level * 65535 // 100)
+    # Report if the min interval passed, else the level is reported by the flush
+    reporter.update('level', level)
+
+# Submit Domoticz HTTP API/JSON GET request to update the device
+def send_level(level):
+    print(f'level={level}')
+    try:
         network.send_get_request(URL_DOM + str(level))
-        sleep(0.5)
+    except Exception as e:
+        print(f'[ERROR] {e}')
+# Create the reporter with the dimmer level channel
+reporter = Reporter()
+reporter.add('level', send_level, min_interval=MIN_INTERVAL)
+# Create the potmeter input with the dimmer range
+potmeter = AdcInput(adc0, burst=ADC_BURST, in_min=DIMMER_MIN, in_max=DIMMER_MAX, hysteresis=ADC_HYSTERESIS, callback=set_dimmer_level)
     
 # Info
 print(f'{VERSION}')
@@ -89,7 +97,9 @@ network = Server(config.WIFI_SSID, config.WIFI_PASSWORD, DEBUG=True)
 # Connect to the network and get the server object
 server = network.connect()
 # Main
-while True:
-    # Listen to potmeter changes & set domoticz dimmer to 0-100%
-    set_dimmer_level()    
+# Listen to potmeter changes & set domoticz dimmer to 0-100%
+sched = Scheduler()
+sched.every(SAMPLE_PERIOD, potmeter.tick)
+sched.every(MIN_INTERVAL, reporter.flush)
+sched.run()    
   
@@ -1,13 +1,25 @@
 """
 File:	rfid.py
-Date:	20230319
+Date:	20261019
 Author:	Robert W.B. Linn
 :description
 Read the UID of an RFID card and send to Domoticz text device.
 The Domoticz text device is updated using HTTP API/JSON request to the Domoticz server.
 The log of the Domoticz text device lists all the cards read.
-The time between the card readings must be greater threshold to avoid multiple readings and updates of the Domoticz text device.
-The threshold in seconds is defined as constant MIN_DELTA_TIME = 2.
+The cards in the field are scanned by a presence tracker, a card is sent once when placed on the reader (arrive event).
+A card lying on the reader does not update the Domoticz text device again, until removed (depart event) and placed again.
+Several cards and 7-byte UIDs (i.e. NTAG) are supported.
+The main loop waits for a card with wait_card instead of busy polling, so the CPU is free for the network stack.
+If the RFID IRQ output is wired and set with PIN_IRQ (default None), the reader signals a card by pin interrupt, else the reader is polled every 200ms.
+Whilst cards are present, the field is scanned every SCAN_PERIOD ms.
+The access decision is made on the device with a local UID allowlist (uidallowlist.py), also if Domoticz is not reachable.
+An allowed card opens the door (LED2) for DOOR_OPEN_TIME ms, before any network request.
+The card events uid,VALID or uid,NOT VALID are queued and sent to the Domoticz text device after the card handling.
+The events are sent synchronously in the main loop, the loop blocks during the HTTP requests, but the door is already open.
+Events not sent (Domoticz not reachable) stay queued, max REPORT_QUEUE_SIZE events.
+The allowlist is synced every SYNC_PERIOD s from the Domoticz user variable IDX_ALLOWLIST (type string) with JSON,
+full list {"version": 1, "uids": ["346FC2CF"]} or changes {"version": 2, "base": 1, "add": ["56381D00"], "remove": []}.
+The allowlist is saved to the file allowlist.bin.
 :notes
 Pico Breadboard Kit is used to wire up the RFID.
 Pico Breadboard Kit LED1 is used as status LED when requesting RFID data and updating domoticz.
@@ -22,18 +34,20 @@ Network connected OK
 Network IP webserver-ip
 Network listening on ('0.0.0.0', 80)
 Init RFID Module=rp2
-CARD DETECTED: tag_type=10, uid_hex=346FC2CF, uid_dec=879739599
-Send GET request url=http://domoticz-ip:8080/json.htm?type=command&param=udevice&idx=27&nvalue=0&svalue=879739599
+Allowlist version=2, uids=2
+CARD ARRIVE: uid_hex=346FC2CF, uid_dec=879739599, VALID
+Send GET request url=http://domoticz-ip:8080/json.htm?type=command&param=udevice&idx=27&nvalue=0&svalue=879739599,VALID
 Send GET request status=OK
-CARD DETECTED: tag_type=10, uid_hex=56381D00, uid_dec=1446518016
-Send GET request url=http://domoticz-ip:8080/json.htm?type=command&param=udevice&idx=27&nvalue=0&svalue=1446518016
+CARD DEPART: uid_hex=346FC2CF, uid_dec=879739599
+CARD ARRIVE: uid_hex=12345678, uid_dec=305419896, NOT VALID
+Send GET request url=http://domoticz-ip:8080/json.htm?type=command&param=udevice&idx=27&nvalue=0&svalue=305419896,NOT VALID
 Send GET request status=OK
 :wiring
 RFID-RC522 Module = Pico W
 VCC = 3.3V
 RST = GP0
 GND = GND
-IRQ = Not connected
+IRQ = GP5 (optional, not connected by default, set PIN_IRQ = 5 if connected)
 MISO = GP4
 MOSI = GP3
 SCK = GP2
@@ -42,21 +56,25 @@ SDA = GP1
 """
 Imports
 """
-from machine import Pin
-from utime import sleep
-import time
+from machine import Pin, Timer
+from utime import sleep_ms, ticks_ms, ticks_diff
 # RFID
 import mfrc522
+from mfrc522presence import Presence, ARRIVE
+from uidallowlist import UidAllowlist
 from os import uname
 # Call server from server.py (must be uploaded to the picow)
 from server import Server
 # Configuration (must be uploaded to the picow)
 import config
 # Constants
-VERSION = 'RFID v20230319'
+VERSION = 'RFID v20261019'
 # Create the led object indicating RFID read in progress
 led1 = Pin(config.PIN_LED1, Pin.OUT)
 led1.value(0)
+# Create the led object indicating the door open
+door = Pin(config.PIN_LED2, Pin.OUT)
+door.value(0)
 """
 Domoticz
 """
@@ -66,46 +84,107 @@ IDX_RFID = 27
 # Note the idx of the domoticz device ( see GUI > Setup > Devices)
 # The svalue is added in the main loop after getting the data from the RFID.
 URL_DOM = "http://"+ config.DOMOTICZ_IP +"/json.htm?type=command&param=udevice&idx=" + str(IDX_RFID) + "&nvalue=0&svalue="
+# IDX user variable (string) with the allowlist sync data
+IDX_ALLOWLIST = 1
+# URL to get the user variable
+URL_ALLOWLIST = "http://"+ config.DOMOTICZ_IP +"/json.htm?type=command&param=getuservariable&idx=" + str(IDX_ALLOWLIST)
+# Flags added to the uid
+FLAG_VALID = 'VALID'
+FLAG_NOT_VALID = 'NOT VALID'
+# Max number of events queued whilst Domoticz is not reachable
+REPORT_QUEUE_SIZE = 20
+# Time in s between the allowlist syncs
+SYNC_PERIOD = 60
 """
 RFID
 """
+# Pin connected to the RFID IRQ output, None if not connected (default), i.e. 5 for GP5
+PIN_IRQ = None
 # Flag to read the data
 # Not used as only the card uid is used
+# Not supported by the presence scan, as the cards are halted after reading the uid
 READ_DATA = False
 """
-RFID Timer
+RFID Presence
 """
-first_time_reading = True
-# Delta time between readings in seconds
-MIN_DELTA_TIME = 2
-# Start time in seconds
-start_time = time.time()
-# Read_time
-read_time = start_time
-# Previous UID NOT USED
-uid_previous = -1
+# Time in ms between the scans whilst cards are present
+SCAN_PERIOD = 250
+# Number of scans a card is missing until departed
+DEPART_SCANS = 2
+# Time in ms waiting for a card before reporting queued events and syncing the allowlist
+IDLE_PERIOD = 1000
+"""
+Access
+"""
+# Time in ms the door is open
+DOOR_OPEN_TIME = 3000
+# Timer to close the door
+door_timer = Timer()
+# Events uid,flag to send to Domoticz
+events = []
+"""
+Open the door and close after DOOR_OPEN_TIME by one-shot timer.
+"""
+def open_door():
+    door.value(1)
+    door_timer.init(mode=Timer.ONE_SHOT, period=DOOR_OPEN_TIME, callback=lambda t: door.value(0))
+"""
+Queue an event to send to Domoticz, the oldest event is dropped if the queue is full.
+:param string svalue
+    Text uid,flag
+"""
+def queue_event(svalue):
+    if len(events) >= REPORT_QUEUE_SIZE:
+        events.pop(0)
+    events.append(svalue)
+"""
+Send the queued events to Domoticz, stop at the first error and keep the remaining events.
+"""
+def report_events():
+    while len(events) > 0:
+        try:
+            network.send_get_request(URL_DOM + events[0])
+        except Exception as e:
+            print(f'[ERROR] Report event {events[0]}: {e}')
+            return
+        events.pop(0)
+"""
+Sync the allowlist with the user variable, the decisions use the local allowlist if Domoticz is not reachable.
+"""
+def sync_allowlist():
+    try:
+        status, content = network.send_get_request(URL_ALLOWLIST)
+        if not allowlist.sync(content['result'][0]['Value']):
+            print(f'[ERROR] Allowlist changes not for version {allowlist.version}, set the full list')
+    except Exception as e:
+        print(f'[ERROR] Allowlist sync: {e}')
+    print(f'Allowlist version={allowlist.version}, uids={allowlist.count()}')
 """
 RFID object init
 :return object mfrc522
 """
 def init_rfid():
     print(f'Init RFID Module={str(uname()[0])}')
-    return mfrc522.MFRC522(sck=2, miso=4, mosi=3, cs=1, rst=0)
+    return mfrc522.MFRC522(sck=2, miso=4, mosi=3, cs=1, rst=0, irq=PIN_IRQ)
     # print(f'Place card before reader. READ ARRD: 0x08')
 """
 Read the RFID data (optional)
 :param object rdr
     Card reader object
     
+:param list raw_uid
+    UID bytes of the card, i.e. as returned by rdr.read_uid()
+    
 :return string hexstr
     Card data as hex string
     
 :example
-read_data(rdr)
+(stat, raw_uid) = rdr.read_uid()
+read_data(rdr, raw_uid)
 RAW DATA: ['0x0', '0x0', '0x0', '0x0', '0x0', '0x0', '0x0', '0x0', '0x0', '0x0', '0x0', '0x0', '0x0', '0x0', '0x0', '0x0']
 ['0x0', '0x0', '0x0', '0x0', '0x0', '0x0', '0x0', '0x0', '0x0', '0x0', '0x0', '0x0', '0x0', '0x0', '0x0', '0x0']
 """
-def read_data(rdr):
+def read_data(rdr, raw_uid):
     hexstr = []
     # Get the card data (optional)
     if rdr.select_tag(raw_uid) == rdr.OK:
@@ -134,46 +213,47 @@ network = Server(config.WIFI_SSID, config.WIFI_PASSWORD, DEBUG=True)
 server = network.connect()
 # Init the RFID module
 rdr = init_rfid()
+# Create the presence tracker
+presence = Presence(rdr, depart_scans=DEPART_SCANS)
+# Create the allowlist restored from the file and sync
+allowlist = UidAllowlist('allowlist.bin')
+sync_allowlist()
+sync_time = ticks_ms()
 while True:
     # Wait for RFID card to read.
-    # If RFID card found, send the card UID as decimal to Domoticz text device
-    # Read the rfid card data
-    (stat, tag_type) = rdr.request(rdr.REQIDL)
-    # print(stat)
-    # If the reader status is OK, then get the card type and uid
-    if stat == rdr.OK:
+    if presence.count() == 0:
+        # No card present: wait for a card answering the request, the CPU idles or sleeps in between
+        (stat, tag_type) = rdr.wait_card(rdr.REQIDL, timeout=IDLE_PERIOD)
+        scan = stat == rdr.OK
+    else:
+        # Cards present: scan again after the scan period to detect arriving and departing cards
+        sleep_ms(SCAN_PERIOD)
+        scan = True
+    if scan:
         # LED1 indicator on
         led1.value(1)
-        # Get the reading status and uid as raw data
-        (stat, raw_uid) = rdr.anticoll()
-        # If the status is OK, lets send the UID to Domoticz
-        if stat == rdr.OK:
-            # Get the tag type, i.e. 10
-            tagtype = f'{tag_type:0X}'
+        # Scan the cards in the field, a card placed on the reader is handled once
+        for (event, uid_hex) in presence.scan():
             # Get the card uid as hex (each byte 2 hex size in uppercase) and dec, i.e. 56381D00 = 1446518016
             # The dec value is send to domoticz
-            uid_hex = f'{raw_uid[0]:0>2X}{raw_uid[1]:0>2X}{raw_uid[2]:0>2X}{raw_uid[3]:0>2X}'
             uid_dec = int(uid_hex, 16)
-            print(f'CARD DETECTED: tag_type={tagtype}, uid_hex={uid_hex}, uid_dec={uid_dec}')
-            # Read_time and check the delta time in seconds between the readings
-            # This to avoid multiple text device updates within (milli)seconds
-            read_time = time.time()
-            delta_time = read_time - start_time
-            # print(f'{start_time}, {read_time}, {delta_time}')
-            # Update domoticz if the delta time exceeded or if first time reading
-            if delta_time > MIN_DELTA_TIME or first_time_reading:
-                first_time_reading = False
-                uid_previous = uid_dec
-                start_time = read_time
-                
-                # Submit Domoticz HTTP API/JSON GET request to update the device
-                # The uid card id decimal value is submitted to the Domoticz text device
-                network.send_get_request(URL_DOM + str(uid_dec))
-                
-                # Read data is not used and to be developed further like handling auth error
-                if READ_DATA:
-                    data = read_data(rdr)
-                    # network.send_get_request(URL_DOM + data)
-        
+            if event == ARRIVE:
+                # Access decision with the local allowlist, the door opens without network request
+                if allowlist.allowed(uid_hex):
+                    open_door()
+                    flag = FLAG_VALID
+                else:
+                    flag = FLAG_NOT_VALID
+                print(f'CARD {event.upper()}: uid_hex={uid_hex}, uid_dec={uid_dec}, {flag}')
+                # The uid card id decimal value and flag are submitted to the Domoticz text device after the card handling
+                queue_event(f'{uid_dec},{flag}')
+            else:
+                print(f'CARD {event.upper()}: uid_hex={uid_hex}, uid_dec={uid_dec}')
         # LED1 indicator off
         led1.value(0)
+    # Submit the queued Domoticz HTTP API/JSON GET requests to update the device
+    report_events()
+    # Sync the allowlist if the sync period passed and no card is present
+    if presence.count() == 0 and ticks_diff(ticks_ms(), sync_time) >= SYNC_PERIOD * 1000:
+        sync_allowlist()
+        sync_time = ticks_ms()
@@ -3,6 +3,8 @@ rgbled.py
 20230318 rwbl
 PicoW RESTful webserver listening to control an RGB LED via Domoticz RGB Switch.
 Commands set via HTTP GET request with HTTP response JSON object.
+The color & level change fades with gamma correction by the fade engine (pwmfade.py) on the 3 PWM channels at once,
+the fade runs by timer so the server loop is not blocked. A new color during a fade continues from the current color.
 :commands
 The command is defined as JSON object:
 {'level': 0-100, 'red': 0-255, 'green': 0-255, 'blue': 0-255}
@@ -11,7 +13,7 @@ curl -v -H "Content-Type: application/json" -d "{\"level\": 18, \"red\": 255, \"
 NOTE:
 When using curl ensure to escape the " to \" in the JSON object.
 Thonny Log
-RGBLED v20230327
+RGBLED v20261019
 Network IP webserver-ip
 Network listening on ('0.0.0.0', 80)
 Network client connected from NNN.NNN.NNN.23
@@ -20,22 +22,26 @@ HTTP Response={"status": "OK", "title": {"level": 18, "red": 255, "green": 0, "b
 Network connection closed
 """
 # Libraries
-from machine import Pin
+from machine import Pin, PWM
 import json
-# RGBLED extended class
-from rgbledex import RGBLEDEX
+# Fade engine
+from pwmfade import Fader
 # Network class
 from server import Server
 # Configuration read from config.py (must be uploaded to the picow prior testing)
 import config
 # Constants
 NAME = 'RGBLED'
-VERSION = 'v20230327'
-# Create the RGBLED object
+VERSION = 'v20261019'
+# Create the RGB LED PWM channels
 RGB_PIN_RED = const(2)
 RGB_PIN_GREEN = const(3)
 RGB_PIN_BLUE = const(4)
-rgb = RGBLEDEX(RGB_PIN_RED, RGB_PIN_GREEN, RGB_PIN_BLUE)
+PWM_FREQ = const(1000)
+# Color fade duration in ms
+FADE_DURATION = const(800)
+fader = Fader(duration=FADE_DURATION)
+rgb = [fader.add(PWM(Pin(pin), freq=PWM_FREQ)) for pin in (RGB_PIN_RED, RGB_PIN_GREEN, RGB_PIN_BLUE)]
 """
 Handle the request containing the command as JSON object.
 Example: {["blue"]=32, ["level"]=78, ["green"]=0, ["red"]=255}
@@ -49,7 +55,9 @@ def handle_request(data):
     g = data['green']
     b = data['blue']
     l = data['level']
-    rgb.set_color_brightness(r,g,b,l)
+    # Fade the channels to the color 0-255 scaled by the level 0-100
+    for (channel, c) in zip(rgb, (r, g, b)):
+        fader.fade(channel, c * l // 100)
     # Response is OK
     response[config.KEY_STATE] = config.STATE_OK
     response[config.KEY_MESSAGE] = data['level']
@@ -4,21 +4,31 @@ Date:	20230318
 Author:	Robert W.B. Linn
 PicoW RESTful webserver listening for data from Domoticz event.
 The incoming data is from a HTTP POST request with JSON object to set the position (angle) of a servo motor 0-180 degrees.
+Two servos of a pan/tilt rig are moved by the motion planner (servomotion.py) with eased trajectories,
+both servos start and arrive together within the velocity limit. The move runs by timer, so the server is not blocked.
+A new command during a move is queued.
+:commands
+{"angle": 0-180} moves the pan servo (the tilt holds).
+{"pan": 0-180, "tilt": 0-180, "duration": ms} moves both servos, the keys are optional.
 :log
-Domoticz Servo Control v20230311
+Domoticz Servo Control v20261019
 Network connected OK
 Network IP webserver-ip
 Network listening on ('0.0.0.0', 80)
 Network client connected from NNN.NNN.NNN.23
-HTTP Command={'angle': 180}
-Servo position deg=180,duty=500000
-HTTP Response={"status": "OK", "title": {"angle": 180}, "message": "180"}
+HTTP Command={'pan': 180, 'tilt': 45}
+Servo move pan=180,tilt=45,duration=1000
+HTTP Response={"status": "OK", "title": {"pan": 180, "tilt": 45}, "message": "180;45"}
 Network connection closed
 :wiring
-Servo = PicoW
+Servo pan = PicoW
 VCC = VBUS (5V) (red)
 Signal = GP0 (pin #1) (yellow)
 GND = GND (black)
+Servo tilt = PicoW
+VCC = VBUS (5V) (red)
+Signal = GP1 (pin #2) (yellow)
+GND = GND (black)
 """
 # Libraries
 import time
@@ -29,22 +39,35 @@ import json
 from server import Server
 # Servo lib stored in PicoW folder lib
 from servo import Servo
+# Motion planner
+from servomotion import Planner
 # Configuration read from config.py (must be uploaded to the picow prior testing)
 import config
 # Constants
 NAME = 'Domoticz Servo Control'
-VERSION = 'v20230311'
+VERSION = 'v20261019'
+# Move duration in ms (min, the velocity limit can extend)
+MOVE_DURATION = 1000
+# Velocity limit in degrees per s
+PAN_SPEED = 180
+TILT_SPEED = 90
 # Create the LED1 (blue) object using config.py settings
 led1 = Pin(2, Pin.OUT)
 led1.off()
-# Create the servo object with the default (GP0 (Pin #1)
-servo = Servo()
-# Set the servo pos and log
-def set_servo_position(pos):
-    duty = servo.set_angle(pos)
-    print("Servo position deg=" + str(pos) + ",duty=" + str(duty))
+# Create the planner with the pan servo (GP0 (Pin #1) and the tilt servo GP1 (Pin #2)
+planner = Planner(duration=MOVE_DURATION)
+pan = planner.add(Servo(pin=0), speed=PAN_SPEED)
+tilt = planner.add(Servo(pin=1), speed=TILT_SPEED)
+# Queue the servo move and log
+def set_servo_position(pan_angle, tilt_angle, duration):
+    if not planner.move((pan_angle, tilt_angle), duration=duration):
+        print("[ERROR] Servo move queue full")
+        return False
+    print(f"Servo move pan={pan_angle},tilt={tilt_angle},duration={duration}")
+    return True
 """
 Handle the resquest to set the servo pos between 0-180 degrees.
+The key angle is the pan angle.
 """
 def handle_request(cmd, status):
     # Assign the command to the response title
@@ -53,14 +76,18 @@ def handle_request(cmd, status):
     if status == 1:
         led1.on()
         
-        # Get the angle of the servo to set
-        angle = cmd['angle']
+        # Get the angles of the servos to set, None holds the servo
+        pan_angle = cmd.get('pan', cmd.get('angle'))
+        tilt_angle = cmd.get('tilt')
+        duration = cmd.get('duration', MOVE_DURATION)
         
         # Set the servo pos
-        set_servo_position(angle)
+        if set_servo_position(pan_angle, tilt_angle, duration):
+            response[config.KEY_STATE] = config.STATE_OK
+        else:
+            response[config.KEY_STATE] = config.STATE_ERR
         # Set the response
-        response[config.KEY_STATE] = config.STATE_OK
-        response[config.KEY_MESSAGE] = str(angle)
+        response[config.KEY_MESSAGE] = f'{pan_angle};{tilt_angle}' if tilt_angle is not None else str(pan_angle)
         led1.off()
     else:
         response[config.KEY_STATE] = config.STATE_ERR
@@ -93,7 +120,7 @@ while True:
         # Send the response to Domoticz and close the connection (wait for new)
         network.send_response(cl, response, True)
     except OSError as e:
-        ledstatus.off()
+        led1.off()
         cl.close()
         print('[ERROR] Network Connection closed')
         
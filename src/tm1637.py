@@ -6,6 +6,8 @@ Author:	Robert W.B. Linn
 PicoW RESTful webserver listening for data from Domoticz event.
 The incoming data is from a HTTP POST request with JSON object.
 The JSON object has key:value pais: {"data":NNNN}
+Whilst waiting for data, a welcome text scrolls without blocking the webserver (segmentanimator.py).
+The animation is cancelled when new data arrives.
 LED1 is attached on the Pico Breadboard kit.
 :log
 Domoticz TM1637 v20230304
@@ -26,17 +28,18 @@ GND = GND (black)
 """
 # Libraries
 import time
-from time import sleep
 from machine import Pin
 # Call server from server.py (must be uploaded to the picow)
 from server import Server
 # TM1637 lib stored in PicoW folder lib
 import tm1637
+# Non-blocking scroll animation stored in PicoW folder lib
+from segmentanimator import SegmentAnimator
 # Configuration read from config.py (must be uploaded to the picow prior testing)
 import config
 # Constants
 NAME = 'Domoticz TM1637'
-VERSION = 'v20230304'
+VERSION = 'v20261019'
 # Create the LED1 (blue) object using config.py settings
 led1 = Pin(config.PIN_LED1, Pin.OUT)
 led1.off()
@@ -64,9 +67,8 @@ def set_tm1637(cmd, status):
     response[config.KEY_TITLE] = cmd
     # If the status is 1 (OK) then set the tm1637 with data.
     if status == 1:
-        # Clear the display
-        tm.show('    ')
-        sleep(.3)
+        # Stop the scroll animation
+        anim.cancel()
         # Get the temperature rounded (no digits) from the JSON key 'data'
         temperature = round(cmd['data'])
         # Set the display NN°C
@@ -90,6 +92,10 @@ print(f'{NAME} {VERSION}')
 tm = init_tm1637(TM1637_I2C_ADDRESS, TM1637_PIN_DIO, TM1637_PIN_CLK)
 tm.show('1958')
 #tm.show('    ')
+# Scroll the welcome text until the first data arrives
+anim = SegmentAnimator(tm)
+anim.start()
+anim.scroll('domoticz', delay=250, repeat=True)
 # Create network object
 network = Server(config.WIFI_SSID, config.WIFI_PASSWORD, DEBUG=True)
 # Connect to the network and get the server object
@@ -0,0 +1,46 @@
+"""
+File:	bench_lcd.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Benchmark the I2C transactions and the CPU time of the HD44780 LCD driver (machine_i2c_lcd.py, lcd_api.py)
+against the previous driver (4 writeto per character plus a cursor move after every character).
+The screens are the welcome screen and the Domoticz update of the project lcd2004_motherboard.py.
+Both drivers showing the same screen is checked by test_lcd.py.
+:usage
+python tests/bench_lcd.py
+:log (host CPython 3.11)
+I2C welcome screen
+  transactions previous                                   396
+  transactions batched                                      6
+  bytes previous                                          396
+  bytes batched                                           204
+I2C domoticz update
+  transactions previous                                   648
+  transactions batched                                     24
+  bytes previous                                          648
+  bytes batched                                           360
+CPU time domoticz update
+  previous                                             784.05 us
+  batched                                              174.72 us
+"""
+# Imports
+import benchmark
+from machine import I2C
+from machine_i2c_lcd import I2cLcd
+from emulator.hd44780 import HD44780
+from test_lcd import PreviousI2cLcd, transactions, update
+(previous, previous_rows) = transactions(PreviousI2cLcd)
+(batched, batched_rows) = transactions(I2cLcd)
+for (i, name) in enumerate(('welcome screen', 'domoticz update')):
+    benchmark.report(f'I2C {name}', [
+        ('transactions previous', previous[i][0], ''),
+        ('transactions batched', batched[i][0], ''),
+        ('bytes previous', previous[i][1], ''),
+        ('bytes batched', batched[i][1], ''),
+    ])
+rows = []
+for (name, cls) in (('previous', PreviousI2cLcd), ('batched', I2cLcd)):
+    lcd = cls(I2C(0, device=HD44780(4, 20)), 0x27, 4, 20)
+    rows.append((name, benchmark.timeit(lambda: update(lcd), 100), 'us'))
+benchmark.report('CPU time domoticz update', rows)
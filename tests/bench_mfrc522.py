@@ -0,0 +1,118 @@
+"""
+File:	bench_mfrc522.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Benchmark the card detect to UID latency of the MFRC522 driver (mfrc522.py) with preallocated buffers,
+write_readinto register reads and FIFO bursts, against the previous implementation
+(two writes with a new formatted bytes object per register write, read(1) per register read, one register access per FIFO byte).
+A card detection is request(REQIDL), anticoll() and select_tag(uid).
+The reader register file and a card are emulated (emulator.rc522), both implementations must get the same UID.
+The host CPU time includes the emulation, the bus time is estimated for the SPI clock of 1 MHz (rp2).
+:usage
+python tests/bench_mfrc522.py
+:log (host CPython 3.11)
+card detect to UID (request, anticoll, select_tag)
+  SPI transfers previous                               174.00
+  SPI transfers buffers & bursts                        65.00
+  SPI bytes previous                                   174.00
+  SPI bytes buffers & bursts                           152.00
+  bus time at 1 MHz previous                          1392.00 us
+  bus time at 1 MHz buffers & bursts                  1216.00 us
+  SPI buffers allocated previous                       174.00
+  SPI buffers allocated buffers & bursts                 0.00
+  CPU time incl. emulation previous                    745.61 us
+  CPU time incl. emulation buffers & bursts            454.74 us
+"""
+# Imports
+import benchmark
+from machine import SPI
+import mfrc522
+from emulator.rc522 import RC522, Card
+class PreviousMFRC522(mfrc522.MFRC522):
+    """Previous implementation: formatted bytes per register write, read(1) per register read, FIFO byte by byte."""
+    def _wreg(self, reg, val):
+        self.cs.value(0)
+        self.spi.write(b'%c' % int(0xff & ((reg << 1) & 0x7e)))
+        self.spi.write(b'%c' % int(0xff & val))
+        self.cs.value(1)
+    def _rreg(self, reg):
+        self.cs.value(0)
+        self.spi.write(b'%c' % int(0xff & (((reg << 1) & 0x7e) | 0x80)))
+        val = self.spi.read(1)
+        self.cs.value(1)
+        return val[0]
+    def _wfifo(self, data):
+        for c in data:
+            self._wreg(0x09, c)
+    def _rfifo(self, n):
+        recv = []
+        for _ in range(n):
+            recv.append(self._rreg(0x09))
+        return recv
+class CountingSPI(SPI):
+    """SPI bus counting the buffers not preallocated by the driver, incl. the buffers returned by read()."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buffers = []
+        self.allocated = 0
+    def _new(self, buf):
+        if isinstance(buf, memoryview):
+            buf = buf.obj
+        if not any(buf is b for b in self.buffers):
+            self.allocated += 1
+    def write(self, buf):
+        self._new(buf)
+        super().write(buf)
+    def read(self, nbytes, write=0x00):
+        self.allocated += 1
+        return super().read(nbytes, write)
+    def write_readinto(self, write_buf, read_buf):
+        self._new(write_buf)
+        self._new(read_buf)
+        super().write_readinto(write_buf, read_buf)
+UID = [0x34, 0x6F, 0xC2, 0xCF]
+def create(cls):
+    # The emulator is attached after the init with the default chip select pin, then init again
+    rdr = cls(sck=2, miso=4, mosi=3, cs=1, rst=0, spi=CountingSPI(0))
+    device = RC522()
+    device.cards.append(Card(UID))
+    rdr.spi.device = device
+    rdr.cs = device.cs
+    rdr.spi.buffers = [rdr._tx, rdr._rx, rdr._fifo_tx, rdr._fifo_rd, rdr._fifo_rx]
+    rdr.init()
+    return rdr, device
+def detect(rdr, device):
+    # Card placed on the reader: idle state
+    device.cards[0].state = Card.IDLE
+    (stat, tag_type) = rdr.request(rdr.REQIDL)
+    assert stat == rdr.OK
+    (stat, raw_uid) = rdr.anticoll()
+    assert stat == rdr.OK
+    assert rdr.select_tag(raw_uid) == rdr.OK
+    return raw_uid
+def run(cls):
+    rdr, device = create(cls)
+    assert detect(rdr, device)[0:4] == UID
+    rdr.spi.reset()
+    rdr.spi.allocated = 0
+    N = 200
+    us = benchmark.timeit(lambda: detect(rdr, device), N)
+    transactions = rdr.spi.transactions / N
+    nbytes = rdr.spi.bytes / N
+    allocated = rdr.spi.allocated / N
+    return transactions, nbytes, nbytes * 8, allocated, us
+previous = run(PreviousMFRC522)
+burst = run(mfrc522.MFRC522)
+benchmark.report('card detect to UID (request, anticoll, select_tag)', [
+    ('SPI transfers previous', previous[0], ''),
+    ('SPI transfers buffers & bursts', burst[0], ''),
+    ('SPI bytes previous', previous[1], ''),
+    ('SPI bytes buffers & bursts', burst[1], ''),
+    ('bus time at 1 MHz previous', previous[2], 'us'),
+    ('bus time at 1 MHz buffers & bursts', burst[2], 'us'),
+    ('SPI buffers allocated previous', previous[3], ''),
+    ('SPI buffers allocated buffers & bursts', burst[3], ''),
+    ('CPU time incl. emulation previous', previous[4], 'us'),
+    ('CPU time incl. emulation buffers & bursts', burst[4], 'us'),
+])
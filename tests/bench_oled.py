@@ -0,0 +1,127 @@
+"""
+File:	bench_oled.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Benchmark the allocations and the bytes copied per show() of the OLED drivers ssd1306ex.py and sh1106.py
+against the previous data writes (SH1106: page slice copy plus control byte concatenation per page,
+SPI: new bytearray per command).
+A full refresh and a refresh of one changed value are measured.
+The buffers passed to the bus are counted: new buffers (allocated, bytes copied)
+and memoryview slices (allocated object, no bytes copied). Preallocated buffers and slices are not counted.
+The previous SH1106 also copied each page slice before the concatenation, which the bus does not see.
+The heap bytes traced are the CPython peak of show(), use for comparison only.
+:usage
+python tests/bench_oled.py
+:log (host CPython 3.11)
+SH1106 I2C previous show()
+  full refresh heap bytes traced                          475
+  full refresh buffers allocated                            8
+  full refresh memoryview slices allocated                  0
+  full refresh bytes copied                              1032
+  value changed heap bytes traced                         443
+  value changed buffers allocated                           1
+  value changed memoryview slices allocated                 0
+  value changed bytes copied                              129
+SH1106 I2C show()
+  full refresh heap bytes traced                          144
+  full refresh buffers allocated                            0
+  full refresh memoryview slices allocated                  0
+  full refresh bytes copied                                 0
+  value changed heap bytes traced                         144
+  value changed buffers allocated                           0
+  value changed memoryview slices allocated                 0
+  value changed bytes copied                                0
+SSD1306 I2C show()
+  full refresh heap bytes traced                           96
+  full refresh buffers allocated                            0
+  full refresh memoryview slices allocated                  0
+  full refresh bytes copied                                 0
+  value changed heap bytes traced                         328
+  value changed buffers allocated                           0
+  value changed memoryview slices allocated                 1
+  value changed bytes copied                                0
+SSD1306 SPI previous show()
+  full refresh heap bytes traced                          154
+  full refresh buffers allocated                            6
+  full refresh memoryview slices allocated                  0
+  full refresh bytes copied                                 6
+  value changed heap bytes traced                         296
+  value changed buffers allocated                           6
+  value changed memoryview slices allocated                 1
+  value changed bytes copied                                6
+SSD1306 SPI show()
+  full refresh heap bytes traced                           96
+  full refresh buffers allocated                            0
+  full refresh memoryview slices allocated                  0
+  full refresh bytes copied                                 0
+  value changed heap bytes traced                         296
+  value changed buffers allocated                           0
+  value changed memoryview slices allocated                 1
+  value changed bytes copied                                0
+"""
+# Imports
+import benchmark
+from machine import Pin
+import ssd1306ex
+import sh1106
+from test_oled import CopyCountingBus
+class PreviousSH1106_I2C(sh1106.SH1106_I2C):
+    """Previous implementation: page slice copy and control byte concatenation."""
+    def show(self, full_update=False):
+        w = self.width
+        pages_to_update = (1 << self.pages) - 1 if full_update else self.pages_to_update
+        for page in range(self.pages):
+            if (pages_to_update & (1 << page)):
+                self.write_cmd(sh1106._SET_PAGE_ADDRESS | page)
+                self.write_cmd(sh1106._LOW_COLUMN_ADDRESS | 2)
+                self.write_cmd(sh1106._HIGH_COLUMN_ADDRESS | 0)
+                self.write_data(self.displaybuf[(w*page):(w*page+w)])
+        self.pages_to_update = 0
+    def write_data(self, buf):
+        self.i2c.writeto(self.addr, b'\x40'+buf)
+class PreviousSSD1306_SPI(ssd1306ex.SSD1306_SPI):
+    """Previous implementation: new bytearray per command."""
+    def write_cmd(self, cmd):
+        self.spi.init(baudrate=self.rate, polarity=0, phase=0)
+        self.cs(1)
+        self.dc(0)
+        self.cs(0)
+        self.spi.write(bytearray([cmd]))
+        self.cs(1)
+def create(name):
+    bus = CopyCountingBus()
+    if name.startswith('SH1106'):
+        cls = PreviousSH1106_I2C if 'previous' in name else sh1106.SH1106_I2C
+        oled = cls(128, 64, bus)
+        bus.buffers = [oled.displaybuf, oled.temp] + oled.pagebufs + (oled.write_list[0:1] if hasattr(oled, 'write_list') else [])
+    elif name.startswith('SSD1306 I2C'):
+        oled = ssd1306ex.SSD1306_I2C(128, 64, bus)
+        bus.buffers = [oled.buffer, oled.temp, oled.write_list[0]]
+    else:
+        cls = PreviousSSD1306_SPI if 'previous' in name else ssd1306ex.SSD1306_SPI
+        oled = cls(128, 64, bus, Pin(2), Pin(3), Pin(4))
+        bus.buffers = [oled.buffer, oled.temp]
+    return oled, bus
+def measure(oled, bus, full):
+    bus.reset()
+    if full:
+        oled.fill(0)
+        oled.text('Domoticz', 0, 0, 1)
+        func = lambda: oled.show(True)
+    else:
+        oled.fill_rect(8, 24, 32, 8, 0)
+        oled.text('  42', 8, 24, 1)
+        func = oled.show
+    heap = benchmark.allocated(func)
+    return heap, bus.allocated, bus.views, bus.copied
+for name in ('SH1106 I2C previous', 'SH1106 I2C', 'SSD1306 I2C', 'SSD1306 SPI previous', 'SSD1306 SPI'):
+    oled, bus = create(name)
+    rows = []
+    for label, full in (('full refresh', True), ('value changed', False)):
+        heap, allocated, views, copied = measure(oled, bus, full)
+        rows.append((f'{label} heap bytes traced', heap, ''))
+        rows.append((f'{label} buffers allocated', allocated, ''))
+        rows.append((f'{label} memoryview slices allocated', views, ''))
+        rows.append((f'{label} bytes copied', copied, ''))
+    benchmark.report(f'{name} show()', rows)
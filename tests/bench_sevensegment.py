@@ -0,0 +1,45 @@
+"""
+File:	bench_sevensegment.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Benchmark the encode throughput of the shared 7-segment codec (sevensegment.py) against the previous driver
+implementation (segment table with if-chain per character, string formatting, new bytearray per call).
+The results of both implementations are compared by test_sevensegment.py.
+:usage
+python tests/bench_sevensegment.py
+:log (host CPython 3.11)
+Encode throughput (us per call)
+  encode_char 'x' previous                               0.31 us
+  encode_char 'x' codec                                  0.24 us
+  encode_string '12.34 abc' previous                     4.02 us
+  encode_string '12.34 abc' codec                        3.47 us
+  encode_into '12.34 abc' codec                          2.01 us
+  number -123 previous (format + encode)                 3.65 us
+  number_into -123 codec                                 1.73 us
+  temperature 21 previous (format + encode)              2.77 us
+  temperature_into 21 codec                              1.80 us
+"""
+# Imports
+import benchmark
+import sevensegment
+from test_sevensegment import _SEGMENTS, previous_encode_char, previous_encode_string
+def previous_number(num):
+    num = max(-999, min(num, 9999))
+    return previous_encode_string('{0: >4d}'.format(num))
+def previous_temperature(num):
+    return previous_encode_string('{0: >2d}'.format(num)) + bytearray([_SEGMENTS[38], _SEGMENTS[12]])
+N = 10000
+text = '12.34 abc'
+buf = bytearray(8)
+benchmark.report('Encode throughput (us per call)', [
+    ("encode_char 'x' previous", benchmark.timeit(lambda: previous_encode_char('x'), N), 'us'),
+    ("encode_char 'x' codec", benchmark.timeit(lambda: sevensegment.encode_char('x'), N), 'us'),
+    ("encode_string '12.34 abc' previous", benchmark.timeit(lambda: previous_encode_string(text), N), 'us'),
+    ("encode_string '12.34 abc' codec", benchmark.timeit(lambda: sevensegment.encode_string(text), N), 'us'),
+    ("encode_into '12.34 abc' codec", benchmark.timeit(lambda: sevensegment.encode_into(buf, text), N), 'us'),
+    ('number -123 previous (format + encode)', benchmark.timeit(lambda: previous_number(-123), N), 'us'),
+    ('number_into -123 codec', benchmark.timeit(lambda: sevensegment.number_into(buf, -123), N), 'us'),
+    ('temperature 21 previous (format + encode)', benchmark.timeit(lambda: previous_temperature(21), N), 'us'),
+    ('temperature_into 21 codec', benchmark.timeit(lambda: sevensegment.temperature_into(buf, 21), N), 'us'),
+])
@@ -0,0 +1,60 @@
+"""
+File:	bench_sh1106.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Benchmark the frames per second of the SH1106 OLED driver (sh1106.py) at 128x64, unrotated and rotated 90,
+against the previous implementation remapping the full render buffer byte by byte on every show().
+A frame changes a text of 4 characters, as used for a sensor value, or the full display.
+The time is the CPU time of show() only, the I2C bus has no device attached.
+Both implementations showing the same screen is checked by test_oled.py.
+:usage
+python tests/bench_sh1106.py
+:log (host CPython 3.11)
+SH1106 128x64 show() frames per second
+  rotate 0 value changed previous                   277104.26 fps
+  rotate 0 value changed changed region             206342.98 fps
+  rotate 0 full display previous                     61827.70 fps
+  rotate 0 full display changed region               62441.34 fps
+  rotate 90 value changed previous                    5847.29 fps
+  rotate 90 value changed changed region             65556.02 fps
+  rotate 90 full display previous                     5775.89 fps
+  rotate 90 full display changed region               7764.31 fps
+"""
+# Imports
+import time
+import benchmark
+from machine import I2C
+from sh1106 import SH1106_I2C
+class PreviousSH1106_I2C(SH1106_I2C):
+    """Previous implementation: remap the full render buffer on every show()."""
+    def show(self, full_update=False):
+        (w, p, db, rb) = (self.width, self.pages, self.displaybuf, self.renderbuf)
+        if self.rotate90:
+            for i in range(self.bufsize):
+                db[w * (i % p) + (i // p)] = rb[i]
+        self.update_y0 = w
+        self.update_y1 = 0
+        SH1106_I2C.show(self, full_update)
+def value_frame(oled, n):
+    oled.fill_rect(8, 24, 32, 8, 0)
+    oled.text('{:4d}'.format(n), 8, 24, 1)
+def full_frame(oled, n):
+    oled.fill(0)
+    oled.text('Domoticz', 0, 0, 1)
+    oled.text('{:4d}'.format(n), 8, 24, 1)
+def fps(cls, rotate, frame, n=100):
+    oled = cls(128, 64, I2C(0), rotate=rotate)
+    ns = 0
+    for i in range(n):
+        frame(oled, i)
+        t = time.perf_counter_ns()
+        oled.show()
+        ns += time.perf_counter_ns() - t
+    return 1000000000 * n / ns
+rows = []
+for rotate in (0, 90):
+    for (name, frame) in (('value changed', value_frame), ('full display', full_frame)):
+        rows.append((f'rotate {rotate} {name} previous', fps(PreviousSH1106_I2C, rotate, frame), 'fps'))
+        rows.append((f'rotate {rotate} {name} changed region', fps(SH1106_I2C, rotate, frame), 'fps'))
+benchmark.report('SH1106 128x64 show() frames per second', rows)
@@ -0,0 +1,60 @@
+"""
+File:	bench_ssd1306.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Benchmark the I2C bytes per frame of the block layout demo (project oled_motherboard_blocks.py) with the SSD1306 OLED
+driver (ssd1306ex.py) sending only the changed windows, against the previous demo clearing the display and sending
+the full buffer on every show().
+The frames are the Domoticz updates of the 6 blocks, where only the time and the CPU value change.
+The changed blocks are written by text_block or set in the layout (oled_layout.py) as the project does now.
+All show the same screen, checked by test_oled.py.
+:usage
+python tests/bench_ssd1306.py
+:log (host CPython 3.11)
+I2C frame 1 all blocks
+  transactions previous                                    14
+  transactions changed blocks                               7
+  transactions layout                                       7
+  bytes previous                                         2074
+  bytes changed blocks                                   1037
+  bytes layout                                           1037
+I2C frame 2 time changed
+  transactions previous                                    14
+  transactions changed blocks                              14
+  transactions layout                                       7
+  bytes previous                                         2074
+  bytes changed blocks                                     90
+  bytes layout                                             45
+I2C frame 3 time & cpu changed
+  transactions previous                                    14
+  transactions changed blocks                              14
+  transactions layout                                       7
+  bytes previous                                         2074
+  bytes changed blocks                                    250
+  bytes layout                                            125
+I2C frame 4 time & cpu changed
+  transactions previous                                    14
+  transactions changed blocks                              14
+  transactions layout                                       7
+  bytes previous                                         2074
+  bytes changed blocks                                    250
+  bytes layout                                            125
+"""
+# Imports
+import benchmark
+from ssd1306ex import SSD1306_I2C
+from test_oled import FRAMES, PreviousSSD1306_I2C, previous_update, blocks_update, layout_update, frame_bytes
+NAMES = ['all blocks', 'time changed', 'time & cpu changed', 'time & cpu changed']
+(previous, previous_ram) = frame_bytes(PreviousSSD1306_I2C, previous_update)
+(changed, changed_ram) = frame_bytes(SSD1306_I2C, blocks_update)
+(layout, layout_ram) = frame_bytes(SSD1306_I2C, layout_update)
+for i in range(len(FRAMES)):
+    benchmark.report(f'I2C frame {i + 1} {NAMES[i]}', [
+        ('transactions previous', previous[i][0], ''),
+        ('transactions changed blocks', changed[i][0], ''),
+        ('transactions layout', layout[i][0], ''),
+        ('bytes previous', previous[i][1], ''),
+        ('bytes changed blocks', changed[i][1], ''),
+        ('bytes layout', layout[i][1], ''),
+    ])
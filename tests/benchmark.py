@@ -0,0 +1,43 @@
+"""
+File:	benchmark.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Helpers for the library benchmarks (bench_*.py) on a host computer with CPython.
+The libraries are imported from src/lib with the MicroPython modules replaced by the emulators (emulator), as in the tests.
+The sleep functions do not sleep, so the timings measure the CPU time of the library code only.
+The benchmarks are not run by pytest, they are run as scripts and print a table.
+:usage
+python tests/bench_sevensegment.py
+"""
+# Imports
+import os
+import sys
+import time
+import tracemalloc
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'lib'))
+import emulator
+emulator.install()
+def timeit(func, n=1000):
+    """Run a function n times and return the average time per call in us."""
+    t = time.perf_counter_ns()
+    for i in range(n):
+        func()
+    return (time.perf_counter_ns() - t) / 1000 / n
+def allocated(func):
+    """
+    Run a function and return the peak of the bytes allocated.
+    The CPython memory traced differs from the MicroPython heap, use for comparison only.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak - before
+def report(title, rows):
+    """Print a benchmark table. rows is a list of (label, value, unit)."""
+    print(title)
+    for (label, value, unit) in rows:
+        value = '{:d}'.format(value) if isinstance(value, int) else '{:.2f}'.format(value)
+        print('  {:<48} {:>10} {}'.format(label, value, unit))
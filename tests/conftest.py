@@ -0,0 +1,16 @@
+"""
+File:	conftest.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Host tests of the libraries (src/lib) with CPython and pytest.
+The libraries are imported from src/lib with the MicroPython modules replaced by the emulators (emulator).
+:usage
+python -m pytest tests
+"""
+# Imports
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'lib'))
+import emulator
+emulator.install()
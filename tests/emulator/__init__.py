@@ -0,0 +1,28 @@
+"""
+File:	__init__.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Emulators to run the library tests on a host computer with CPython instead of the Pico W.
+install() registers the host modules micropython, machine and framebuf and the MicroPython time functions,
+so the libraries can be imported without hardware.
+The device emulators (hd44780, oled, rc522, bmp280) are attached as device to the I2C or SPI bus:
+i2c = I2C(0, device=HD44780(4, 20))
+:usage
+import emulator
+emulator.install()
+"""
+# Imports
+import sys
+import time
+def install():
+    """Register the host modules and time functions, if not done."""
+    if 'machine' in sys.modules:
+        return
+    from emulator import clock, framebuf, machine, micropython
+    sys.modules['micropython'] = micropython
+    sys.modules['machine'] = machine
+    sys.modules['framebuf'] = framebuf
+    for name in ('sleep_us', 'sleep_ms', 'ticks_ms', 'ticks_us', 'ticks_add', 'ticks_diff'):
+        setattr(time, name, getattr(clock, name))
+    sys.modules['utime'] = time
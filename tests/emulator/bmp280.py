@@ -0,0 +1,51 @@
+"""
+File:	bmp280.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+BMP280 pressure sensor emulator.
+"""
+# Imports
+import struct
+from emulator import clock
+class BMP280:
+    """
+    BMP280 pressure sensor, to attach as device to the I2C bus (emulator.machine.I2C).
+    The calibration coefficients and raw values are the example of the datasheet (25.08 °C, 100653 Pa).
+    A forced mode conversion runs (status measuring) for the typical conversion time of the oversampling,
+    the time passes with the time slept (clock.slept_us). The sensor returns to sleep mode when the conversion is done.
+    """
+    CALIBRATION = (27504, 26435, -1000, 36477, -10685, 3024, 2855, 140, -7, 15500, -14600, 6000)
+    def __init__(self, adc_t=519888, adc_p=415148):
+        self.regs = bytearray(256)
+        self.regs[0xD0] = 0x58
+        self.regs[0x88:0xA0] = struct.pack('<HhhHhhhhhhhh', *BMP280.CALIBRATION)
+        self.adc_t = adc_t
+        self.adc_p = adc_p
+        self._pointer = 0
+        self._done = 0
+        # Number of conversions (statistics)
+        self.conversions = 0
+    def write(self, data):
+        self._pointer = data[0]
+        for byte in data[1:]:
+            self.regs[self._pointer] = byte
+            if self._pointer == 0xF4 and byte & 0x03 == 0x01:
+                self._convert(byte)
+            self._pointer += 1
+    def _convert(self, ctrl):
+        t = (1 << (ctrl >> 5)) >> 1
+        p = (1 << ((ctrl >> 2) & 0x07)) >> 1
+        self._done = clock.slept_us + 1000 + 2000 * t + (2000 * p + 500 if p else 0)
+        self.conversions += 1
+        self.regs[0xF7:0xFA] = (self.adc_p << 4).to_bytes(3, 'big')
+        self.regs[0xFA:0xFD] = (self.adc_t << 4).to_bytes(3, 'big')
+    def read(self, nbytes):
+        if clock.slept_us < self._done:
+            self.regs[0xF3] = 0x08
+        else:
+            self.regs[0xF3] = 0x00
+            self.regs[0xF4] &= 0xFC
+        data = bytes(self.regs[self._pointer:self._pointer + nbytes])
+        self._pointer += nbytes
+        return data
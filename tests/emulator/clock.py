@@ -0,0 +1,25 @@
+"""
+File:	clock.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+MicroPython time functions for the host.
+The sleep functions do not sleep but add the time to the counter slept_us, the ticks are the host monotonic clock.
+"""
+# Imports
+import time
+# Time in us the library code would have slept
+slept_us = 0
+def sleep_us(us):
+    global slept_us
+    slept_us += us
+def sleep_ms(ms):
+    sleep_us(ms * 1000)
+def ticks_ms():
+    return time.monotonic_ns() // 1000000
+def ticks_us():
+    return time.monotonic_ns() // 1000
+def ticks_add(ticks, delta):
+    return ticks + delta
+def ticks_diff(ticks1, ticks2):
+    return ticks1 - ticks2
@@ -0,0 +1,104 @@
+"""
+File:	framebuf.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Module framebuf for the host.
+"""
+# FrameBuffer formats
+MONO_VLSB = 0
+MONO_HLSB = 3
+MONO_HMSB = 4
+class FrameBuffer:
+    """
+    FrameBuffer for the formats MONO_VLSB, MONO_HLSB and MONO_HMSB drawing pixel by pixel.
+    The text font is a fixed 8x8 pattern per character, not the MicroPython font.
+    """
+    def __init__(self, buffer, width, height, format, stride=None):
+        self._buffer = buffer
+        self._width = width
+        self._height = height
+        self._format = format
+        self._stride = width if stride is None else stride
+        if format != MONO_VLSB:
+            self._stride = (self._stride + 7) & ~7
+    def _index(self, x, y):
+        if self._format == MONO_VLSB:
+            return (y >> 3) * self._stride + x, 1 << (y & 7)
+        if self._format == MONO_HLSB:
+            return (y * self._stride + x) >> 3, 0x80 >> (x & 7)
+        return (y * self._stride + x) >> 3, 1 << (x & 7)
+    def _get(self, x, y):
+        if 0 <= x < self._width and 0 <= y < self._height:
+            i, mask = self._index(x, y)
+            return 1 if self._buffer[i] & mask else 0
+        return 0
+    def _set(self, x, y, color):
+        if 0 <= x < self._width and 0 <= y < self._height:
+            i, mask = self._index(x, y)
+            if color:
+                self._buffer[i] |= mask
+            else:
+                self._buffer[i] &= ~mask & 0xFF
+    def pixel(self, x, y, color=None):
+        if color is None:
+            return self._get(x, y)
+        self._set(x, y, color)
+    def fill(self, color):
+        value = 0xFF if color else 0x00
+        for i in range(len(self._buffer)):
+            self._buffer[i] = value
+    def fill_rect(self, x, y, w, h, color):
+        for j in range(max(0, y), min(self._height, y + h)):
+            for i in range(max(0, x), min(self._width, x + w)):
+                self._set(i, j, color)
+    def hline(self, x, y, w, color):
+        self.fill_rect(x, y, w, 1, color)
+    def vline(self, x, y, h, color):
+        self.fill_rect(x, y, 1, h, color)
+    def rect(self, x, y, w, h, color, f=False):
+        if f:
+            FrameBuffer.fill_rect(self, x, y, w, h, color)
+            return
+        FrameBuffer.fill_rect(self, x, y, w, 1, color)
+        FrameBuffer.fill_rect(self, x, y + h - 1, w, 1, color)
+        FrameBuffer.fill_rect(self, x, y, 1, h, color)
+        FrameBuffer.fill_rect(self, x + w - 1, y, 1, h, color)
+    def line(self, x0, y0, x1, y1, color):
+        dx = abs(x1 - x0)
+        dy = -abs(y1 - y0)
+        sx = 1 if x0 < x1 else -1
+        sy = 1 if y0 < y1 else -1
+        err = dx + dy
+        while True:
+            self._set(x0, y0, color)
+            if x0 == x1 and y0 == y1:
+                break
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x0 += sx
+            if e2 <= dx:
+                err += dx
+                y0 += sy
+    def text(self, text, x, y, color=1):
+        for char in text:
+            o = ord(char)
+            for i in range(8):
+                bits = 0 if o == 32 else (o * 0x9D + i * 0x3B) & 0xFF
+                for j in range(8):
+                    if bits >> j & 1:
+                        self._set(x + i, y + j, color)
+            x += 8
+    def blit(self, fbuf, x, y, key=-1, palette=None):
+        for j in range(fbuf._height):
+            for i in range(fbuf._width):
+                color = fbuf._get(i, j)
+                if color != key:
+                    self._set(x + i, y + j, color)
+    def scroll(self, xstep, ystep):
+        pixels = [[self._get(i - xstep, j - ystep) for i in range(self._width)] for j in range(self._height)]
+        for j in range(self._height):
+            for i in range(self._width):
+                if 0 <= i - xstep < self._width and 0 <= j - ystep < self._height:
+                    self._set(i, j, pixels[j][i])
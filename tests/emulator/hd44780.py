@@ -0,0 +1,67 @@
+"""
+File:	hd44780.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+HD44780 LCD emulator.
+"""
+class HD44780:
+    """
+    HD44780 LCD with PCF8574 I2C backpack, to attach as device to the I2C bus (emulator.machine.I2C).
+    The nibbles are latched on the falling edge of E, the first 4 nibbles are the 8-bit init sequence.
+    The screen content is available with rows().
+    """
+    def __init__(self, num_lines=4, num_columns=20):
+        self.num_lines = num_lines
+        self.num_columns = num_columns
+        self.ddram = bytearray(b' ' * 128)
+        self.cgram = bytearray(64)
+        self.addr = 0
+        self.cgram_mode = False
+        self._previous = 0
+        self._nibbles = 0
+        self._high = 0
+        # Number of commands and characters written
+        self.commands = 0
+        self.characters = 0
+    def write(self, data):
+        for byte in data:
+            # Latch on the falling edge of E
+            if self._previous & 0x04 and not byte & 0x04:
+                self._latch(self._previous >> 4, self._previous & 0x01)
+            self._previous = byte
+    def _latch(self, nibble, rs):
+        self._nibbles += 1
+        if self._nibbles <= 4:
+            return
+        if self._nibbles % 2 == 1:
+            self._high = nibble
+            return
+        value = (self._high << 4) | nibble
+        if rs:
+            self.characters += 1
+            if self.cgram_mode:
+                self.cgram[self.addr & 0x3f] = value
+            else:
+                self.ddram[self.addr & 0x7f] = value
+            self.addr += 1
+            return
+        self.commands += 1
+        if value & 0x80:
+            self.addr = value & 0x7f
+            self.cgram_mode = False
+        elif value & 0x40:
+            self.addr = value & 0x3f
+            self.cgram_mode = True
+        elif value == 0x01:
+            self.ddram[:] = b' ' * 128
+            self.addr = 0
+        elif value == 0x02:
+            self.addr = 0
+    def rows(self):
+        """Get the screen content as list of strings."""
+        rows = []
+        for y in range(self.num_lines):
+            addr = (0x40 if y & 1 else 0) + (self.num_columns if y & 2 else 0)
+            rows.append(bytes(self.ddram[addr:addr + self.num_columns]).decode('latin-1'))
+        return rows
@@ -0,0 +1,161 @@
+"""
+File:	machine.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Module machine for the host, the buses and pins do not drive hardware.
+The I2C and SPI buses count the transactions and bytes transferred, a device emulator can be attached.
+The Timer does not run, the tests call the callback or tick function directly.
+"""
+# Imports
+from emulator import clock
+class Bus:
+    """Counter for bus transactions and bytes transferred."""
+    def __init__(self, *args, **kwargs):
+        self.reset()
+    def init(self, *args, **kwargs):
+        pass
+    def reset(self):
+        """Reset the counters."""
+        self.transactions = 0
+        self.bytes = 0
+    def count(self, n):
+        self.transactions += 1
+        self.bytes += n
+class I2C(Bus):
+    """I2C bus counting the transactions. Reads return zeros unless a device is attached."""
+    def __init__(self, *args, device=None, **kwargs):
+        super().__init__()
+        self.device = device
+    def writeto(self, addr, buf, stop=True):
+        self.count(len(buf))
+        if self.device is not None:
+            self.device.write(bytes(buf))
+        return 1
+    def writevto(self, addr, vector, stop=True):
+        n = 0
+        for buf in vector:
+            n += len(buf)
+        self.count(n)
+        if self.device is not None:
+            self.device.write(b''.join(bytes(buf) for buf in vector))
+        return 1
+    def readfrom_into(self, addr, buf, stop=True):
+        self.count(len(buf))
+        if self.device is not None:
+            buf[:] = self.device.read(len(buf))
+    def readfrom(self, addr, nbytes, stop=True):
+        buf = bytearray(nbytes)
+        self.readfrom_into(addr, buf, stop)
+        return bytes(buf)
+    def writeto_mem(self, addr, memaddr, buf, addrsize=8):
+        self.writeto(addr, bytes([memaddr]) + bytes(buf))
+    def readfrom_mem_into(self, addr, memaddr, buf, addrsize=8):
+        self.writeto(addr, bytes([memaddr]))
+        self.readfrom_into(addr, buf)
+    def readfrom_mem(self, addr, memaddr, nbytes, addrsize=8):
+        buf = bytearray(nbytes)
+        self.readfrom_mem_into(addr, memaddr, buf, addrsize)
+        return bytes(buf)
+    def scan(self):
+        return []
+class SPI(Bus):
+    """SPI bus counting the transactions. Reads return zeros unless a device is attached."""
+    MASTER = 0
+    MSB = 0
+    def __init__(self, *args, device=None, **kwargs):
+        super().__init__()
+        self.device = device
+    def _transfer(self, tx):
+        self.count(len(tx))
+        if self.device is not None:
+            return self.device.transfer(bytes(tx))
+        return bytes(len(tx))
+    def write(self, buf):
+        self._transfer(buf)
+    def read(self, nbytes, write=0x00):
+        return self._transfer(bytes([write]) * nbytes)
+    def readinto(self, buf, write=0x00):
+        buf[:] = self._transfer(bytes([write]) * len(buf))
+    def write_readinto(self, write_buf, read_buf):
+        read_buf[:] = self._transfer(write_buf)
+class Pin:
+    """GPIO pin holding its value. An IRQ handler can be triggered with trigger()."""
+    IN = 0
+    OUT = 1
+    OPEN_DRAIN = 2
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+    def __init__(self, id=None, mode=-1, pull=-1, value=None):
+        self.id = id
+        self._value = 0 if value is None else value
+        self._handler = None
+    def init(self, mode=-1, pull=-1, value=None):
+        if value is not None:
+            self._value = value
+    def value(self, value=None):
+        if value is None:
+            return self._value
+        self._value = 1 if value else 0
+    def __call__(self, value=None):
+        return self.value(value)
+    def on(self):
+        self._value = 1
+    def off(self):
+        self._value = 0
+    def toggle(self):
+        self._value ^= 1
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, hard=False):
+        self._handler = handler
+    def trigger(self, value=None):
+        """Set the value and call the IRQ handler (emulator only)."""
+        if value is not None:
+            self._value = value
+        if self._handler is not None:
+            self._handler(self)
+class Timer:
+    """Timer which does not run. The tests call the callback or tick function directly."""
+    PERIODIC = 1
+    ONE_SHOT = 0
+    def __init__(self, *args, **kwargs):
+        self.callback = None
+        if kwargs:
+            self.init(**kwargs)
+    def init(self, mode=PERIODIC, period=-1, freq=-1, callback=None, **kwargs):
+        self.callback = callback
+    def deinit(self):
+        self.callback = None
+class PWM:
+    """PWM channel holding the duty."""
+    def __init__(self, pin, freq=0, duty_u16=0, duty_ns=0):
+        self._freq = freq
+        self._duty_u16 = duty_u16
+        self._duty_ns = duty_ns
+    def freq(self, value=None):
+        if value is None:
+            return self._freq
+        self._freq = value
+    def duty_u16(self, value=None):
+        if value is None:
+            return self._duty_u16
+        self._duty_u16 = value
+    def duty_ns(self, value=None):
+        if value is None:
+            return self._duty_ns
+        self._duty_ns = value
+    def deinit(self):
+        pass
+class ADC:
+    """ADC returning a fixed value, set with the attribute value."""
+    def __init__(self, pin):
+        self.value = 0
+    def read_u16(self):
+        return self.value
+def lightsleep(ms):
+    clock.sleep_ms(ms)
+def idle():
+    pass
+def freq(*args):
+    return 125000000
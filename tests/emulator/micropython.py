@@ -0,0 +1,15 @@
+"""
+File:	micropython.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Module micropython for the host, schedule calls the function at once.
+"""
+def const(value):
+    return value
+def native(f):
+    return f
+def viper(f):
+    return f
+def schedule(func, arg):
+    func(arg)
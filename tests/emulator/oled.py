@@ -0,0 +1,75 @@
+"""
+File:	oled.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+SSD1306 & SH1106 OLED controller emulator.
+"""
+class OLED:
+    """
+    SSD1306 or SH1106 OLED controller, to attach as device to the I2C bus (emulator.machine.I2C).
+    Commands are sent with control byte 0x80 and data with control byte 0x40.
+    Supports the horizontal addressing mode with column & page window (SSD1306)
+    and the page addressing mode (SH1106, RAM width 132). The display RAM is in ram.
+    """
+    # Commands followed by arguments
+    ARGS = {0x20: 1, 0x21: 2, 0x22: 2, 0x81: 1, 0x8D: 1, 0xA8: 1, 0xD3: 1, 0xD5: 1, 0xD9: 1, 0xDA: 1, 0xDB: 1}
+    def __init__(self, width=128, pages=8):
+        self.width = width
+        self.pages = pages
+        self.ram = bytearray(width * pages)
+        self.horizontal = False
+        self.col = 0
+        self.page = 0
+        self.window = [0, width - 1, 0, pages - 1]
+        self._cmd = None
+        self._args = []
+        # Number of commands and data bytes written
+        self.commands = 0
+        self.data = 0
+    def write(self, data):
+        if data[0] == 0x80:
+            for i in range(1, len(data), 2):
+                self._command(data[i])
+        elif data[0] == 0x00:
+            for byte in data[1:]:
+                self._command(byte)
+        elif data[0] == 0x40:
+            for byte in data[1:]:
+                self._data(byte)
+    def _command(self, cmd):
+        self.commands += 1
+        if self._cmd is not None:
+            self._args.append(cmd)
+            if len(self._args) == self.ARGS[self._cmd]:
+                self._execute(self._cmd, self._args)
+                self._cmd = None
+            return
+        if cmd in self.ARGS:
+            self._cmd = cmd
+            self._args = []
+        elif 0xB0 <= cmd <= 0xB7:
+            self.page = cmd & 0x07
+        elif cmd <= 0x0F:
+            self.col = (self.col & 0xF0) | cmd
+        elif cmd <= 0x1F:
+            self.col = (self.col & 0x0F) | ((cmd & 0x0F) << 4)
+    def _execute(self, cmd, args):
+        if cmd == 0x20:
+            self.horizontal = args[0] == 0
+        elif cmd == 0x21:
+            self.window[0:2] = args
+            self.col = args[0]
+        elif cmd == 0x22:
+            self.window[2:4] = args
+            self.page = args[0]
+    def _data(self, byte):
+        self.data += 1
+        if self.col < self.width and self.page < self.pages:
+            self.ram[self.page * self.width + self.col] = byte
+        self.col += 1
+        if self.horizontal and self.col > self.window[1]:
+            self.col = self.window[0]
+            self.page += 1
+            if self.page > self.window[3]:
+                self.page = self.window[2]
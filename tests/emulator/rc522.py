@@ -0,0 +1,257 @@
+"""
+File:	rc522.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+MFRC522 RFID reader emulator with ISO 14443-A cards.
+"""
+# Imports
+from emulator import clock
+from emulator.machine import Pin
+class ChipSelect(Pin):
+    """Chip select pin ending the SPI frame of a device on the rising edge."""
+    def __init__(self, device):
+        super().__init__(value=1)
+        self.device = device
+    def value(self, value=None):
+        if value is not None and value and not self._value:
+            self.device.deselect()
+        return super().value(value)
+class IrqPin(Pin):
+    """IRQ output pin of a device, reading the value updates the device timer."""
+    def __init__(self, device):
+        super().__init__(value=1)
+        self.device = device
+    def value(self, value=None):
+        if value is None:
+            self.device._timer()
+        return super().value(value)
+def crc_a(data):
+    """ISO 14443-3 CRC_A of the data, the low byte is sent first."""
+    crc = 0x6363
+    for byte in data:
+        byte ^= crc & 0xFF
+        byte = (byte ^ (byte << 4)) & 0xFF
+        crc = (crc >> 8) ^ (byte << 8) ^ (byte << 3) ^ (byte >> 4)
+    return crc & 0xFFFF
+class Card:
+    """ISO 14443-A card with 4-byte (MIFARE Classic), 7-byte (NTAG) or 10-byte UID and 64 blocks of 16 bytes."""
+    IDLE = 0
+    READY = 1
+    ACTIVE = 2
+    HALT = 3
+    def __init__(self, uid):
+        self.uid = bytes(uid)
+        self.state = Card.IDLE
+        self.level = 0
+        self.blocks = [bytearray(16) for i in range(64)]
+    def levels(self):
+        """Get the number of cascade levels 1, 2 or 3."""
+        return len(self.uid) // 3
+    def cascade(self, level):
+        """Get the 4 UID bytes of a cascade level, 0x88 is the cascade tag if the UID is not complete."""
+        if level < self.levels() - 1:
+            return bytes([0x88]) + self.uid[3 * level:3 * level + 3]
+        return self.uid[3 * level:3 * level + 4]
+class RC522:
+    """
+    MFRC522 RFID reader with cards in the field, to attach as device to the SPI bus (emulator.machine.SPI).
+    The register file, FIFO and the commands Transceive, MFAuthent, CalcCRC and SoftReset are emulated.
+    The SPI frame ends when the chip select pin cs is set high, a write frame is a burst to one register.
+    The cards answer instantly, without a card in the field the reader timer IRQ is set after the timer period (15ms).
+    Several cards answering the anticollision set the collision error and position (CollReg) of the first differing bit.
+    Switching the antenna off resets the cards to the IDLE state.
+    The IRQ output pin irq is set by the enabled IRQ bits (ComIEnReg), the handler is called on the falling edge.
+    """
+    def __init__(self):
+        self.cs = ChipSelect(self)
+        self.irq = IrqPin(self)
+        self._timeout = None
+        self.cards = []
+        self.regs = bytearray(64)
+        self.regs[0x02] = 0x80
+        self.fifo = []
+        self._coll = 0
+        self._write_reg = None
+        self._first = True
+        self._out = 0
+        # Number of frames transceived (statistics)
+        self.frames = 0
+    def deselect(self):
+        self._write_reg = None
+        self._first = True
+        self._out = 0
+    def transfer(self, tx):
+        rx = bytearray(len(tx))
+        for i in range(len(tx)):
+            byte = tx[i]
+            rx[i] = self._out
+            self._out = 0
+            if self._write_reg is not None:
+                self._write(self._write_reg, byte)
+            elif byte & 0x80:
+                self._out = self._read((byte >> 1) & 0x3F)
+            elif self._first:
+                self._write_reg = (byte >> 1) & 0x3F
+            self._first = False
+        return bytes(rx)
+    def _timer(self):
+        # Set the timer IRQ if the timer period of the last transceive without answer passed
+        if self._timeout is not None and clock.ticks_us() >= self._timeout:
+            self._timeout = None
+            self.regs[0x04] |= 0x01
+            self._update_irq()
+    def _read(self, reg):
+        self._timer()
+        if reg == 0x09:
+            return self.fifo.pop(0) if self.fifo else 0
+        if reg == 0x0A:
+            return len(self.fifo)
+        return self.regs[reg]
+    def _write(self, reg, value):
+        if reg == 0x01:
+            self.regs[reg] = value
+            self._command(value & 0x0F)
+        elif reg == 0x04 or reg == 0x05:
+            # Set1 bit: set or clear the marked IRQ bits
+            if value & 0x80:
+                self.regs[reg] |= value & 0x7F
+            else:
+                self.regs[reg] &= ~value & 0x7F
+        elif reg == 0x09:
+            if len(self.fifo) < 64:
+                self.fifo.append(value)
+        elif reg == 0x0A:
+            if value & 0x80:
+                self.fifo = []
+        elif reg == 0x0D:
+            self.regs[reg] = value & 0x7F
+            if value & 0x80 and self.regs[0x01] & 0x0F == 0x0C:
+                self._transceive()
+        else:
+            self.regs[reg] = value
+            if reg == 0x14 and not value & 0x03:
+                for card in self.cards:
+                    card.state = Card.IDLE
+        self._update_irq()
+    def _update_irq(self):
+        # IRQ output active low with IRqInv set
+        active = self.regs[0x04] & self.regs[0x02] & 0x7F
+        level = 1 if bool(active) != bool(self.regs[0x02] & 0x80) else 0
+        if level == 0 and self.irq._value == 1:
+            self.irq.trigger(0)
+        else:
+            self.irq.value(level)
+    def _command(self, cmd):
+        self._timeout = None
+        if cmd == 0x0F:
+            self.regs = bytearray(64)
+            self.regs[0x02] = 0x80
+            self.fifo = []
+        elif cmd == 0x03:
+            crc = crc_a(self.fifo)
+            self.fifo = []
+            self.regs[0x22] = crc & 0xFF
+            self.regs[0x21] = crc >> 8
+            self.regs[0x05] |= 0x04
+            self.regs[0x01] = 0x00
+        elif cmd == 0x0E:
+            self.fifo = []
+            if self._active() is not None:
+                self.regs[0x08] |= 0x08
+            self.regs[0x04] |= 0x10
+            self.regs[0x01] = 0x00
+    def _active(self):
+        for card in self.cards:
+            if card.state == Card.ACTIVE:
+                return card
+        return None
+    def _transceive(self):
+        frame = bytes(self.fifo)
+        self.fifo = []
+        self.frames += 1
+        self._coll = 0
+        response = None
+        if self.regs[0x14] & 0x03:
+            response = self._respond(frame, self.regs[0x0D] & 0x07)
+        if response is None:
+            # No answer: timer IRQ after the timer period, prescaler & reload as set by init
+            prescaler = (self.regs[0x2A] & 0x0F) << 8 | self.regs[0x2B]
+            reload = self.regs[0x2C] << 8 | self.regs[0x2D]
+            self._timeout = clock.ticks_us() + (2 * prescaler + 1) * (reload + 1) * 1000000 // 13560000
+            return
+        data, lastbits = response
+        self.fifo = list(data)
+        self.regs[0x0C] = (self.regs[0x0C] & 0xF8) | lastbits
+        self.regs[0x06] = 0x08 if self._coll else 0x00
+        self.regs[0x0E] = (self.regs[0x0E] & 0x80) | (self._coll & 0x1F)
+        self.regs[0x04] |= 0x20
+    def _respond(self, frame, txlastbits):
+        if len(frame) == 1 and txlastbits == 7:
+            # REQA wakes idle cards, WUPA idle and halted cards, answer ATQA
+            woken = (Card.IDLE,) if frame[0] == 0x26 else (Card.IDLE, Card.HALT)
+            answer = None
+            for card in self.cards:
+                if card.state in woken:
+                    card.state = Card.READY
+                    card.level = 0
+                    answer = (bytes([(card.levels() - 1) << 6 | 0x04, 0x00]), 0)
+            return answer
+        if len(frame) >= 2 and frame[0] in (0x93, 0x95, 0x97) and frame[1] < 0x70:
+            # Anticollision: the cards matching the known bits answer the UID bits of the cascade level and BCC
+            known = (len(frame) - 2) * 8 if txlastbits == 0 else (len(frame) - 3) * 8 + txlastbits
+            answers = []
+            for card in self.cards:
+                if card.state == Card.READY and frame[0] == 0x93 + 2 * card.level:
+                    uid = card.cascade(card.level)
+                    uid = uid + bytes([uid[0] ^ uid[1] ^ uid[2] ^ uid[3]])
+                    if all((uid[b // 8] >> (b % 8)) & 1 == (frame[2 + b // 8] >> (b % 8)) & 1 for b in range(known)):
+                        answers.append(uid)
+            if not answers:
+                return None
+            data = bytearray(answers[0][known // 8:])
+            data[0] &= (0xFF << (known % 8)) & 0xFF
+            for b in range(known, 40):
+                if len(set((uid[b // 8] >> (b % 8)) & 1 for uid in answers)) > 1:
+                    # Collision at bit position b + 1, the bits received after the collision are cleared
+                    self._coll = b + 1
+                    for c in range(b, 40):
+                        data[c // 8 - known // 8] &= ~(1 << (c % 8)) & 0xFF
+                    break
+            return (bytes(data), 0)
+        if len(frame) == 9 and frame[0] in (0x93, 0x95, 0x97) and frame[1] == 0x70:
+            # Select: answer SAK with the cascade bit if the UID is not complete, the other ready cards return to IDLE
+            answer = None
+            for card in self.cards:
+                if card.state != Card.READY:
+                    continue
+                if frame[0] != 0x93 + 2 * card.level or frame[2:6] != card.cascade(card.level):
+                    card.state = Card.IDLE
+                    continue
+                if card.level < card.levels() - 1:
+                    card.level += 1
+                    sak = 0x04
+                else:
+                    card.state = Card.ACTIVE
+                    sak = 0x08 if len(card.uid) == 4 else 0x00
+                crc = crc_a([sak])
+                answer = (bytes([sak, crc & 0xFF, crc >> 8]), 0)
+            return answer
+        card = self._active()
+        if card is None:
+            return None
+        if len(frame) == 4 and frame[0] == 0x50:
+            # Halt: no answer
+            card.state = Card.HALT
+            return None
+        if len(frame) == 4 and frame[0] == 0x30:
+            data = bytes(card.blocks[frame[1] & 0x3F])
+            crc = crc_a(data)
+            return (data + bytes([crc & 0xFF, crc >> 8]), 0)
+        if len(frame) == 4 and frame[0] == 0xA0:
+            self._block = frame[1] & 0x3F
+            return (b'\x0A', 4)
+        if len(frame) == 18:
+            card.blocks[self._block][:] = frame[0:16]
+            return (b'\x0A', 4)
+        return None
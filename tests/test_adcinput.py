@@ -0,0 +1,68 @@
+"""
+File:	test_adcinput.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Tests of the oversampled ADC input (adcinput.py) with an emulated ADC:
+boxcar of the burst, EMA convergence, clamping to in_min - in_max and the hysteresis of the level change events.
+"""
+# Imports
+import pytest
+from machine import ADC
+from adcinput import AdcInput
+class NoisyADC:
+    """ADC returning the values in turn."""
+    def __init__(self, *values):
+        self.values = values
+        self.i = 0
+    def read_u16(self):
+        value = self.values[self.i % len(self.values)]
+        self.i += 1
+        return value
+def test_boxcar_of_burst():
+    adc = NoisyADC(20000 - 300, 20000 + 300)
+    pot = AdcInput(adc, burst=8, ema_shift=0)
+    pot.tick()
+    assert adc.i == 8 and pot.value == 20000
+def test_ema_converges():
+    adc = ADC(0)
+    pot = AdcInput(adc, ema_shift=2, hysteresis=0)
+    pot.tick()
+    assert pot.value == 0
+    adc.value = 40000
+    values = []
+    for i in range(60):
+        pot.tick()
+        values.append(pot.value)
+    # The weight of a new burst is 1/4, the filtered value rises monotonic to the input
+    assert values[0] == 10000 and values[1] == 17500
+    assert values == sorted(values)
+    assert values[-1] == 40000
+    assert pot.level == 61
+def test_hysteresis():
+    adc = ADC(0)
+    levels = []
+    pot = AdcInput(adc, ema_shift=0, steps=100, hysteresis=128, callback=levels.append)
+    adc.value = 32768
+    assert pot.tick()
+    assert levels == [50]
+    # The centre of level 50 is 32767.5, the threshold is half a step (327.7) plus the hysteresis
+    for value in (32767 + 455, 32768 - 455, 32767 + 400, 32768):
+        adc.value = value
+        assert not pot.tick()
+    adc.value = 32767 + 457
+    assert pot.tick()
+    assert levels == [50, 51]
+    # Back within the threshold of level 51: no event
+    adc.value = 32767 + 455
+    assert not pot.tick()
+    assert pot.events == 2
+def test_clamp_to_input_range():
+    adc = ADC(0)
+    levels = []
+    pot = AdcInput(adc, ema_shift=0, steps=100, in_min=1000, in_max=64535, callback=levels.append)
+    for value in (0, 1000, 64535, 65535, 500):
+        adc.value = value
+        pot.tick()
+    assert levels == [0, 100, 0]
+    assert pot.value == 500
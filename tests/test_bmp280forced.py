@@ -0,0 +1,53 @@
+"""
+File:	test_bmp280forced.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Tests of the BMP280 forced mode driver (bmp280forced.py) with the sensor emulator (datasheet calibration example).
+"""
+# Imports
+import pytest
+from machine import I2C
+from bmp280forced import BMP280Forced, conversion_time, WEATHER, INDOOR, OSRS_X1, OSRS_SKIP
+from emulator import clock
+from emulator.bmp280 import BMP280
+@pytest.fixture
+def device():
+    return BMP280()
+@pytest.fixture
+def i2c(device):
+    return I2C(0, device=device)
+def test_compensation_datasheet_example(i2c):
+    # Datasheet: 25.08 °C, 100656 Pa with the 32-bit integer formulas (100653.27 Pa floating point)
+    bmp = BMP280Forced(i2c)
+    assert bmp.measure() == (25.08, 100656)
+@pytest.mark.parametrize('setting', [WEATHER, INDOOR])
+def test_measure_forced_single_shot(i2c, device, setting):
+    bmp = BMP280Forced(i2c)
+    bmp.configure(*setting)
+    i2c.reset()
+    slept_us = clock.slept_us
+    bmp.measure()
+    # Trigger, status & data burst, the typical conversion time slept, the sensor back to sleep mode
+    assert i2c.transactions == 5
+    assert clock.slept_us - slept_us == conversion_time(*setting[:2])
+    assert device.conversions == 1 and device.regs[0xF4] & 0x03 == 0
+    assert device.regs[0xF5] == setting[2] << 2
+def test_sample_coroutine(i2c):
+    bmp = BMP280Forced(i2c)
+    sample = bmp.sample()
+    assert next(sample) == -(-conversion_time(OSRS_X1, OSRS_X1) // 1000)
+    clock.sleep_ms(10)
+    with pytest.raises(StopIteration) as stop:
+        next(sample)
+    assert stop.value.value == (25.08, 100656)
+def test_pressure_skipped(i2c):
+    bmp = BMP280Forced(i2c, osrs_p=OSRS_SKIP)
+    assert bmp.measure() == (25.08, None)
+def test_conversion_time():
+    assert conversion_time(*WEATHER[:2]) == 5500
+    assert conversion_time(*WEATHER[:2], False) == 6425
+def test_not_found(device, i2c):
+    device.regs[0xD0] = 0x60
+    with pytest.raises(OSError):
+        BMP280Forced(i2c)
@@ -0,0 +1,61 @@
+"""
+File:	test_dhtsampler.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Tests of the DHT22 sampler (dhtsampler.py): retries with backoff, min interval, cached reading & age, counters.
+"""
+# Imports
+import pytest
+import dhtsampler
+from dhtsampler import DhtSampler
+class Sensor:
+    """DHT22 with a list of results per read: (temperature, humidity), OSError (timeout) or Exception (checksum)."""
+    def __init__(self, results):
+        self.results = list(results)
+        self.reading = None
+    def measure(self):
+        result = self.results.pop(0) if self.results else (21.5, 55.0)
+        if isinstance(result, Exception):
+            raise result
+        self.reading = result
+    def temperature(self):
+        return self.reading[0]
+    def humidity(self):
+        return self.reading[1]
+@pytest.fixture(autouse=True)
+def ticks(monkeypatch):
+    monkeypatch.setattr(dhtsampler, 'ticks_ms', lambda: 0)
+def run(dht, until, step=1000):
+    times = []
+    for t in range(0, until, step):
+        if dht.tick(now=t):
+            times.append(t)
+    return times
+def test_sample_every_period():
+    readings = []
+    dht = DhtSampler(Sensor([]), period=10000, callback=lambda t, h: readings.append((t, h)))
+    assert run(dht, 30000) == [0, 10000, 20000]
+    assert readings == [(21.5, 55.0)] * 3 and dht.reads == 3
+def test_retry_with_backoff():
+    dht = DhtSampler(Sensor([OSError(), Exception('checksum'), (150.0, 50.0)]), period=60000)
+    # Reads at 0, retries after 2s, 4s & 8s
+    assert run(dht, 20000) == [14000]
+    assert (dht.timeouts, dht.checksums, dht.invalid, dht.retried, dht.missed) == (1, 1, 1, 3, 0)
+    assert dht.error_rate() == 0.75
+def test_missed_sample():
+    dht = DhtSampler(Sensor([OSError()] * 3), period=10000, retries=3)
+    # The third retry would be later than the next sample, it is not counted as retry
+    assert run(dht, 11000) == [10000]
+    assert dht.missed == 1 and dht.retried == 2
+    assert dht.report() == 'reads=4, timeouts=3, checksums=0, invalid=0, retries=2, missed=1, error_rate=75.0%'
+def test_cached_reading_age():
+    dht = DhtSampler(Sensor([]), period=10000)
+    assert dht.read(now=0) is None
+    dht.tick(now=0)
+    assert dht.read(now=30000) == (21.5, 55.0) and dht.age(now=30000) == 30000
+    assert dht.read(now=30001) is None
+def test_report():
+    dht = DhtSampler(Sensor([OSError()]), period=10000)
+    run(dht, 3000)
+    assert dht.report() == 'reads=2, timeouts=1, checksums=0, invalid=0, retries=1, missed=0, error_rate=50.0%'
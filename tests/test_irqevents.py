@@ -0,0 +1,93 @@
+"""
+File:	test_irqevents.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Tests of the interrupt event layer (irqevents.py) with pins triggered by the emulator:
+ring buffer overflow, debounce, holdoff coalescing and dispatch from the main loop (schedule=False).
+"""
+# Imports
+import pytest
+from machine import Pin
+import irqevents
+from irqevents import IrqEvents
+@pytest.fixture
+def now(monkeypatch):
+    now = [1000]
+    monkeypatch.setattr(irqevents, 'ticks_ms', lambda: now[0])
+    return now
+def trigger(pin, now, *times):
+    """Trigger the pin interrupt at the times in ms."""
+    for t in times:
+        now[0] = t
+        pin.trigger(1)
+def test_dispatch_scheduled(now):
+    calls = []
+    events = IrqEvents()
+    pin = Pin(13)
+    events.add(pin, lambda ticks, count: calls.append((ticks, count)))
+    # On the host micropython.schedule runs the dispatcher at once
+    trigger(pin, now, 1000)
+    assert calls == [(1000, 1)]
+    assert events.pending() == 0 and events.dispatched == 1
+def test_dispatch_from_main_loop(now):
+    calls = []
+    events = IrqEvents(schedule=False)
+    pin = Pin(13)
+    events.add(pin, lambda ticks, count: calls.append((ticks, count)), debounce=0)
+    trigger(pin, now, 1000, 1100, 1200)
+    assert calls == [] and events.pending() == 3
+    events.dispatch()
+    assert calls == [(1000, 1), (1100, 1), (1200, 1)]
+    assert events.pending() == 0
+def test_ring_buffer_overflow(now):
+    calls = []
+    events = IrqEvents(size=4, schedule=False)
+    pin = Pin(13)
+    events.add(pin, lambda ticks, count: calls.append(ticks), debounce=0)
+    # A ring buffer of 4 holds 3 triggers, the later triggers are dropped
+    trigger(pin, now, 1000, 1001, 1002, 1003, 1004)
+    assert events.pending() == 3 and events.dropped == 2
+    events.dispatch()
+    assert calls == [1000, 1001, 1002]
+    # The ring buffer wraps around
+    trigger(pin, now, 1005, 1006, 1007)
+    events.dispatch()
+    assert calls == [1000, 1001, 1002, 1005, 1006, 1007]
+    assert events.dropped == 2
+def test_debounce(now):
+    calls = []
+    events = IrqEvents(schedule=False)
+    pin = Pin(13)
+    events.add(pin, lambda ticks, count: calls.append((ticks, count)), debounce=50)
+    # Bounces within 50ms of the previous trigger are dropped
+    trigger(pin, now, 1000, 1010, 1030, 1100)
+    events.dispatch()
+    assert calls == [(1000, 1), (1100, 1)]
+    assert events.debounced == 2
+def test_holdoff_coalesces_retriggers(now):
+    calls = []
+    events = IrqEvents(schedule=False)
+    pin = Pin(13)
+    events.add(pin, lambda ticks, count: calls.append((ticks, count)), debounce=50, holdoff=10000)
+    # PIR retriggering whilst motion continues: one callback, the retriggers are counted
+    trigger(pin, now, 1000, 3000, 6000, 9000)
+    events.dispatch()
+    assert calls == [(1000, 1)]
+    assert events.coalesced == 3
+    # After the holdoff the next callback gets the triggers coalesced incl. this one
+    trigger(pin, now, 11000)
+    events.dispatch()
+    assert calls == [(1000, 1), (11000, 4)]
+def test_sources_independent(now):
+    calls = []
+    events = IrqEvents(schedule=False)
+    (pir, button) = (Pin(13), Pin(14))
+    assert events.add(pir, lambda ticks, count: calls.append(('pir', ticks)), holdoff=10000) == 0
+    assert events.add(button, lambda ticks, count: calls.append(('button', ticks))) == 1
+    trigger(pir, now, 1000)
+    trigger(button, now, 1010)
+    trigger(pir, now, 2000)
+    trigger(button, now, 2000)
+    events.dispatch()
+    assert calls == [('pir', 1000), ('button', 1010), ('button', 2000)]
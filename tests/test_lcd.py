@@ -0,0 +1,182 @@
+"""
+File:	test_lcd.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Tests of the HD44780 LCD libraries with the LCD emulator:
+batched I2C transport (machine_i2c_lcd.py) with the I2C transactions against the previous driver, screen buffer diff refresh (lcd_screen.py) and big numbers (lcd_bignumber.py).
+"""
+# Imports
+import pytest
+import lcd_screen
+from machine import I2C
+from time import sleep_ms
+from machine_i2c_lcd import I2cLcd, MASK_RS, MASK_E, SHIFT_BACKLIGHT, SHIFT_DATA
+from lcd_screen import LcdScreen
+from lcd_glyphcache import GlyphCache
+from lcd_bignumber import BigNumber, GLYPHS
+from emulator.hd44780 import HD44780
+@pytest.fixture
+def device():
+    return HD44780(4, 20)
+@pytest.fixture
+def i2c(device):
+    return I2C(0, device=device)
+@pytest.fixture
+def lcd(i2c):
+    return I2cLcd(i2c, 0x27, 4, 20)
+def screen(device):
+    """Get the screen content with the custom characters replaced by the glyph name and the full block by F."""
+    names = {glyph: name for (name, glyph) in GLYPHS.items()}
+    return [''.join(names.get(bytes(device.cgram[ord(c) * 8:ord(c) * 8 + 8]), '?') if ord(c) < 8 else c for c in row)
+            .replace('\xff', 'F') for row in device.rows()]
+def test_putstr_one_writeto_per_line(lcd, i2c, device):
+    i2c.reset()
+    lcd.putstr('Domoticz')
+    assert i2c.transactions == 1
+    assert device.rows()[0] == 'Domoticz'.ljust(20)
+def test_move_to_and_wrap(lcd, device):
+    lcd.move_to(15, 1)
+    lcd.putstr('16:00 next')
+    assert device.rows()[1].endswith('16:00')
+    assert device.rows()[2].startswith(' next')
+class PreviousI2cLcd(I2cLcd):
+    """Previous driver (v20230311): 4 writeto with a new bytearray per byte, cursor move after every character."""
+    def hal_write_command(self, cmd):
+        byte = ((self.backlight << SHIFT_BACKLIGHT) | (((cmd >> 4) & 0x0f) << SHIFT_DATA))
+        self.i2c.writeto(self.i2c_addr, bytearray([byte | MASK_E]))
+        self.i2c.writeto(self.i2c_addr, bytearray([byte]))
+        byte = ((self.backlight << SHIFT_BACKLIGHT) | ((cmd & 0x0f) << SHIFT_DATA))
+        self.i2c.writeto(self.i2c_addr, bytearray([byte | MASK_E]))
+        self.i2c.writeto(self.i2c_addr, bytearray([byte]))
+        if cmd <= 3:
+            sleep_ms(5)
+    def hal_write_data(self, data):
+        byte = (MASK_RS | (self.backlight << SHIFT_BACKLIGHT) | (((data >> 4) & 0x0f) << SHIFT_DATA))
+        self.i2c.writeto(self.i2c_addr, bytearray([byte | MASK_E]))
+        self.i2c.writeto(self.i2c_addr, bytearray([byte]))
+        byte = (MASK_RS | (self.backlight << SHIFT_BACKLIGHT) | ((data & 0x0f) << SHIFT_DATA))
+        self.i2c.writeto(self.i2c_addr, bytearray([byte | MASK_E]))
+        self.i2c.writeto(self.i2c_addr, bytearray([byte]))
+    def putchar(self, char):
+        if char == '\n':
+            if self.implied_newline:
+                self.implied_newline = False
+            else:
+                self.cursor_x = self.num_columns
+        else:
+            self.hal_write_data(ord(char))
+            self.cursor_x += 1
+        if self.cursor_x >= self.num_columns:
+            self.cursor_x = 0
+            self.cursor_y += 1
+            self.implied_newline = (char != '\n')
+        if self.cursor_y >= self.num_lines:
+            self.cursor_y = 0
+        self.move_to(self.cursor_x, self.cursor_y)
+    def putstr(self, string):
+        for char in string:
+            self.putchar(char)
+# Screens of the project lcd2004_motherboard.py: welcome and an update with the Domoticz data
+DATA = {'timestamp': {'text': '16:00', 'col': 15, 'row': 1}, 'memoryusage': {'text': 'M:20', 'col': 14, 'row': 3},
+        'cpuusage': {'text': 'C:0.3', 'col': 6, 'row': 3}, 'internaltemperature': {'text': 'T:41', 'col': 0, 'row': 3}}
+def welcome(lcd):
+    lcd.putstr('Domoticz Motherboard' + '\n' + 'v20230311' + '\n' + '' + '\n' + 'Waiting for data...')
+def update(lcd):
+    lcd.clrrow(2)
+    lcd.clrrow(3)
+    for sensor in DATA:
+        item = DATA[sensor]
+        lcd.clrtext(item['col'], item['row'], len(item['text']))
+        lcd.putstrat(item['col'], item['row'], item['text'])
+def transactions(cls):
+    """Get the I2C transactions of the welcome screen and the update and the screen shown."""
+    device = HD44780(4, 20)
+    i2c = I2C(0, device=device)
+    lcd = cls(i2c, 0x27, 4, 20)
+    counts = []
+    for func in (welcome, update):
+        i2c.reset()
+        func(lcd)
+        counts.append((i2c.transactions, i2c.bytes))
+    return counts, device.rows()
+def test_transactions_against_previous_driver():
+    (previous, previous_rows) = transactions(PreviousI2cLcd)
+    (batched, batched_rows) = transactions(I2cLcd)
+    assert batched_rows == previous_rows
+    assert previous == [(396, 396), (648, 648)]
+    assert batched == [(6, 204), (24, 360)]
+def test_screen_refresh_writes_changed_runs(lcd, i2c, device):
+    scr = LcdScreen(lcd)
+    scr.rows('Domoticz', 'Motherboard', '', 'T:41  C:0.3   M:20')
+    scr.refresh()
+    assert device.rows()[3] == 'T:41  C:0.3   M:20  '
+    i2c.reset()
+    scr.clrrow(3)
+    scr.putstrat(0, 3, 'T:42')
+    scr.putstrat(6, 3, 'C:0.3')
+    scr.putstrat(14, 3, 'M:20')
+    assert scr.refresh() == 1
+    assert i2c.transactions == 2
+    assert device.rows() == ['Domoticz'.ljust(20), 'Motherboard'.ljust(20), ' ' * 20, 'T:42  C:0.3   M:20  ']
+    assert scr.refresh() == 0
+def test_screen_merges_short_gaps(lcd, device):
+    scr = LcdScreen(lcd)
+    scr.putstrat(0, 0, 'a b')
+    assert scr.refresh() == 1
+    scr.putstrat(0, 0, 'x')
+    scr.putstrat(10, 0, 'y')
+    assert scr.refresh() == 2
+    assert device.rows()[0] == 'x b       y'.ljust(20)
+def test_screen_invalidate(lcd, device):
+    scr = LcdScreen(lcd)
+    scr.putstrat(0, 0, 'Domoticz')
+    scr.refresh()
+    lcd.clear()
+    scr.invalidate()
+    scr.refresh()
+    assert device.rows()[0] == 'Domoticz'.ljust(20)
+def test_screen_invalidate_custom_char_0(lcd, device):
+    # CGRAM slot 0 is character code 0, used by the glyph cache
+    scr = LcdScreen(lcd)
+    scr.putstrat(0, 1, chr(0) * 20)
+    scr.refresh()
+    lcd.clear()
+    scr.invalidate()
+    assert scr.refresh() == 4
+    assert device.rows()[1] == chr(0) * 20
+    assert scr.refresh() == 0
+def test_screen_poll_batches_changes(lcd, i2c, monkeypatch):
+    now = [0]
+    monkeypatch.setattr(lcd_screen, 'ticks_ms', lambda: now[0])
+    scr = LcdScreen(lcd, interval=50)
+    assert scr.poll() == 0
+    scr.clrrow(3)
+    now[0] = 30
+    scr.putstrat(0, 3, 'T:42')
+    assert scr.poll() == 0
+    now[0] = 50
+    scr.putstrat(6, 3, 'C:0.3')
+    i2c.reset()
+    assert scr.poll() == 1
+    assert i2c.transactions == 2
+    assert scr.poll() == 0
+def test_bignumber(lcd, device):
+    cache = GlyphCache(lcd)
+    bignumber = BigNumber(cache, col=0, row=1)
+    bignumber.show('21.5*C')
+    rows = screen(device)
+    assert rows[1].startswith('MMF TF   FMM \xdfFTT')
+    assert rows[2].startswith('FBB BFB .BBF  FBB')
+    assert cache.uploads == 3
+def test_bignumber_writes_changed_characters(lcd, i2c, device):
+    cache = GlyphCache(lcd)
+    bignumber = BigNumber(cache, col=0, row=1)
+    bignumber.show('21.5*C')
+    i2c.reset()
+    bignumber.show('21.6*C')
+    assert screen(device)[1].startswith('MMF TF   FMM')
+    assert screen(device)[2].startswith('FBB BFB .FBF')
+    assert cache.uploads == 3
+    # Upper & lower row of the changed digit, one writeto per run
+    assert i2c.transactions <= 4
@@ -0,0 +1,106 @@
+"""
+File:	test_lowpower.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Tests of the low-power scheduler (lowpower.py) with an emulated clock advanced by the park functions:
+deadlines, wakeups, wake() and the estimated current.
+"""
+# Imports
+import pytest
+import lowpower
+from lowpower import Scheduler, POLL_SLICE
+class Clock:
+    """Clock in us, sleep_ms and lightsleep advance by the time requested."""
+    def __init__(self):
+        self.us = 0
+        self.sleeps = []
+        # Function called once after the next sleep_ms, i.e. an interrupt calling wake()
+        self.interrupt = None
+    def ticks_ms(self):
+        return self.us // 1000
+    def ticks_us(self):
+        return self.us
+    def sleep_ms(self, ms):
+        self.us += ms * 1000
+        if self.interrupt is not None:
+            self.interrupt()
+            self.interrupt = None
+    def lightsleep(self, ms):
+        self.sleeps.append(ms)
+        self.us += ms * 1000
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    for name in ('ticks_ms', 'ticks_us', 'sleep_ms', 'lightsleep'):
+        monkeypatch.setattr(lowpower, name, getattr(clock, name))
+    return clock
+def test_periodic_task_does_not_drift(clock):
+    sched = Scheduler()
+    runs = []
+    sched.every(100, lambda: runs.append(clock.ticks_ms()) or clock.__setattr__('us', clock.us + 7000))
+    while clock.ticks_ms() < 1000:
+        sched.run_once()
+    assert runs == list(range(0, 1000, 100))
+def test_missed_runs_skipped(clock):
+    sched = Scheduler()
+    runs = []
+    sched.every(100, lambda: runs.append(clock.ticks_ms()))
+    sched.run_once()
+    clock.us = 350000
+    sched.run_once(max_wait=0)
+    assert runs == [0, 350] and sched.skipped == 2
+    sched.run_once()
+    sched.run_once()
+    assert runs == [0, 350, 400]
+def test_one_shot_task(clock):
+    sched = Scheduler()
+    runs = []
+    sched.after(50, lambda: runs.append(clock.ticks_ms()))
+    for i in range(3):
+        sched.run_once(max_wait=100)
+    assert runs == [50] and sched.runs == 1
+def test_lightsleep_for_long_waits(clock):
+    sched = Scheduler(lightsleep=True)
+    sched.every(500, lambda: None)
+    sched.run_once()
+    sched.run_once()
+    assert clock.sleeps == [500] and sched.sleep_us == 500000
+def test_wakeups_per_second(clock):
+    sched = Scheduler()
+    sched.every(1000, lambda: None)
+    sched.run_once()
+    sched.reset_stats()
+    sched.run_once()
+    assert clock.ticks_ms() == 1000
+    assert sched.wakeups == 1000 // POLL_SLICE
+    (ratio, rate, current) = sched.stats()
+    assert ratio == 1 and rate == 1000 // POLL_SLICE
+def test_estimated_current(clock):
+    sched = Scheduler(lightsleep=True, currents=(50, 20, 2))
+    # Busy 100ms, idle 100ms (waits below LIGHTSLEEP_MIN), lightsleep 800ms per second
+    sched.every(1000, lambda: clock.__setattr__('us', clock.us + 100000))
+    sched.every(1000, lambda: None, phase=105)
+    sched.every(1000, lambda: None, phase=110)
+    sched.run_once()
+    while clock.ticks_ms() < 1000:
+        sched.run_once()
+    assert (sched.busy_us, sched.idle_us, sched.sleep_us) == (100000, 5000 + 5000, 890000)
+    (ratio, rate, current) = sched.stats()
+    assert ratio == pytest.approx(0.9)
+    assert current == pytest.approx((100 * 50 + 10 * 20 + 890 * 2) / 1000)
+    assert 'current=7.0mA (estimated)' in sched.report()
+def test_estimated_current_default(clock):
+    sched = Scheduler()
+    assert sched.stats() == (0, 0, lowpower.RUN_MA)
+    sched.every(1000, lambda: None)
+    sched.run_once()
+    sched.run_once()
+    assert sched.stats()[2] == lowpower.IDLE_MA
+def test_wake_ends_the_wait(clock):
+    sched = Scheduler()
+    sched.every(1000, lambda: None)
+    sched.run_once()
+    clock.interrupt = sched.wake
+    sched.run_once()
+    assert clock.ticks_ms() == POLL_SLICE
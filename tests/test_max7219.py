@@ -0,0 +1,69 @@
+"""
+File:	test_max7219.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Tests of the MAX7219 8x8 LED matrix driver (max7219.py) with an SPI bus recording the bytes written:
+one spi.write per row for all modules, unchanged rows skipped and show(full_update).
+"""
+# Imports
+import pytest
+from machine import Pin
+import max7219
+class RecordingSPI:
+    """SPI bus recording the bytes written whilst the chip select is low."""
+    def __init__(self, cs):
+        self.cs = cs
+        self.writes = []
+    def write(self, buf):
+        assert self.cs.value() == 0
+        self.writes.append(bytes(buf))
+def row(y, *values):
+    """Bytes written for a row: digit register & value per module."""
+    return bytes(b for value in values for b in (y + 1, value))
+@pytest.fixture
+def cs():
+    return Pin(5)
+@pytest.fixture
+def spi(cs):
+    return RecordingSPI(cs)
+@pytest.fixture
+def display(spi, cs):
+    return max7219.Matrix8x8(spi, cs, 4)
+def test_init_one_write_per_command(display, spi, cs):
+    # Shutdown, display test, scan limit, decode mode, shutdown off for all 4 modules
+    assert spi.writes == [bytes([c, d] * 4) for (c, d) in ((12, 0), (15, 0), (11, 7), (9, 0), (12, 1))]
+    assert cs.value() == 1
+def test_show_one_write_per_row(display, spi):
+    spi.writes.clear()
+    display.pixel(0, 0, 1)
+    display.pixel(31, 7, 1)
+    # All rows after the init, the digit registers are undefined after power up
+    assert display.show() == 8
+    assert spi.writes == [row(0, 0x80, 0, 0, 0)] + [row(y, 0, 0, 0, 0) for y in range(1, 7)] + [row(7, 0, 0, 0, 0x01)]
+def test_show_skips_unchanged_rows(display, spi):
+    display.show()
+    spi.writes.clear()
+    assert display.show() == 0
+    assert spi.writes == []
+    display.pixel(9, 3, 1)
+    assert display.show() == 1
+    assert spi.writes == [row(3, 0, 0x40, 0, 0)]
+    # Clearing the pixel changes the row again
+    spi.writes.clear()
+    display.fill(0)
+    assert display.show() == 1
+    assert spi.writes == [row(3, 0, 0, 0, 0)]
+def test_show_full_update(display, spi):
+    display.text('1', 0, 0, 1)
+    display.show()
+    spi.writes.clear()
+    assert display.show(True) == 8
+    assert len(spi.writes) == 8
+    assert [w[0::2] for w in spi.writes] == [bytes([y + 1] * 4) for y in range(8)]
+    assert b''.join(w[1::2] for w in spi.writes) == bytes(display.buffer)
+def test_init_sends_all_rows(display, spi):
+    display.show()
+    display.init()
+    spi.writes.clear()
+    assert display.show() == 8
@@ -0,0 +1,107 @@
+"""
+File:	test_max7219ticker.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Tests of the MAX7219 text ticker (max7219ticker.py) stepped by tick(now) on a chain of 1 module (8 px wide):
+message queue, scroll position, frame pacing without drift and dropped frames.
+"""
+# Imports
+import pytest
+import framebuf
+from machine import Pin, SPI
+import max7219
+import max7219ticker
+from max7219ticker import Ticker
+def rendered(message, x=0):
+    """Get the 8x8 buffer of a message drawn at x."""
+    buf = bytearray(8)
+    framebuf.FrameBuffer(buf, 8, 8, framebuf.MONO_HLSB).text(message, x, 0, 1)
+    return buf
+@pytest.fixture
+def display():
+    return max7219.Matrix8x8(SPI(0), Pin(5), 1)
+@pytest.fixture
+def ticker(display, monkeypatch):
+    monkeypatch.setattr(max7219ticker, 'ticks_ms', lambda: 0)
+    # Frame period 100ms
+    return Ticker(display, fps=10)
+def run(ticker, frames, t=0):
+    """Tick every frame period, return the time of the next frame."""
+    for i in range(frames):
+        assert ticker.tick(t)
+        t += ticker.period
+    return t
+def test_scroll_position(ticker, display):
+    ticker.add('A')
+    # The message enters at the right edge, after 8 frames it is fully shown
+    run(ticker, 4)
+    assert display.buffer == rendered('A', 8 - 3)
+    run(ticker, 5, 400)
+    assert display.buffer == rendered('A')
+    run(ticker, 4, 900)
+    assert display.buffer == rendered('A', -4)
+def test_queue_in_order(ticker, display):
+    ticker.add('A')
+    ticker.add('B')
+    # One pass is display width + message width + 1 frames
+    t = run(ticker, 17)
+    assert ticker.tick(t)
+    assert ticker._x == 1 and display.buffer == bytes(8)
+    t = run(ticker, 8, t + 100)
+    assert display.buffer == rendered('B')
+    # The last message ends with a cleared display
+    t = run(ticker, 8, t)
+    assert ticker.tick(t)
+    assert not ticker.active() and display.buffer == bytes(8)
+    assert not ticker.tick(t + 100)
+    assert ticker.frames == 34
+def test_repeat_until_next_message(ticker, display):
+    ticker.add('A', repeat=0)
+    t = run(ticker, 17 * 3)
+    assert ticker.active()
+    ticker.add('B')
+    # The pass of A ends, then B starts
+    t = run(ticker, 1, t)
+    t = run(ticker, 8, t)
+    assert display.buffer == rendered('B')
+def test_repeat_passes(ticker, display):
+    ticker.add('A', repeat=2)
+    t = run(ticker, 17 * 2)
+    assert ticker.tick(t)
+    assert not ticker.active()
+    assert ticker.frames == 34
+def test_frame_pacing(ticker):
+    ticker.add('Domoticz')
+    assert ticker.tick(0)
+    assert not ticker.tick(50)
+    assert ticker.tick(100)
+    # A late tick does not delay the next frames
+    assert not ticker.tick(130)
+    assert ticker.tick(210)
+    assert not ticker.tick(299)
+    assert ticker.tick(300)
+    assert ticker.frames == 4 and ticker.dropped == 0
+def test_dropped_frames(ticker, display):
+    ticker.add('Domoticz')
+    ticker.tick(0)
+    # 2 frames missed: skipped and counted, the window moves on
+    assert ticker.tick(350)
+    assert ticker.dropped == 2 and ticker.frames == 2
+    assert ticker._x == 4
+    assert not ticker.tick(399)
+    assert ticker.tick(400)
+    assert ticker.dropped == 2
+def test_busy_skips_tick(ticker):
+    ticker.add('A')
+    ticker._busy = True
+    assert not ticker.tick(0)
+    ticker._busy = False
+    assert ticker.tick(0)
+def test_show_cancels_queue(ticker, display):
+    ticker.add('A')
+    ticker.add('B')
+    ticker.tick(0)
+    ticker.show('C')
+    assert not ticker.active()
+    assert display.buffer == rendered('C')
@@ -0,0 +1,89 @@
+"""
+File:	test_mfrc522.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Tests of the MFRC522 driver (mfrc522.py) and the presence tracker (mfrc522presence.py) with the reader emulator:
+register & FIFO bursts, cascade levels, anticollision of several cards, IRQ pin and arrive & depart events.
+"""
+# Imports
+import pytest
+from machine import SPI
+import mfrc522
+from mfrc522presence import Presence, ARRIVE, DEPART, uid_hex
+from emulator.rc522 import RC522, Card
+UID4 = [0x34, 0x6F, 0xC2, 0xCF]
+UID4B = [0x34, 0x6F, 0x1D, 0x00]
+UID7 = [0x04, 0xA1, 0xB2, 0xC3, 0xD4, 0xE5, 0x80]
+UID10 = [0x08, 0x11, 0x22, 0x33, 0x44, 0x55, 0x66, 0x77, 0x88, 0x99]
+def create(*uids, irq=False):
+    # The emulator is attached after the init with the default chip select pin, then init again
+    rdr = mfrc522.MFRC522(sck=2, miso=4, mosi=3, cs=1, rst=0, spi=SPI(0))
+    device = RC522()
+    for uid in uids:
+        device.cards.append(Card(uid))
+    rdr.spi.device = device
+    rdr.cs = device.cs
+    rdr.init()
+    if irq:
+        rdr.set_irq(device.irq)
+    return rdr, device
+def test_register_and_fifo_bursts():
+    rdr, device = create()
+    rdr.spi.reset()
+    rdr._wreg(0x24, 0x5A)
+    assert rdr._rreg(0x24) == 0x5A
+    rdr._wfifo([1, 2, 3, 4, 5])
+    assert rdr._rfifo(5) == [1, 2, 3, 4, 5]
+    # One transfer per register access and per FIFO burst
+    assert rdr.spi.transactions == 4
+@pytest.mark.parametrize('uid', [UID4, UID7, UID10])
+def test_read_uid_cascade_levels(uid):
+    rdr, device = create(uid)
+    (stat, bits) = rdr.request(rdr.REQIDL)
+    assert stat == rdr.OK
+    assert rdr.read_uid() == (rdr.OK, uid)
+    assert device.cards[0].state == Card.ACTIVE
+def test_request_without_card():
+    rdr, device = create()
+    assert rdr.request(rdr.REQIDL)[0] != rdr.OK
+def test_read_uids_with_collisions():
+    rdr, device = create(UID4, UID4B, UID7)
+    uids = rdr.read_uids()
+    assert sorted(uid_hex(uid) for uid in uids) == sorted(uid_hex(uid) for uid in (UID4, UID4B, UID7))
+    assert all(card.state == Card.HALT for card in device.cards)
+def test_read_block():
+    rdr, device = create(UID4)
+    device.cards[0].blocks[8][:] = bytes(range(16))
+    rdr.request(rdr.REQIDL)
+    (stat, uid) = rdr.read_uid()
+    assert rdr.auth(rdr.AUTHENT1A, 8, [0xFF] * 6, uid) == rdr.OK
+    assert rdr.read(8)[0:16] == list(range(16))
+def test_irq_pin_reads_irq_register_once():
+    # Without card the reader timer ends the command after 15ms, the IRQ register is not polled meanwhile
+    rdr, device = create(irq=True)
+    reads = []
+    rreg = rdr._rreg
+    rdr._rreg = lambda reg: reads.append(reg) or rreg(reg)
+    assert rdr.request(rdr.REQIDL)[0] != rdr.OK
+    # Read to clear the IRQ bits before the command and once after the IRQ
+    assert reads.count(0x04) == 2
+def test_wait_card_irq_pin():
+    rdr, device = create(irq=True)
+    assert rdr.wait_card(rdr.REQIDL, timeout=120) == (rdr.NOTAGERR, 0)
+    device.cards.append(Card(UID4))
+    assert rdr.wait_card(rdr.REQIDL, timeout=120) == (rdr.OK, 0x10)
+def test_wait_card_polling():
+    rdr, device = create(UID7)
+    assert rdr.wait_card(rdr.REQIDL, timeout=0) == (rdr.OK, 0x10)
+def test_presence_events():
+    rdr, device = create()
+    presence = Presence(rdr, depart_scans=2)
+    card = Card(UID7)
+    events = []
+    for present in (True, True, False, True, False, False, False):
+        device.cards = [card] if present else []
+        events.append(list(presence.scan()))
+    # A card missing for a single scan is not departed, the card on the reader arrives once
+    assert events == [[(ARRIVE, uid_hex(UID7))], [], [], [], [], [(DEPART, uid_hex(UID7))], []]
+    assert presence.count() == 0
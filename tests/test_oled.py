@@ -0,0 +1,240 @@
+"""
+File:	test_oled.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Tests of the OLED libraries with the OLED emulator: changed windows of the SSD1306 (ssd1306ex.py)
+with the bytes per frame of the block layout demo against the previous driver,
+changed region of the rotated SH1106 (sh1106.py), data written without copies and the retained-mode layout (oled_layout.py).
+The display RAM after the partial updates must equal the RAM after a full update.
+"""
+# Imports
+import pytest
+import framebuf
+from machine import I2C, Pin
+import ssd1306ex
+from ssd1306ex import SSD1306_I2C, SSD1306_SPI
+from sh1106 import SH1106_I2C
+from oled_layout import Layout
+from emulator.oled import OLED
+def ssd1306():
+    i2c = I2C(0, device=OLED(128, 8))
+    return SSD1306_I2C(128, 64, i2c), i2c
+def test_ssd1306_show_changed_window():
+    (oled, i2c) = ssd1306()
+    oled.text('Domoticz', 0, 0, 1)
+    oled.show()
+    assert i2c.device.ram == oled.buffer
+    i2c.reset()
+    oled.fill_rect(8, 24, 32, 8, 0)
+    oled.text('1234', 8, 24, 1)
+    oled.show()
+    assert i2c.device.ram == oled.buffer
+    # One page of 32 columns and the window commands
+    assert 32 < i2c.bytes < 64
+    i2c.reset()
+    oled.show()
+    assert i2c.transactions == 0
+def test_ssd1306_full_update():
+    (oled, i2c) = ssd1306()
+    oled.show()
+    oled.text('Domoticz', 0, 0, 1)
+    i2c.reset()
+    oled.show(full_update=True)
+    assert i2c.device.ram == oled.buffer
+    assert i2c.bytes > 128 * 8
+class FullSH1106_I2C(SH1106_I2C):
+    """Remap the full render buffer on every show()."""
+    def show(self, full_update=False):
+        (w, p, db, rb) = (self.width, self.pages, self.displaybuf, self.renderbuf)
+        if self.rotate90:
+            for i in range(self.bufsize):
+                db[w * (i % p) + (i // p)] = rb[i]
+        SH1106_I2C.show(self, True)
+@pytest.mark.parametrize('rotate', [0, 90, 180, 270])
+def test_sh1106_changed_region(rotate):
+    rams = []
+    for cls in (SH1106_I2C, FullSH1106_I2C):
+        i2c = I2C(0, device=OLED(132, 8))
+        oled = cls(128, 64, i2c, rotate=rotate)
+        oled.text('Domoticz', 0, 0, 1)
+        oled.show()
+        for n in range(3):
+            oled.fill_rect(8, 24, 32, 8, 0)
+            oled.text('{:4d}'.format(n), 8, 24, 1)
+            oled.show()
+        rams.append(bytes(i2c.device.ram))
+    assert rams[0] == rams[1]
+@pytest.mark.parametrize('rotate', [0, 90, 180, 270])
+def test_sh1106_blit_changed_region(rotate):
+    # A full size framebuffer, in rotate 90/270 the render buffer is 64 wide and 128 high
+    rams = []
+    for cls in (SH1106_I2C, FullSH1106_I2C):
+        i2c = I2C(0, device=OLED(132, 8))
+        oled = cls(128, 64, i2c, rotate=rotate)
+        oled.show()
+        (w, h) = (64, 128) if oled.rotate90 else (128, 64)
+        fbuf = framebuf.FrameBuffer(bytearray(w * h // 8), w, h, framebuf.MONO_HMSB)
+        fbuf.fill(1)
+        oled.blit(fbuf, 0, 0)
+        oled.show()
+        rams.append(bytes(i2c.device.ram))
+    assert rams[0] == rams[1]
+    assert rams[0].count(0xff) == 128 * 8
+class CopyCountingBus:
+    """I2C and SPI bus counting the buffers allocated and the bytes copied by the driver, no hardware required."""
+    def __init__(self):
+        self.buffers = []
+        self.reset()
+    def reset(self):
+        self.allocated = 0
+        self.views = 0
+        self.copied = 0
+    def count(self, buf):
+        # Preallocated buffers and memoryview slices of them are not copies
+        for b in self.buffers:
+            if buf is b:
+                return
+        if isinstance(buf, memoryview):
+            self.views += 1
+            return
+        self.allocated += 1
+        self.copied += len(buf)
+    def writeto(self, addr, buf, stop=True):
+        self.count(buf)
+    def writevto(self, addr, vector, stop=True):
+        for buf in vector:
+            self.count(buf)
+    def init(self, *args, **kwargs):
+        pass
+    def write(self, buf):
+        self.count(buf)
+@pytest.mark.parametrize('name', ['SH1106 I2C', 'SSD1306 I2C', 'SSD1306 SPI'])
+def test_show_without_copies(name):
+    bus = CopyCountingBus()
+    if name == 'SH1106 I2C':
+        oled = SH1106_I2C(128, 64, bus)
+        bus.buffers = [oled.temp, oled.write_list[0]] + oled.pagebufs
+    elif name == 'SSD1306 I2C':
+        oled = SSD1306_I2C(128, 64, bus)
+        bus.buffers = [oled.buffer, oled.temp, oled.write_list[0]]
+    else:
+        oled = SSD1306_SPI(128, 64, bus, Pin(2), Pin(3), Pin(4))
+        bus.buffers = [oled.buffer, oled.temp]
+    oled.text('Domoticz', 0, 0, 1)
+    bus.reset()
+    oled.show(True)
+    assert (bus.allocated, bus.copied) == (0, 0)
+    oled.fill_rect(8, 24, 32, 8, 0)
+    oled.text('  42', 8, 24, 1)
+    bus.reset()
+    oled.show()
+    assert (bus.allocated, bus.copied) == (0, 0)
+def blocks():
+    return [{'name': str(i + 1), 'col': block[0], 'row': block[1]} for (i, block) in enumerate(ssd1306ex.BLOCKS)]
+class PreviousSSD1306_I2C(SSD1306_I2C):
+    """Previous driver: show() sends the full buffer."""
+    def show(self, full_update=False):
+        SSD1306_I2C.show(self, True)
+# Domoticz frames of the project oled_motherboard_blocks.py, only the time and the CPU value change
+def frame(time, cpu):
+    return [{'block': 1, 'title': 'Time', 'value': time}, {'block': 2, 'title': 'Temp', 'value': 42},
+            {'block': 3, 'title': 'CPU', 'value': cpu}, {'block': 4, 'title': 'Mem', 'value': 22},
+            {'block': 5, 'title': 'ARM', 'value': 600}, {'block': 6, 'title': 'HDD', 'value': 39}]
+FRAMES = [frame('1403', 0.37), frame('1404', 0.37), frame('1405', 0.45), frame('1406', 0.41)]
+def previous_update(oled, data, state):
+    # Previous project: clear the display (with show), write all blocks, show
+    oled.clear()
+    for item in data:
+        oled.text_block(item['block'], item['title'], item['value'])
+    oled.show()
+def blocks_update(oled, data, state):
+    # Write only the changed blocks, show the changed windows
+    if not state:
+        oled.fill(0)
+    for item in data:
+        block = (item['title'], str(item['value']))
+        if state.get(item['block']) != block:
+            oled.text_block(item['block'], item['title'], item['value'])
+            state[item['block']] = block
+    oled.show()
+def layout_update(oled, data, state):
+    # Project: set the layout titles & values, show the changed lines
+    if 'layout' not in state:
+        oled.fill(0)
+        state['layout'] = Layout(oled, blocks())
+    for item in data:
+        state['layout'].set_title(str(item['block']), item['title'])
+        state['layout'].set(str(item['block']), item['value'])
+    state['layout'].show()
+def frame_bytes(cls, update):
+    """Get the I2C transactions and bytes per frame after the welcome text and the display RAM."""
+    i2c = I2C(0, device=OLED(128, 8))
+    oled = cls(128, 64, i2c)
+    oled.text_rows('Domoticz Motherboard', 'v20261019', '', 'Waiting for data...')
+    state = {}
+    counts = []
+    for data in FRAMES:
+        i2c.reset()
+        update(oled, data, state)
+        counts.append((i2c.transactions, i2c.bytes))
+    return counts, bytes(i2c.device.ram)
+def test_blocks_demo_bytes_per_frame():
+    (previous, previous_ram) = frame_bytes(PreviousSSD1306_I2C, previous_update)
+    (changed, changed_ram) = frame_bytes(SSD1306_I2C, blocks_update)
+    (layout, layout_ram) = frame_bytes(SSD1306_I2C, layout_update)
+    assert changed_ram == previous_ram
+    assert layout_ram == previous_ram
+    assert [n for (t, n) in previous] == [2074] * 4
+    assert [n for (t, n) in changed] == [1037, 90, 250, 250]
+    assert [n for (t, n) in layout] == [1037, 45, 125, 125]
+def test_layout_shows_changed_lines_only():
+    (oled, i2c) = ssd1306()
+    layout = Layout(oled, blocks())
+    layout.update({'1': '1403', '2': 42, '3': 0.37})
+    for (name, title) in (('1', 'Time'), ('2', 'Temp'), ('3', 'CPU')):
+        layout.set_title(name, title)
+    layout.show()
+    i2c.reset()
+    layout.update({'1': '1403', '2': 42})
+    layout.show()
+    assert i2c.transactions == 0
+    layout.set('1', '1404')
+    layout.show()
+    assert 0 < i2c.bytes < 128
+    # Same display RAM as the layout drawn at once
+    (full, full_i2c) = ssd1306()
+    reference = Layout(full, blocks())
+    reference.update({'1': '1404', '2': 42, '3': 0.37})
+    for (name, title) in (('1', 'Time'), ('2', 'Temp'), ('3', 'CPU')):
+        reference.set_title(name, title)
+    reference.show()
+    assert i2c.device.ram == full_i2c.device.ram
+def layout_ram(title, value):
+    """Get the display RAM of a region drawn at once."""
+    (oled, i2c) = ssd1306()
+    layout = Layout(oled)
+    layout.add('temp', 1, 0, title=title)
+    layout.set('temp', value)
+    layout.show()
+    return i2c.device.ram
+@pytest.mark.parametrize('before, after', [('Temp', ''), ('', 'Temp')])
+def test_layout_title_added_or_removed(before, after):
+    (oled, i2c) = ssd1306()
+    layout = Layout(oled)
+    layout.add('temp', 1, 0, title=before)
+    layout.set('temp', 21)
+    layout.show()
+    # The value moves to the other row, the title and value lines are cleared and redrawn
+    layout.set_title('temp', after)
+    layout.show()
+    assert i2c.device.ram == layout_ram(after, 21)
+    layout.set('temp', 22)
+    layout.show()
+    assert i2c.device.ram == layout_ram(after, 22)
+def test_layout_format_and_align():
+    (oled, i2c) = ssd1306()
+    layout = Layout(oled)
+    layout.add('temp', 0, 0, width=5, format='{:.1f}', align='right')
+    region = layout.regions['temp']
+    assert region.fit(region.format.format(21.25)) == ' 21.2'
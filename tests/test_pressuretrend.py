@@ -0,0 +1,88 @@
+"""
+File:	test_pressuretrend.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Tests of the pressure trend (pressuretrend.py): rolling least squares slope, rate, forecast, file save & restore.
+"""
+# Imports
+import pytest
+import pressuretrend
+from pressuretrend import PressureTrend
+READING = 60000
+# Time of the saved history (RTC set)
+NOW = 1792400000
+def ramp(trend, start, rate, hours, t=0):
+    # Readings every minute from start Pa changing by rate hPa per 3 hours, returns the time after the last reading
+    for i in range(hours * 3600000 // READING):
+        trend.add(start + rate * 100 * i * READING / 10800000, now=t)
+        t += READING
+    return t
+def least_squares(trend, n):
+    ys = [trend.history[(trend.head - n + x) % trend.size] for x in range(n)]
+    mx = (n - 1) / 2
+    my = sum(ys) / n
+    return sum((x - mx) * (y - my) for (x, y) in enumerate(ys)) / sum((x - mx) ** 2 for x in range(n))
+def test_interval_mean():
+    trend = PressureTrend(file=None)
+    assert trend.add(101300, now=0)
+    for t in range(READING, 600000, READING):
+        assert not trend.add(101400, now=t)
+    assert trend.add(101400, now=600000)
+    assert trend.count == 2 and trend.history[1] == 100
+@pytest.mark.parametrize('rate', [0, -4, 2.5])
+def test_rate(rate):
+    trend = PressureTrend(file=None)
+    ramp(trend, 101500, rate, 6)
+    assert trend.rate() == pytest.approx(rate, abs=0.05)
+    assert trend.change(0) == pytest.approx(rate / 3, abs=0.05)
+def test_rolling_slope_equals_least_squares():
+    trend = PressureTrend(interval=60000, file=None)
+    ramp(trend, 101500, -4, 5)
+    trend._push(-300)
+    trend._push(250)
+    for w in range(len(trend.windows)):
+        assert trend.slope(w) == pytest.approx(least_squares(trend, trend.windows[w]))
+def test_rate_needs_half_the_history():
+    trend = PressureTrend(file=None)
+    ramp(trend, 101500, -4, 1)
+    assert trend.rate() is None and trend.forecast(1015) is None
+    assert trend.change(0) is not None
+@pytest.mark.parametrize('start, rate, forecast', [
+    (101500, 0, pressuretrend.FORECAST_STABLE), (102500, 0, pressuretrend.FORECAST_SUNNY),
+    (99500, 0, pressuretrend.FORECAST_CLOUDY), (101500, -2, pressuretrend.FORECAST_CLOUDY),
+    (101500, -4, pressuretrend.FORECAST_CLOUDY_RAIN), (100500, -7, pressuretrend.FORECAST_THUNDERSTORM),
+    (100000, 2, pressuretrend.FORECAST_SUNNY), (100000, 7, pressuretrend.FORECAST_UNSTABLE)])
+def test_forecast(start, rate, forecast):
+    trend = PressureTrend(file=None)
+    ramp(trend, start, rate, 6)
+    assert trend.forecast(round(start / 100)) == forecast
+def test_save_and_restore(tmp_path, monkeypatch):
+    file = str(tmp_path / 'pressuretrend.dat')
+    monkeypatch.setattr(pressuretrend, 'time', lambda: NOW)
+    trend = PressureTrend(file=file, save_every=1000)
+    ramp(trend, 101500, -4, 6)
+    trend.save()
+    # Reboot after 25 minutes, the 2 missed intervals are interpolated
+    monkeypatch.setattr(pressuretrend, 'time', lambda: NOW + 1500)
+    restored = PressureTrend(file=file)
+    assert restored.count == trend.count and restored._gap == 2
+    assert restored.rate() == pytest.approx(trend.rate())
+    restored.add(trend.base + trend.history[(trend.head - 1) % trend.size] - 55, now=0)
+    assert restored.count == trend.count and restored.rate() == pytest.approx(-4, abs=0.1)
+def test_restore_too_old(tmp_path, monkeypatch):
+    file = str(tmp_path / 'pressuretrend.dat')
+    monkeypatch.setattr(pressuretrend, 'time', lambda: NOW)
+    trend = PressureTrend(file=file)
+    ramp(trend, 101500, -4, 6)
+    monkeypatch.setattr(pressuretrend, 'time', lambda: NOW + 3 * 3600)
+    assert PressureTrend(file=file).count == 0
+def test_restore_rtc_not_set(tmp_path, monkeypatch):
+    file = str(tmp_path / 'pressuretrend.dat')
+    # Without NTP the RTC starts at 2021-01-01 after each reboot, the time since the save is unknown
+    monkeypatch.setattr(pressuretrend, 'time', lambda: 1609459200)
+    trend = PressureTrend(file=file)
+    ramp(trend, 101500, -4, 6)
+    trend.save()
+    monkeypatch.setattr(pressuretrend, 'time', lambda: 1609459200 + 1200)
+    assert PressureTrend(file=file).count == 0
@@ -0,0 +1,57 @@
+"""
+File:	test_pwmfade.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Tests of the PWM fade engine (pwmfade.py): gamma LUT, easing curves, fades stepped by tick() and retarget.
+"""
+# Imports
+import pytest
+import pwmfade
+from pwmfade import Fader, LUT, LINEAR, EASE_IN, EASE_OUT, EASE_IN_OUT, ease
+@pytest.fixture
+def fader(monkeypatch):
+    monkeypatch.setattr(pwmfade, 'ticks_ms', lambda: 0)
+    return Fader(duration=800, period=0)
+def test_gamma_lut():
+    assert len(LUT) == 256 and LUT[0] == 0 and LUT[255] == 65535
+    assert list(LUT) == sorted(LUT)
+    assert LUT[128] < 65535 // 4
+@pytest.mark.parametrize('curve', [LINEAR, EASE_IN, EASE_OUT, EASE_IN_OUT])
+def test_ease(curve):
+    progress = [ease(curve, p) for p in range(1025)]
+    assert progress[0] == 0 and progress[1024] == 1024
+    assert progress == sorted(progress)
+def test_fade(fader):
+    duties = []
+    channel = fader.add(duties.append)
+    fader.fade(channel, 255)
+    t = 0
+    while fader.tick(now=t):
+        t += 10
+    assert t == 800 and fader.level(channel) == 255
+    assert duties[-1] == 65535 and duties == sorted(duties)
+def test_retarget_without_jump(fader, monkeypatch):
+    duties = []
+    channel = fader.add(duties.append)
+    fader.fade(channel, 255)
+    fader.tick(now=400)
+    level = fader.channels[channel].level
+    monkeypatch.setattr(pwmfade, 'ticks_ms', lambda: 400)
+    fader.fade(channel, 0)
+    assert fader.channels[channel].curve == EASE_OUT
+    fader.tick(now=410)
+    assert 0 < level - fader.channels[channel].level < 10 << 8
+def test_set_stops_the_fade(fader):
+    duties = []
+    channel = fader.add(duties.append)
+    fader.fade(channel, 255)
+    fader.set(channel, 128)
+    assert not fader.active() and not fader.tick(now=100)
+    assert duties[-1] == LUT[128]
+def test_interpolated_duty(fader):
+    duties = []
+    channel = fader.add(duties.append)
+    fader.channels[channel].level = (10 << 8) | 0x80
+    fader._write(fader.channels[channel])
+    assert LUT[10] < duties[-1] < LUT[11]
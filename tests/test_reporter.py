@@ -0,0 +1,59 @@
+"""
+File:	test_reporter.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Tests of the change reporter (reporter.py): deadband, min interval, heartbeat, flush and counters.
+"""
+# Imports
+from reporter import Reporter
+def create(**kwargs):
+    sent = []
+    reporter = Reporter()
+    reporter.add('temp', sent.append, **kwargs)
+    return reporter, sent
+def test_first_reading_reported():
+    reporter, sent = create(absolute=0.2)
+    assert reporter.update('temp', 21.0, now=0)
+    assert sent == [21.0]
+def test_absolute_deadband_against_last_report():
+    reporter, sent = create(absolute=0.2)
+    for (t, value) in enumerate((21.0, 21.1, 21.2, 21.3, 21.1)):
+        reporter.update('temp', value, now=t * 60000)
+    # The slow drift is reported once 0.2 is exceeded from the last reported value
+    assert sent == [21.0, 21.3]
+    assert reporter.ratio('temp') == 3 / 5
+def test_relative_deadband():
+    reporter, sent = create(relative=0.1)
+    for value in (100, 105, 111, 115, 123):
+        reporter.update('temp', value, now=0)
+    assert sent == [100, 111, 123]
+def test_heartbeat():
+    reporter, sent = create(absolute=1, heartbeat=900000)
+    for t in range(0, 1800001, 60000):
+        reporter.update('temp', 20.0, now=t)
+    assert sent == [20.0, 20.0, 20.0]
+def test_min_interval_pending_flushed():
+    reporter, sent = create(min_interval=1000)
+    reporter.update('temp', 1, now=0)
+    assert not reporter.update('temp', 2, now=500)
+    reporter.flush(now=900)
+    assert sent == [1]
+    reporter.flush(now=1000)
+    assert sent == [1, 2]
+    reporter.flush(now=2000)
+    assert sent == [1, 2]
+def test_tuple_and_dict_readings():
+    reporter, sent = create(absolute=0.5)
+    reporter.update('temp', (20.0, 55), now=0)
+    assert not reporter.update('temp', (20.2, 55.4), now=1)
+    assert reporter.update('temp', (20.2, 56), now=2)
+    reporter, sent = create(absolute=0.5)
+    reporter.update('temp', {'t': 20.0}, now=0)
+    assert not reporter.update('temp', {'t': 20.4}, now=1)
+    assert reporter.update('temp', {'t': 20.4, 'h': 55}, now=2)
+def test_report_counters():
+    reporter, sent = create(absolute=1)
+    for value in (20, 20.5, 22, 22):
+        reporter.update('temp', value, now=0)
+    assert reporter.report() == ['temp: readings=4, reports=2, suppressed=2 (50%)']
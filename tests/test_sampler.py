@@ -0,0 +1,85 @@
+"""
+File:	test_sampler.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Tests of the cooperative multi-sensor sampler (sampler.py) on the low-power scheduler with an emulated clock:
+generator and plain function samples, overlapping conversions and the miss, overrun & error counters.
+"""
+# Imports
+import pytest
+import lowpower
+import sampler
+from sampler import Sampler
+from test_lowpower import Clock
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    for name in ('ticks_ms', 'ticks_us', 'sleep_ms', 'lightsleep'):
+        monkeypatch.setattr(lowpower, name, getattr(clock, name))
+    for name in ('ticks_ms', 'ticks_us'):
+        monkeypatch.setattr(sampler, name, getattr(clock, name))
+    return clock
+def run(smp, clock, ms):
+    """Run the scheduler until the clock reaches ms."""
+    while clock.ticks_ms() < ms:
+        smp.sched.run_once(max_wait=ms - clock.ticks_ms())
+def conversion(value, wait):
+    """Sample coroutine waiting for a conversion."""
+    def sample():
+        yield wait
+        return value
+    return sample
+def test_generator_sample(clock):
+    smp = Sampler()
+    values = []
+    task = smp.add('ds18b20', conversion(21.5, 750), 1000, callback=values.append)
+    run(smp, clock, 2800)
+    assert values == [21.5, 21.5, 21.5]
+    assert task.runs == 3 and task.duration == 750 and task.max_duration == 750
+    assert (task.misses, task.overruns, task.errors) == (0, 0, 0)
+def test_plain_function_sample(clock):
+    smp = Sampler()
+    values = []
+    task = smp.add('adc', lambda: 42, 500, phase=100, callback=values.append)
+    run(smp, clock, 1000)
+    assert values == [42, 42]
+    assert task.runs == 2 and task.duration == 0
+def test_conversions_overlap(clock):
+    smp = Sampler()
+    values = []
+    smp.add('ds18b20', conversion('ds', 750), 2000, callback=values.append)
+    smp.add('bmp280', conversion('bmp', 40), 2000, phase=10, callback=values.append)
+    # The BMP280 samples whilst the DS18B20 converts
+    run(smp, clock, 1000)
+    assert values == ['bmp', 'ds']
+def test_miss(clock):
+    smp = Sampler()
+    # A task blocking 50ms runs before the sample
+    smp.sched.every(1000, lambda: clock.__setattr__('us', clock.us + 50000))
+    task = smp.add('dht22', lambda: 55, 1000, jitter=10)
+    run(smp, clock, 1500)
+    assert task.runs == 2 and task.misses == 2 and task.max_late == 50
+def test_overrun(clock):
+    smp = Sampler()
+    # The conversion takes longer than the period
+    task = smp.add('slow', conversion(1, 1500), 1000)
+    run(smp, clock, 2500)
+    assert task.overruns == 1
+    assert task.runs == 1
+    run(smp, clock, 4000)
+    assert task.runs == 2 and task.overruns == 2
+def test_error_counted(clock, capsys):
+    smp = Sampler()
+    values = []
+    def sample():
+        if len(values) == 0:
+            values.append(None)
+            raise OSError('timeout')
+        yield 10
+        return 55
+    task = smp.add('dht22', sample, 1000, callback=values.append)
+    run(smp, clock, 1500)
+    assert task.errors == 1 and task.runs == 1 and values == [None, 55]
+    assert '[ERROR] Sample dht22: timeout' in capsys.readouterr().out
+    assert smp.report()[0].startswith('dht22: runs=1, misses=0, overruns=0, errors=1')
@@ -0,0 +1,118 @@
+"""
+File:	test_segmentanimator.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Tests of the 7-segment animator (segmentanimator.py) with a display recording the frames written:
+scroll, blink & fade stepped by tick(), cancel restoring the brightness, busy flag and timer stopped when idle.
+"""
+# Imports
+import pytest
+import segmentanimator
+import sevensegment
+from segmentanimator import SegmentAnimator, SCROLL, BLINK, FADE
+class Display:
+    """TM1637 display recording the frames written and the brightness."""
+    def __init__(self):
+        self.frames = []
+        self._brightness = 7
+    def brightness(self, val=None):
+        if val is None:
+            return self._brightness
+        self._brightness = val
+    def write(self, segments, pos=0):
+        self.frames.append(bytes(segments))
+    def encode_string(self, string):
+        return sevensegment.encode_string(string)
+@pytest.fixture
+def display():
+    return Display()
+@pytest.fixture
+def anim(display, monkeypatch):
+    monkeypatch.setattr(segmentanimator, 'ticks_ms', lambda: 0)
+    return SegmentAnimator(display)
+def test_scroll(anim, display):
+    segments = sevensegment.encode_string('12')
+    anim.scroll('12', delay=250)
+    t = 0
+    while anim.tick(t):
+        t += 10
+    # Off-screen right to off-screen left in len + digits + 1 steps, one write per step
+    assert t == 7 * 250
+    window = bytes(4) + segments + bytes(4)
+    assert display.frames == [window[i:i + 4] for i in range(7)]
+    assert not anim.active()
+def test_scroll_step_not_due(anim, display):
+    anim.scroll('12', delay=250)
+    anim.tick(0)
+    anim.tick(100)
+    assert len(display.frames) == 1
+    anim.tick(250)
+    assert len(display.frames) == 2
+def test_blink_with_value(anim, display):
+    anim.show_segments(sevensegment.encode_string('21*c'))
+    anim.blink(500, count=2)
+    for t in range(0, 1000, 250):
+        assert anim.tick(t)
+    assert not anim.tick(1000)
+    blank = bytes(4)
+    value = bytes(sevensegment.encode_string('21*c'))
+    assert display.frames == [value, blank, value, blank, value]
+def test_fade_and_cancel_restores_brightness(anim, display):
+    anim.fade(0, 7, delay=100)
+    anim.tick(0)
+    anim.tick(100)
+    assert display.brightness() == 1
+    anim.cancel(FADE)
+    assert display.brightness() == 7
+    assert not anim.active(FADE)
+def test_fade_end_brightness(anim, display):
+    anim.fade(7, 2, delay=100)
+    t = 0
+    while anim.tick(t):
+        t += 100
+    assert display.brightness() == 2
+    anim.cancel()
+    assert display.brightness() == 2
+def test_cancel_blink_leaves_display_visible(anim, display):
+    anim.blink(2000)
+    anim.scroll('domoticz', delay=250, repeat=True)
+    anim.tick(0)
+    anim.tick(250)
+    assert display.frames[-1] == bytes(4)
+    anim.cancel(BLINK)
+    assert display.frames[-1] == bytes(3) + sevensegment.encode_string('d')
+    assert anim.active(SCROLL) and not anim.active(BLINK)
+def test_busy_skips_tick(anim, display):
+    anim.scroll('12', delay=250)
+    anim._busy = True
+    assert anim.tick(0)
+    assert display.frames == []
+    anim._busy = False
+    anim.tick(0)
+    assert len(display.frames) == 1
+def test_timer_stopped_when_idle(anim, display):
+    anim.start()
+    assert anim._timer is None
+    anim.scroll('1', delay=0)
+    timer = anim._timer
+    assert anim._running and timer.callback is not None
+    # The timer callback steps the animation, after the last step the timer is stopped
+    while timer.callback is not None:
+        timer.callback(timer)
+    assert not anim._running and not anim.active()
+    # The next animation starts the timer again
+    anim.blink(500)
+    assert anim._running and timer.callback is not None
+    anim.cancel()
+    timer.callback(timer)
+    assert not anim._running
+def test_stop_pauses_animations(anim, display):
+    anim.start()
+    anim.scroll('12', repeat=True)
+    anim.stop()
+    assert not anim._running and anim.active(SCROLL)
+    anim.blink(500)
+    assert not anim._running
+    anim.start()
+    assert anim._running
@@ -0,0 +1,70 @@
+"""
+File:	test_servomotion.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Tests of the servo motion planner (servomotion.py): duty tables per move, velocity limits, synchronised arrival, queue.
+"""
+# Imports
+import pytest
+import servomotion
+from servo import Servo
+from servomotion import Planner
+PERIOD = 20
+@pytest.fixture
+def planner(monkeypatch):
+    # Pan 270 deg/s from 0, tilt 60 deg/s from 90, stepped by tick()
+    monkeypatch.setattr(servomotion, 'ticks_ms', lambda: 0)
+    planner = Planner(duration=1000, period=0, queue=2)
+    planner.add(Servo(pin=0), speed=270, angle=0)
+    planner.add(Servo(pin=1), speed=60, angle=90)
+    planner.period = PERIOD
+    return planner
+def angles(planner, axis):
+    servo = planner.axes[axis].servo
+    return [(servo.MAX_DUTY - duty) * 180 / (servo.MAX_DUTY - servo.MIN_DUTY) for duty in planner.axes[axis].table]
+def test_tables(planner):
+    planner.move((180, 45))
+    # The tilt velocity limit extends the move: 45 deg at 60 deg/s with the smoothstep peak 1.5x is 1125ms
+    assert planner.steps == -(-1125 // PERIOD)
+    for (axis, start, target) in ((0, 0, 180), (1, 90, 45)):
+        table = planner.axes[axis].table
+        servo = planner.axes[axis].servo
+        assert len(table) == planner.steps + 1
+        assert table[0] == servo.angle_duty(start) and table[-1] == servo.angle_duty(target)
+        assert list(table) == sorted(table, reverse=table[0] > table[-1])
+def test_velocity_limits(planner):
+    planner.move((180, 45))
+    for (axis, speed) in ((0, 270), (1, 60)):
+        a = angles(planner, axis)
+        velocity = max(abs(q - p) for (p, q) in zip(a, a[1:])) * 1000 / PERIOD
+        # Tolerance for the eased progress quantised to 1/1024
+        assert velocity <= speed * 1.05
+def test_synchronised_arrival(planner):
+    planner.move((180, 45))
+    t = 0
+    while planner.tick(now=t):
+        t += PERIOD
+    assert t == planner.steps * PERIOD
+    assert planner.angle(0) == 180 and planner.angle(1) == 45
+    assert planner.axes[0].servo.duty == planner.axes[0].servo.angle_duty(180)
+def test_hold_axis(planner):
+    planner.move((None, 0), duration=500)
+    assert planner.axes[0].table is None
+    assert planner.steps == -(-max(500, 90 * 500 * 3 // 60) // PERIOD)
+def test_queue(planner):
+    assert planner.move((180, 45))
+    assert planner.move((90, 60)) and planner.move((0, 90))
+    assert not planner.move((45, 45))
+    assert planner.dropped == 1
+    t = 0
+    while planner.tick(now=t):
+        t += PERIOD
+    assert planner.moves == 3
+    assert planner.angle(0) == 0 and planner.angle(1) == 90
+def test_cancel(planner):
+    planner.move((180, 45))
+    planner.tick(now=10 * PERIOD)
+    planner.cancel()
+    assert not planner.active() and not planner.tick(now=20 * PERIOD)
+    assert 0 < planner.angle(0) < 180
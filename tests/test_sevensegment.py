@@ -0,0 +1,70 @@
+"""
+File:	test_sevensegment.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Tests of the 7-segment codec (sevensegment.py) against the encoding of the previous drivers (tm1638.py v20230321).
+"""
+# Imports
+import pytest
+import sevensegment
+# Segment table & encoding of the previous drivers
+_SEGMENTS = b'\x3F\x06\x5B\x4F\x66\x6D\x7D\x07\x7F\x6F\x77\x7C\x39\x5E\x79\x71\x3D\x76\x06\x1E\x76\x38\x55\x54\x3F\x73\x67\x50\x6D\x78\x3E\x1C\x2A\x76\x6E\x5B\x00\x40\x63'
+def previous_encode_char(char):
+    o = ord(char)
+    if o == 32:
+        return _SEGMENTS[36]
+    if o == 42:
+        return _SEGMENTS[38]
+    if o == 45:
+        return _SEGMENTS[37]
+    if 65 <= o <= 90:
+        return _SEGMENTS[o - 55]
+    if 97 <= o <= 122:
+        return _SEGMENTS[o - 87]
+    if 48 <= o <= 57:
+        return _SEGMENTS[o - 48]
+    raise ValueError(char)
+def previous_encode_string(string):
+    segments = bytearray(len(string.replace('.', '')))
+    j = 0
+    for char in string:
+        if char == '.' and j > 0:
+            segments[j - 1] |= 0x80
+            continue
+        segments[j] = previous_encode_char(char)
+        j += 1
+    return segments
+def test_encode_char():
+    for char in '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ -*':
+        assert sevensegment.encode_char(char) == previous_encode_char(char), char
+def test_encode_char_out_of_range():
+    for char in ('#', '~', '°'):
+        with pytest.raises(ValueError):
+            sevensegment.encode_char(char)
+@pytest.mark.parametrize('string', ['12.34 abc', '1.2.3.4', 'hi-lo*C', '-12.5'])
+def test_encode_string(string):
+    assert sevensegment.encode_string(string) == previous_encode_string(string)
+def test_encode_colon_and_leading_dot():
+    assert sevensegment.encode_string('12:34') == bytes([0x06, 0x5B | 0x80, 0x4F, 0x66])
+    assert sevensegment.encode_string('.5') == bytes([sevensegment.DP, 0x6D])
+@pytest.mark.parametrize('num', [-1000, -999, -42, -1, 0, 7, 123, 9999, 10000])
+def test_number_into(num):
+    buf = bytearray(4)
+    assert sevensegment.number_into(buf, num) == 4
+    assert buf == previous_encode_string('{0: >4d}'.format(max(-999, min(num, 9999))))
+def test_number_into_zeros_and_position():
+    buf = bytearray(8)
+    sevensegment.number_into(buf, 42, pos=4, zeros=True)
+    assert buf == bytes(4) + previous_encode_string('0042')
+@pytest.mark.parametrize('num', [-9, 0, 21, 99])
+def test_temperature_into(num):
+    buf = bytearray(4)
+    sevensegment.temperature_into(buf, num)
+    assert buf == previous_encode_string('{0: >2d}*c'.format(num))
+def test_temperature_into_out_of_range():
+    buf = bytearray(4)
+    sevensegment.temperature_into(buf, -10)
+    assert buf[0:2] == previous_encode_string('lo')
+    sevensegment.humidity_into(buf, 100)
+    assert buf == previous_encode_string('hirh')
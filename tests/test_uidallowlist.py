@@ -0,0 +1,56 @@
+"""
+File:	test_uidallowlist.py
+Date:	20261019
+Author:	Robert W.B. Linn
+:description
+Tests of the local UID allowlist (uidallowlist.py): lookup, sync by full list & changes, file save & restore.
+"""
+# Imports
+from uidallowlist import UidAllowlist, key, MAX_UID_SIZE
+UIDS = ['346FC2CF', '56381D00', '04A1B2C3D4E580']
+def test_key_4_and_7_byte_uids_do_not_collide():
+    assert key('00000000346FC2') != key('346FC2')
+    assert key('346FC2CF') == key([0x34, 0x6F, 0xC2, 0xCF])
+def test_allowed():
+    allowlist = UidAllowlist()
+    allowlist.load(UIDS, 1)
+    assert allowlist.count() == 3
+    for uid in UIDS:
+        assert allowlist.allowed(uid)
+    assert allowlist.allowed([0x04, 0xA1, 0xB2, 0xC3, 0xD4, 0xE5, 0x80])
+    assert not allowlist.allowed('12345678')
+    assert not allowlist.allowed('A1B2C3D4E580')
+def test_sync_full_list_and_changes():
+    allowlist = UidAllowlist()
+    assert allowlist.sync('{"version": 1, "uids": ["346FC2CF", "56381D00"]}')
+    assert allowlist.sync({'version': 2, 'base': 1, 'add': ['04A1B2C3D4E580'], 'remove': ['346FC2CF']})
+    assert allowlist.version == 2
+    assert not allowlist.allowed('346FC2CF')
+    assert allowlist.allowed('56381D00') and allowlist.allowed('04A1B2C3D4E580')
+def test_sync_changes_to_another_base_not_applied():
+    allowlist = UidAllowlist()
+    allowlist.load(UIDS, 3)
+    assert not allowlist.sync({'version': 5, 'base': 4, 'add': ['12345678']})
+    assert allowlist.version == 3 and not allowlist.allowed('12345678')
+def test_save_and_restore(tmp_path):
+    file = str(tmp_path / 'allowlist.bin')
+    allowlist = UidAllowlist(file)
+    allowlist.load(UIDS, 7)
+    restored = UidAllowlist(file)
+    assert restored.version == 7
+    assert list(restored.uids) == list(allowlist.uids)
+    assert restored.allowed('04A1B2C3D4E580')
+def test_restore_without_file(tmp_path):
+    allowlist = UidAllowlist(str(tmp_path / 'missing.bin'))
+    assert allowlist.version == 0 and allowlist.count() == 0
+def test_10_byte_uid_rejected(capsys):
+    uid = '04A1B2C3D4E5F6071829'
+    assert len(uid) // 2 > MAX_UID_SIZE
+    assert key(uid) is None and key(list(bytes.fromhex(uid))) is None
+    allowlist = UidAllowlist()
+    allowlist.load(UIDS + [uid], 1)
+    assert allowlist.count() == 3
+    assert not allowlist.allowed(uid)
+    assert allowlist.sync({'version': 2, 'base': 1, 'add': [uid], 'remove': [uid]})
+    assert allowlist.count() == 3
+    assert '[ERROR]' in capsys.readouterr().out